@@ -0,0 +1,297 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+from cachetools import TTLCache
+from flask import Flask, jsonify, request
+
+from compact_schema import compact_frame
+from dataset_store import DEFAULT_SEASON, data_version, load_frame, season_sources
+from leaderboards import TOP_K, get_leaderboards, leaderboard_stats
+from model_store import current_entry, get_serving_artifact
+from player_index import get_index, normalize_name
+from projections import get_projection_table, predict_batch
+from season_simulation import TOP_N, get_simulation
+from similar_players import get_similarity_index
+
+# 🌐 Headless JSON API: player reports, predictions and leaderboards for team sites and bots.
+# Each worker process loads a season's frame, model artifact, name index and projection table
+# once; responses go through an LRU + TTL cache keyed by (data version, model, request), so a
+# store rebuild or newly registered model never serves stale answers. Run with the built-in
+# threaded server or under any WSGI server: gunicorn -w 4 'api_service:create_app()'
+
+CACHE_SIZE = 10_000
+CACHE_TTL = 300  # seconds
+VERSION_CHECK_INTERVAL = 5  # seconds between data-version / registry checks
+MAX_BATCH = 1000
+
+report_columns = ["PTS", "FG%", "TS%", "AST_RATIO", "EFF", "RPG", "APG", "SPG", "BPG"]
+
+
+# 📦 Everything one season needs to answer requests, built once per data version
+class SeasonData:
+    def __init__(self, season, version, compact=False):
+        self.season = season
+        self.version = version
+        self.df = load_frame(season)
+        self.artifact = get_serving_artifact(self.df, version=version and f"{version}:{season}")
+        self.index = get_index(self.df, version and f"{version}:{season}")
+        self.projections = get_projection_table(self.df, self.artifact, season, version)
+        self.simulation = get_simulation(self.df, self.artifact, season, version,
+                                         predicted=self.projections["predicted_pts"].to_numpy())
+        get_leaderboards(season, df=self.df)
+        self.similarity = get_similarity_index(self.df, self.artifact, season, version)
+        if compact:
+            # Keep only the compact view resident; the projection table was scored from full precision
+            self.df = compact_frame(self.df)
+        self.cache_key = (version, self.artifact["key"], season)
+
+    # 🔍 Same fields as generate_report in player_report_generator.py
+    def report(self, name):
+        rows = self.index.lookup(name)
+        if not len(rows):
+            return None
+        first = rows[0]
+        return {
+            "player": self.df["Player"].iat[first],
+            "season": self.season,
+            "points": _number(self.df["PTS"].iat[first]),
+            "fg_pct": _number(self.df["FG%"].iat[first]),
+            "ts_pct": _number(self.df["TS%"].iat[first]),
+            "ast_ratio": _number(self.df["AST_RATIO"].iat[first]),
+            "eff": _number(self.df["EFF"].iat[first]),
+            "stats": _records(self.df.iloc[rows], report_columns),
+        }
+
+    # 🔮 Same precomputed projection predict_future_performance reads
+    def prediction(self, name):
+        rows = self.index.lookup(name)
+        if not len(rows):
+            return None
+        projection = self.projections.iloc[rows[0]]
+        return {"player": projection["Player"], "season": self.season,
+                "predicted_pts": _number(projection["predicted_pts"]),
+                "projected_fg": _number(projection["projected_fg"]), "model": self.artifact["key"]}
+
+    # 🎲 Rest-of-season distribution from the season's Monte Carlo table
+    def outlook(self, name):
+        rows = self.index.lookup(name)
+        if not len(rows):
+            return None
+        outlook = self.simulation.iloc[rows[0]]
+        return {"player": outlook["Player"], "season": self.season, "games": int(outlook["games"]),
+                "rest_mean": _number(outlook["rest_mean"]), "rest_sd": _number(outlook["rest_sd"]),
+                "final_p10": _number(outlook["final_p10"]), "final_p50": _number(outlook["final_p50"]),
+                "final_p90": _number(outlook["final_p90"]), "p_leader": _number(outlook["p_leader"]),
+                f"p_top{TOP_N}": _number(outlook[f"p_top{TOP_N}"]), "model": self.artifact["key"]}
+
+    def predictions(self, names):
+        batch = predict_batch(names, self.df, self.artifact, self.index)
+        return [{"player": name, "found": bool(found), "predicted_pts": _number(pts)}
+                for name, found, pts in zip(batch["Player"], batch["found"], batch["predicted_pts"])]
+
+    # 🏆 Materialized board (kept current by scraper deltas) when it covers the request
+    def leaderboard(self, stat, n):
+        columns = ["Player", stat, "PTS", "FG%", "TS%"]
+        if stat in leaderboard_stats and n <= TOP_K:
+            return _records(get_leaderboards(self.season).top(stat, n), columns)
+        return _records(self.df.nlargest(n, stat), columns)
+
+    # 👯 Precomputed nearest neighbours over the standardized model features
+    def similar(self, name, n):
+        rows = self.index.lookup(name)
+        if not len(rows):
+            return None
+        neighbors, distances = self.similarity.similar(rows[0], n)
+        similar = _records(self.df.iloc[neighbors], ["Player", "PTS", "FG%", "EFF"])
+        for record, distance in zip(similar, distances):
+            record["distance"] = _number(distance)
+        return {"player": self.df["Player"].iat[rows[0]], "season": self.season, "similar": similar}
+
+    def suggestions(self, name):
+        return self.index.complete(name) or self.index.suggest(name)
+
+
+# Column-wise, so float32 / int16 values reach _number as NumPy scalars (to_dict widens them first)
+def _records(frame, columns):
+    values = {column: frame[column].to_numpy() for column in columns}
+    return [{column: values[column][i] if column == "Player" else _number(values[column][i]) for column in columns}
+            for i in range(len(frame))]
+
+
+def _number(value):
+    if value is None or np.isnan(value):
+        return None
+    # float32 (compact frames): shortest repr, so 14.8 is not served as 14.800000190734863
+    return float(str(value)) if isinstance(value, np.float32) else float(value)
+
+
+# 🧠 Per-process state: loaded seasons + response cache, refreshed when the data version changes
+class Service:
+    def __init__(self, cache_size=CACHE_SIZE, ttl=CACHE_TTL, compact=False):
+        self.cache = TTLCache(maxsize=cache_size, ttl=ttl)
+        self.compact = compact
+        self.lock = threading.Lock()
+        self.seasons = {}
+        self.version = None
+        self.checked_at = 0.0
+        self.hits = self.misses = 0
+
+    def season(self, season):
+        now = time.monotonic()
+        if now - self.checked_at > VERSION_CHECK_INTERVAL:
+            self.checked_at = now
+            # A new store build or a newly registered model both invalidate the loaded seasons
+            version = (data_version(), (current_entry() or {}).get("artifact"))
+            if version != self.version:
+                with self.lock:
+                    self.version, self.seasons = version, {}
+        data = self.seasons.get(season)
+        if data is None:
+            with self.lock:
+                data = self.seasons.get(season)
+                if data is None:
+                    data = self.seasons[season] = SeasonData(season, self.version[0], self.compact)
+        return data
+
+    # ♻️ Cached call; the key carries data version + model key, so stale entries are never hit
+    def cached(self, data, endpoint, args, compute):
+        key = (*data.cache_key, endpoint, args)
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                return self.cache[key]
+        result = compute()
+        with self.lock:
+            self.misses += 1
+            self.cache[key] = result
+        return result
+
+
+def create_app(cache_size=CACHE_SIZE, ttl=CACHE_TTL, compact=False):
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+    service = Service(cache_size, ttl, compact)
+    app.config["service"] = service
+
+    def season_arg(payload=None):
+        season = (payload or {}).get("season") or request.args.get("season", DEFAULT_SEASON)
+        if season not in season_sources:
+            return None, (jsonify(error=f"Unknown season '{season}'", seasons=list(season_sources)), 400)
+        return service.season(season), None
+
+    def not_found(data, name):
+        return jsonify(error=f"No data available for '{name}'", suggestions=data.suggestions(name)), 404
+
+    def batch_names():
+        payload = request.get_json(silent=True) or {}
+        names = payload.get("players")
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            return payload, None, (jsonify(error="Body must be {\"players\": [names...]}"), 400)
+        if len(names) > MAX_BATCH:
+            return payload, None, (jsonify(error=f"At most {MAX_BATCH} players per call"), 400)
+        return payload, names, None
+
+    @app.get("/health")
+    def health():
+        return jsonify(status="ok", data_version=service.version and service.version[0], seasons=sorted(service.seasons),
+                       cache={"size": len(service.cache), "hits": service.hits, "misses": service.misses})
+
+    @app.get("/players/<path:name>/report")
+    def report(name):
+        data, error = season_arg()
+        if error:
+            return error
+        result = service.cached(data, "report", normalize_name(name), lambda: data.report(name))
+        return jsonify(result) if result else not_found(data, name)
+
+    @app.get("/players/<path:name>/prediction")
+    def prediction(name):
+        data, error = season_arg()
+        if error:
+            return error
+        result = service.cached(data, "prediction", normalize_name(name), lambda: data.prediction(name))
+        return jsonify(result) if result else not_found(data, name)
+
+    @app.get("/players/<path:name>/outlook")
+    def outlook(name):
+        data, error = season_arg()
+        if error:
+            return error
+        result = service.cached(data, "outlook", normalize_name(name), lambda: data.outlook(name))
+        return jsonify(result) if result else not_found(data, name)
+
+    @app.get("/players/<path:name>/similar")
+    def similar(name):
+        data, error = season_arg()
+        if error:
+            return error
+        n = min(request.args.get("n", 5, type=int), 100)
+        result = service.cached(data, "similar", (normalize_name(name), n), lambda: data.similar(name, n))
+        return jsonify(result) if result else not_found(data, name)
+
+    @app.get("/leaderboard")
+    def leaderboard():
+        data, error = season_arg()
+        if error:
+            return error
+        stat = request.args.get("stat", "EFF")
+        n = min(request.args.get("n", 3, type=int), 100)
+        if stat not in data.df.select_dtypes("number").columns:
+            return jsonify(error=f"Unknown stat '{stat}'"), 400
+        return jsonify(service.cached(data, "leaderboard", (stat, n), lambda: data.leaderboard(stat, n)))
+
+    @app.post("/batch/reports")
+    def batch_reports():
+        payload, names, error = batch_names()
+        if error:
+            return error
+        data, error = season_arg(payload)
+        if error:
+            return error
+        reports = [service.cached(data, "report", normalize_name(name), lambda name=name: data.report(name))
+                   for name in names]
+        return jsonify(season=data.season, reports=[report or {"player": name, "error": "not found"}
+                                                   for name, report in zip(names, reports)])
+
+    @app.post("/batch/predictions")
+    def batch_predictions():
+        payload, names, error = batch_names()
+        if error:
+            return error
+        data, error = season_arg(payload)
+        if error:
+            return error
+        results = service.cached(data, "predictions", tuple(normalize_name(name) for name in names),
+                                 lambda: data.predictions(names))
+        return jsonify(season=data.season, model=data.artifact["key"], predictions=results)
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve reports, predictions and leaderboards as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--ttl", type=int, default=CACHE_TTL, help="Response cache TTL in seconds")
+    parser.add_argument("--compact", action="store_true", help="Hold seasons as categorical / int16 / float32 "
+                                                               "frames (see compact_schema.py)")
+    parser.add_argument("--preload", action="append", help=f"Seasons to load before serving "
+                                                            f"(repeatable, default: {DEFAULT_SEASON})")
+    args = parser.parse_args(argv)
+
+    # The built-in server is one threaded process; use a WSGI server (see above) for more workers
+    app = create_app(args.cache_size, args.ttl, args.compact)
+    preload = args.preload or [DEFAULT_SEASON]
+    started = time.perf_counter()
+    for season in preload:
+        app.config["service"].season(season)
+    print(f"✅ Loaded {', '.join(preload)} in {time.perf_counter() - started:.2f}s; "
+          f"serving on http://{args.host}:{args.port}")
+    app.run(args.host, args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
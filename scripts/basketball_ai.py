@@ -1,46 +1,36 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import Ridge
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, r2_score
 
-# 📥 Load Dataset
-file_path = "data/processed/final_final_cleaned_peg_city_basketball_stats.csv"
-df = pd.read_csv(file_path)
+from charts import get_chart
+from dataset_store import load_frame
+from profiler import profile_frame
+from model_store import registered_params
+
+# 📥 Load Dataset (typed columnar store, see dataset_store.py)
+df = load_frame("peg_city_basketball")
 
 # 🔍 Verify Columns
 print("\n📊 Available Columns:\n", df.columns)
 
-# 🚀 Advanced Player Metrics
-df["TS%"] = df["PTS"] / (2 * (df["FGA"] + (0.44 * df["FTA"])))  # Correct TS% Formula
-df["TS%"] = df["TS%"].replace([float('inf'), -float('inf')], 0).fillna(0)  # Handle divide errors
-df.loc[(df["PTS"] == 0) | (df["FGA"] + (0.44 * df["FTA"]) == 0), "TS%"] = 0  # Prevent divide-by-zero errors
-df.loc[df["TS%"] > 1, "TS%"] = 1  # Ensure TS% does not exceed 100%
-df["AST_RATIO"] = df["AST"] / (df["AST"] + df["TO"])  # Assist-to-Turnover Ratio
-
-# 📈 Adjust Efficiency Calculation
-df["EFF"] = (df["PTS"] + df["DREB"] + df["OREB"] + df["AST"] + df["STL"] + df["BLK"]) - (df["FGA"] - df["FGM"]) - (df["FTA"] - df["FTM"]) - df["TO"]
-
-# 🔄 Outlier Analysis
-numeric_cols = df.select_dtypes(include=["number"]).columns
-Q1, Q3 = df[numeric_cols].quantile(0.25), df[numeric_cols].quantile(0.75)
-IQR = Q3 - Q1
-outliers = ((df[numeric_cols] < (Q1 - 1.5 * IQR)) | (df[numeric_cols] > (Q3 + 1.5 * IQR))).sum()
+# 🚀 Advanced Player Metrics (TS%, AST_RATIO, EFF_CALC, ... materialized in the store, see metrics.py)
+
+# 📈 Adjust Efficiency Calculation: use the box-score efficiency instead of the scraped EFF
+df["EFF"] = df["EFF_CALC"]
+
+# 🔄 Outlier Analysis (one streaming pass, see profiler.py)
+outliers = profile_frame(df).summary()["outliers"].dropna().astype(int)
 print("\n🚨 Outlier Count:\n", outliers)
 
 # 🏀 Sanity Check on TS% Values
 print("\n📊 TS% Sanity Check:\n", df[["Player", "PTS", "FGA", "FTA", "TS%"]].head(15))
 
-# 📊 Visualize Scoring Trends
-plt.figure(figsize=(6, 4))
-sns.boxplot(data=df, x="PTS")
-plt.title("Points Distribution")
-plt.show()
+# 📊 Visualize Scoring Trends (rendered off-screen and cached, see charts.py)
+print("\n📊 Points distribution:", get_chart(df, {"kind": "box", "column": "PTS", "title": "Points Distribution"}))
 
-# 🔮 Predictive Model: Multi-Feature Ridge Regression
-features = ["FG%", "AST", "DREB", "OREB", "3P%", "EFF", "RPG", "APG", "SPG", "BPG", "PPR"]
+# 🔮 Predictive Model: Multi-Feature Ridge Regression (features & alpha picked by model_selection.py)
+features, params = registered_params()
 X = df[features].dropna()
 y = df.loc[X.index, "PTS"]
 
@@ -51,7 +41,7 @@ X_scaled = scaler.fit_transform(X)
 X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
 
 # 🌟 Optimized Ridge Regression Model
-ridge_model = Ridge(alpha=1.0)
+ridge_model = Ridge(alpha=params["alpha"])
 ridge_model.fit(X_train, y_train)
 
 # Predictions & Evaluation
@@ -1,51 +1,58 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import Ridge
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, r2_score
-
-# 📥 Load Dataset
-file_path = "data/processed/final_final_cleaned_peg_city_basketball_stats.csv"
-df = pd.read_csv(file_path)
-
-# 🔍 Ensure TS% & AST_RATIO Columns Exist
-if "TS%" not in df.columns:
-    df["TS%"] = df["PTS"] / (2 * (df["FGA"] + (0.44 * df["FTA"])))
-    df["TS%"] = df["TS%"].replace([float('inf'), -float('inf')], 0).fillna(0)
-    df.loc[(df["PTS"] == 0) | (df["FGA"] + (0.44 * df["FTA"]) == 0), "TS%"] = 0
-    df.loc[df["TS%"] > 1, "TS%"] = 1  # Ensures valid TS% values
-
-if "AST_RATIO" not in df.columns:
-    df["AST_RATIO"] = df["AST"] / (df["AST"] + df["TO"])
-    df["AST_RATIO"] = df["AST_RATIO"].fillna(0)  # Handles NaN values
-
-# 🔍 Feature Scaling for Predictions
-features = ["FG%", "AST", "DREB", "OREB", "3P%", "EFF", "RPG", "APG", "SPG", "BPG", "PPR"]
-X = df[features].dropna()
-y = df.loc[X.index, "PTS"]
-
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-
-# 🌟 Train Ridge Regression Model
-ridge_model = Ridge(alpha=1.0)
-ridge_model.fit(X_train, y_train)
+
+import instrument
+from charts import get_chart, player_trend, season_charts, trend_spec
+from dataset_store import data_version, load_frame
+from leaderboards import get_leaderboards
+from model_store import get_serving_artifact
+from player_index import get_index
+from projections import get_projection_table
+from season_simulation import TOP_N, get_simulation, simulate_standings
+from similar_players import get_similarity_index, similar_table
+from stat_cube import get_cube
+
+# 🩺 Hidden performance panel: open the dashboard with ?perf=1 to trace this run (see instrument.py).
+# Without it, tracing stays off and every span below is a no-op.
+show_perf = "perf" in st.query_params
+if show_perf:
+    instrument.enable()
+if instrument.enabled():
+    instrument.reset()
+
+# 📥 Load Dataset (typed columnar store with TS%, AST_RATIO & co. precomputed, see metrics.py)
+season = "peg_city_basketball"
+df = load_frame(season)
+
+# 🌟 Ridge Regression Model: registered winner of model_selection.py, loaded once per process from its
+# sklearn-free serving copy (see model_store.py)
+version = data_version()
+artifact = get_serving_artifact(df, version=version and f"{version}:{season}")
+
+# 🔎 Player name index (hash lookup + autocomplete + typo suggestions), built once per data version
+player_index = get_index(df, version and f"{version}:{season}")
+
+def find_player_rows(player_name):
+    return df.iloc[player_index.lookup(player_name)]
+
+# 📈 Projected points for the whole season, scored in one batch and stored per data/model version
+projections = get_projection_table(df, artifact, season, version)
+
+# 🎲 Rest-of-season distributions (Monte Carlo over the same predictions), simulated once per data/model version
+simulation = get_simulation(df, artifact, season, version, predicted=projections["predicted_pts"].to_numpy())
+
+# 👯 Nearest neighbours over standardized stat vectors, every player's top matches precomputed per data version
+similarity = get_similarity_index(df, artifact, season, version)
 
 # 🔮 Predicting Future Performance for Player
 def predict_future_performance(player_name):
-    player_stats = df[df["Player"].str.lower() == player_name.lower()]  # Exact match
-    if player_stats.empty:
+    rows = player_index.lookup(player_name)  # Exact (normalized) match
+    if not len(rows):
         return f"🚨 No future prediction available for '{player_name}'."
 
-    player_features = player_stats[["FG%", "AST", "DREB", "OREB", "3P%", "EFF", "RPG", "APG", "SPG", "BPG", "PPR"]]
-    player_features_scaled = scaler.transform(player_features)  # Standardizing features
-
-    predicted_pts = ridge_model.predict(player_features_scaled)[0]  # Predict future points
-    projected_fg = player_stats.iloc[0]["FG%"] * 1.05  # Assuming a slight improvement trend
+    projection = projections.iloc[rows[0]]  # Precomputed batch prediction, no per-player predict
+    predicted_pts = projection["predicted_pts"]
+    projected_fg = projection["projected_fg"]  # FG% with a slight improvement trend
 
     return f"""
     🔮 **Projected Performance for Next Game**  
@@ -55,9 +62,24 @@ def predict_future_performance(player_name):
     _(Based on AI prediction & player trends)_  
     """
 
+# 🎲 Rest-of-season outlook: projected season points with an 80% range and leaderboard finish odds
+def season_outlook(player_name):
+    rows = player_index.lookup(player_name)
+    if not len(rows) or pd.isna(simulation["rest_mean"].iat[rows[0]]):
+        return None
+
+    outlook = simulation.iloc[rows[0]]
+    return f"""
+    🎲 **Rest-of-Season Outlook** _({outlook["games"]} more games, simulated)_  
+
+    📊 **Projected Season Points:** **{outlook["final_p50"]:.0f}** (80% range {outlook["final_p10"]:.0f}–{outlook["final_p90"]:.0f})  
+    🏆 **Chance to Lead the League in Points:** **{outlook["p_leader"]:.1%}**  
+    🔟 **Chance to Finish Top {TOP_N}:** **{outlook[f"p_top{TOP_N}"]:.1%}**  
+    """
+
 # 🔍 Helper Function: Generate Player Report (Exact Match Fix)
 def generate_report(player_name):
-    player_stats = df[df["Player"].str.lower() == player_name.lower()]  # Exact match only
+    player_stats = find_player_rows(player_name)  # Exact (normalized) match only
     if player_stats.empty:
         return f"🚨 No data available for '{player_name}'.\n❌ **Possible reasons:**\n• Name is incorrect—please enter the full name as listed in the stats.\n• No recorded games—this player may not have played yet."
 
@@ -78,43 +100,97 @@ st.set_page_config(page_title="GameChanger: AI Basketball Dashboard", layout="wi
 st.title("🏀 GameChanger Basketball AI Dashboard")
 st.sidebar.header("Enter a Player Name:")
 
-# ⚡ Correct session state handling
-if "previous_player" not in st.session_state:
-    st.session_state.previous_player = ""
-
-player_name = st.sidebar.text_input("Player Name", "")
+# Streamlit already reruns the script when the input changes, so no manual st.rerun() here
+player_name = st.sidebar.text_input("Player Name", "").strip()
 
-# 🧹 Refresh dashboard only when a valid new name is entered
-if player_name.strip():  # Avoids blank screen when Enter is pressed with an empty input
-    if player_name != st.session_state.previous_player:
-        st.session_state.previous_player = player_name
-        st.rerun()  # Corrected function for smooth UI refresh
+# 💡 Autocomplete: offer prefix matches, or close spellings, when the name isn't an exact hit
+if player_name and not len(player_index.lookup(player_name)):
+    suggestions = player_index.complete(player_name) or player_index.suggest(player_name)
+    if suggestions:
+        choice = st.sidebar.selectbox("Did you mean…", suggestions, index=None, placeholder="Pick a player")
+        if choice:
+            player_name = choice
 
 # 📊 Generate Report if Name is Entered
 if player_name:
-    report = generate_report(player_name)
-    st.write(report)
+    with instrument.span("render.report", player=player_name):
+        report = generate_report(player_name)
+        st.write(report)
 
     # 📊 Display Player Stats Table (Compact Format)
-    player_stats_display = df[df["Player"].str.lower() == player_name.lower()][["PTS", "FG%", "TS%", "AST_RATIO", "EFF", "RPG", "APG", "SPG", "BPG"]]
+    with instrument.span("render.stats_table"):
+        player_stats_display = find_player_rows(player_name)[["PTS", "FG%", "TS%", "AST_RATIO", "EFF", "RPG", "APG", "SPG", "BPG"]]
 
-    if player_stats_display.empty:
-        st.write(f"🚨 No data available for '{player_name}'.\n❌ **Possible reasons:**\n• Name is incorrect—please enter the full name as listed in the stats.\n• No recorded games—this player may not have played yet.")
-    else:
-        st.subheader(f"📊 {player_name} - Detailed Stats")
-        st.write(player_stats_display)
+        if player_stats_display.empty:
+            st.write(f"🚨 No data available for '{player_name}'.\n❌ **Possible reasons:**\n• Name is incorrect—please enter the full name as listed in the stats.\n• No recorded games—this player may not have played yet.")
+        else:
+            st.subheader(f"📊 {player_name} - Detailed Stats")
+            st.write(player_stats_display)
 
     # 🔮 Future Prediction
-    prediction = predict_future_performance(player_name)
-    st.write(prediction)
+    with instrument.span("render.prediction"):
+        prediction = predict_future_performance(player_name)
+        st.write(prediction)
+
+    # 🎲 Rest-of-Season Outlook
+    with instrument.span("render.outlook"):
+        outlook = season_outlook(player_name)
+        if outlook:
+            st.write(outlook)
+
+    # 👯 Similar Players
+    with instrument.span("render.similar"):
+        rows = player_index.lookup(player_name)
+        similar = similar_table(df, similarity, rows[0], 5, ["PTS", "FG%", "EFF", "RPG", "APG"]) if len(rows) else None
+        if similar is not None and not similar.empty:
+            st.subheader(f"👯 Players Similar to {player_name}")
+            st.write(similar)
+
+    # 📈 Season-by-Season Trend (cached image, see charts.py)
+    with instrument.span("render.trend"):
+        trend = player_trend(player_name, version)
+        if trend["season"].nunique() > 1:
+            st.subheader(f"📈 {player_name} - Season by Season")
+            st.image(get_chart(trend, trend_spec(trend["Player"].iat[-1])))
 
 # 🏀 Game Summary (Final Section)
-st.subheader("🏀 Team-Wide Insights")
-top_players = df.nlargest(3, "EFF")[["Player", "EFF", "PTS", "FG%", "TS%"]]
+with instrument.span("render.insights"):
+    st.subheader("🏀 Team-Wide Insights")
+    top_players = get_leaderboards(season, df=df).top("EFF", 3)[["Player", "EFF", "PTS", "FG%", "TS%"]]
 
-if top_players.empty:
-    st.write("No top players found for this dataset.")
-else:
-    st.write(top_players)
+    if top_players.empty:
+        st.write("No top players found for this dataset.")
+    else:
+        st.write(top_players)
+
+    # 📊 Efficiency charts, served from the chart cache (prebuild with: python scripts/charts.py)
+    chart_columns = st.columns(2)
+    insight_charts = [(data, spec) for data, spec in season_charts(df, season)
+                      if spec["column"] == "EFF" and spec["kind"] in ("bar", "hist")]
+    for column, (data, spec) in zip(chart_columns, insight_charts):
+        column.image(get_chart(data, spec, version and f"{version}:{season}"))
+
+    # 🏟 Team standings from the aggregation cube (see stat_cube.py), with simulated playoff odds
+    standings = get_cube().team_table(season)
+    if len(standings):
+        odds = simulate_standings(standings)
+        st.subheader("🏟 Team Standings")
+        st.write(standings.join(odds[["exp_wins", "p_first", "p_playoffs"]]))
 
 st.write("AI-powered basketball insights are now live!")
+
+# 🩺 Stage breakdown of this run, plus the last traced run of each pipeline script
+if show_perf:
+    instrument.save_last_run("dashboard")
+    with st.expander("🩺 Performance", expanded=True):
+        runs = instrument.list_last_runs()
+        run = st.selectbox("Run", runs, index=runs.index("dashboard") if "dashboard" in runs else 0)
+        last_run = instrument.load_last_run(run) if run else None
+        if not last_run or not last_run["summary"]:
+            st.write("No spans recorded.")
+        else:
+            breakdown = pd.DataFrame(last_run["summary"]).set_index("name")
+            st.bar_chart(breakdown["total_ms"])
+            st.write(breakdown.round(2))
+            st.caption(f"{len(last_run['spans'])} spans · "
+                       "export a Chrome trace with: python scripts/instrument.py --chrome trace.json <script>")
@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+import aiohttp
+import numpy as np
+
+from dataset_store import DEFAULT_SEASON, load_frame
+
+# ⏱ Load test for api_service.py: a mixed workload (single reports / predictions, leaderboards,
+# batch predictions) fired by --concurrency clients; reports p50 / p90 / p99 latency and
+# requests/sec per endpoint. Starts its own server subprocess unless --url is given.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+workload = [("report", 0.5), ("prediction", 0.3), ("leaderboard", 0.1), ("batch_predictions", 0.1)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, ttl):
+    process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, "api_service.py"), "--port", str(port),
+                                "--ttl", str(ttl)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_ready(session, url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"API at {url} did not become ready")
+
+
+def make_request(kind, names, rng, batch_size):
+    if kind == "report":
+        return "GET", f"/players/{quote(rng.choice(names), safe='')}/report", None
+    if kind == "prediction":
+        return "GET", f"/players/{quote(rng.choice(names), safe='')}/prediction", None
+    if kind == "leaderboard":
+        return "GET", f"/leaderboard?stat={rng.choice(['EFF', 'PTS', 'TS%'])}&n={rng.choice([3, 10])}", None
+    return "POST", "/batch/predictions", {"players": rng.sample(names, min(batch_size, len(names)))}
+
+
+async def client(session, url, requests, results):
+    for kind, method, path, body in requests:
+        started = time.perf_counter()
+        try:
+            async with session.request(method, url + path, json=body) as response:
+                await response.read()
+                ok = response.status < 500
+        except aiohttp.ClientError:
+            ok = False
+        results.append((kind, time.perf_counter() - started, ok))
+
+
+async def run_load(url, names, total, concurrency, batch_size, seed):
+    rng = random.Random(seed)
+    kinds = rng.choices([kind for kind, _ in workload], weights=[weight for _, weight in workload], k=total)
+    requests = [(kind, *make_request(kind, names, rng, batch_size)) for kind in kinds]
+    results = []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_ready(session, url)
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session, url, requests[i::concurrency], results) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    summary = {}
+    for kind in ["all"] + [kind for kind, _ in workload]:
+        rows = [(seconds, ok) for name, seconds, ok in results if kind in ("all", name)]
+        if not rows:
+            continue
+        latencies = np.array([seconds for seconds, _ in rows]) * 1000
+        summary[kind] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, ok in rows if not ok),
+            "requests_per_second": len(rows) / elapsed,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p90_ms": float(np.percentile(latencies, 90)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(latencies.max()),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the JSON API.")
+    parser.add_argument("--url", help="Existing API base URL (default: start api_service.py on a free port)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=50, help="Players per batch-prediction call")
+    parser.add_argument("--ttl", type=int, default=300, help="Cache TTL for the spawned server (0 = no caching)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    names = load_frame(DEFAULT_SEASON, columns=["Player"])["Player"].dropna().tolist()
+    process = None
+    url = args.url
+    if not url:
+        process, url = start_server(free_port(), args.ttl)
+    try:
+        results, elapsed = asyncio.run(run_load(url, names, args.requests, args.concurrency, args.batch_size,
+                                                args.seed))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    summary = summarize(results, elapsed)
+    print(f"\n📊 {args.requests:,} requests, {args.concurrency} concurrent, {elapsed:.2f}s against {url}")
+    print(f"  {'endpoint':<18} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for kind, row in summary.items():
+        print(f"  {kind:<18} {row['requests_per_second']:8.0f} {row['p50_ms']:8.2f} {row['p90_ms']:8.2f} "
+              f"{row['p99_ms']:8.2f} {row['errors']:7d}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"url": url, "requests": args.requests, "concurrency": args.concurrency,
+                       "ttl": args.ttl, "seconds": elapsed, "endpoints": summary}, fh, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from dataset_store import load_frame
+from model_store import features, get_artifact
+from player_index import PlayerIndex
+from projections import predict_batch, predict_points
+
+# ⏱ N single-player predictions vs one batch call, on a synthetic league of --players rows
+# built by resampling the real season and jittering the stat columns.
+
+
+def synthetic_league(df, players, seed=0):
+    rng = np.random.default_rng(seed)
+    league = df.iloc[rng.integers(0, len(df), players)].reset_index(drop=True)
+    noise = rng.normal(1.0, 0.05, size=(players, len(features)))
+    league[features] = league[features].to_numpy() * noise
+    league["Player"] = [f"{name} #{i}" for i, name in enumerate(league["Player"])]
+    return league
+
+
+# 🐢 What predict_future_performance does today: full-column string scan, transform, predict, [0]
+def legacy_single(df, artifact, name):
+    player_stats = df[df["Player"].str.lower() == name.lower()]
+    return artifact["model"].predict(artifact["scaler"].transform(player_stats[features]))[0]
+
+
+def indexed_single(df, artifact, index, name):
+    player_stats = df.iloc[index.lookup(name)]
+    return artifact["model"].predict(artifact["scaler"].transform(player_stats[features]))[0]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark single-player vs batch scoring.")
+    parser.add_argument("--players", type=int, default=10_000)
+    parser.add_argument("--legacy-sample", type=int, default=300,
+                        help="Legacy calls actually timed; the total is extrapolated to --players")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    base = load_frame()
+    artifact = get_artifact(base)
+    df = synthetic_league(base.dropna(subset=features), args.players)
+    names = df["Player"].tolist()
+    index = PlayerIndex(df["Player"])
+
+    sample = names[:args.legacy_sample]
+    legacy, legacy_seconds = timed(lambda: [legacy_single(df, artifact, name) for name in sample])
+    legacy_total = legacy_seconds / len(sample) * len(names)
+    single, single_seconds = timed(lambda: [indexed_single(df, artifact, index, name) for name in names])
+    batch, batch_seconds = timed(lambda: predict_batch(names, df, artifact, index))
+    season, season_seconds = timed(lambda: predict_points(df, artifact))
+
+    assert np.allclose(single, batch["predicted_pts"]) and np.allclose(legacy, batch["predicted_pts"][:len(sample)])
+    assert np.allclose(season, batch["predicted_pts"])
+
+    results = {
+        "players": len(names),
+        "legacy_single_calls_seconds_extrapolated": legacy_total,
+        "indexed_single_calls_seconds": single_seconds,
+        "batch_call_seconds": batch_seconds,
+        "season_matrix_predict_seconds": season_seconds,
+    }
+    print(f"\n📊 Scoring {len(names):,} players")
+    print(f"  🐢 {len(names):,} legacy calls (scan + predict)  {legacy_total:10.3f} s  "
+          f"(extrapolated from {len(sample)})")
+    print(f"  🔎 {len(names):,} indexed single calls      {single_seconds:10.3f} s")
+    print(f"  🚀 1 batch call (names → predictions)  {batch_seconds:10.3f} s  "
+          f"({single_seconds / batch_seconds:,.0f}x vs indexed singles)")
+    print(f"  🧮 1 season matrix predict             {season_seconds:10.4f} s")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
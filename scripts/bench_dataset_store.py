@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from dataset_store import _write_partition, build_store, season_sources, source_path, to_table
+
+# ⏱ Load-time and RSS comparison: pd.read_csv on the processed CSVs vs the columnar store.
+# Each loader runs in a fresh interpreter so its RSS growth is not polluted by the others.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+loaders = {
+    "read_csv": "df = pd.concat([pd.read_csv(p) for p in csv_paths], ignore_index=True)",
+    "store_pandas": "df = load_table(store_dir=store_dir).to_pandas()",
+    "store_projected": "df = load_table(columns=['Player', 'PTS', 'EFF'], store_dir=store_dir).to_pandas()",
+    "store_filtered": "df = load_table(filter=ds.field('GP') >= 10, store_dir=store_dir).to_pandas()",
+    "store_arrow_mmap": "df = load_table(store_dir=store_dir)",
+}
+
+probe = """
+import json, sys, time, psutil
+sys.path.insert(0, {scripts!r})
+import pandas as pd
+import pyarrow.dataset as ds
+from dataset_store import load_table
+csv_paths, store_dir = {csv_paths!r}, {store_dir!r}
+process = psutil.Process()
+before = process.memory_info().rss
+started = time.perf_counter()
+{loader}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "rss_mb": (process.memory_info().rss - before) / 2**20, "rows": len(df)}}))
+"""
+
+
+def run_loader(name, csv_paths, store_dir, repeat):
+    code = probe.format(scripts=SCRIPTS_DIR, csv_paths=csv_paths, store_dir=store_dir, loader=loaders[name])
+    runs = [json.loads(subprocess.check_output([sys.executable, "-c", code], text=True)) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run["seconds"])
+    return {"seconds": best["seconds"], "rss_mb": best["rss_mb"], "rows": best["rows"]}
+
+
+# 📈 Tile the real seasons `scale` times into a scratch CSV set and store
+def build_scaled_copy(scale, workdir):
+    csv_paths = []
+    for season, filename in season_sources.items():
+        path = source_path(filename)
+        if not os.path.exists(path):
+            continue
+        df = pd.concat([pd.read_csv(path)] * scale, ignore_index=True)
+        scaled_path = os.path.join(workdir, f"{season}.csv")
+        df.to_csv(scaled_path, index=False)
+        csv_paths.append(scaled_path)
+        _write_partition(to_table(df), season, os.path.join(workdir, "store"))
+    return csv_paths, os.path.join(workdir, "store")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare CSV parsing with the columnar store.")
+    parser.add_argument("--scale", type=int, default=1, help="Tile every season this many times")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.scale > 1:
+            csv_paths, store_dir = build_scaled_copy(args.scale, workdir)
+        else:
+            store_dir = os.path.join(workdir, "store")
+            build_store(store_dir)
+            csv_paths = [source_path(filename) for filename in season_sources.values()]
+            csv_paths = [path for path in csv_paths if os.path.exists(path)]
+
+        results = {name: run_loader(name, csv_paths, store_dir, args.repeat) for name in loaders}
+
+    baseline = results["read_csv"]
+    print(f"\n📊 Loading {baseline['rows']:,} rows from {len(csv_paths)} seasons (best of {args.repeat})")
+    for name, result in results.items():
+        speedup = baseline["seconds"] / result["seconds"] if result["seconds"] else float("inf")
+        print(f"  {name:<18} {result['seconds'] * 1000:9.1f} ms  {result['rss_mb']:8.1f} MB RSS  "
+              f"{speedup:6.1f}x  ({result['rows']:,} rows)")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"scale": args.scale, "results": results}, fh, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import json
+import time
+
+from scrape_engine import scrape, urls
+from stand_in_server import StandInLeague, rebase_urls, start_server
+
+# ⏱ Scraper benchmark: pages/sec of the async engine vs the per-cell Selenium path,
+# both pointed at the local stand-in server so network noise stays out of the numbers.
+
+
+def time_engine(page_urls, per_host):
+    started = time.perf_counter()
+    results = scrape(page_urls, per_host=per_host)
+    elapsed = time.perf_counter() - started
+    errors = [r for r in results if r["error"]]
+    if errors:
+        raise RuntimeError(f"engine failed on {errors[0]['url']}: {errors[0]['error']}")
+    return elapsed, sum(len(r["pages"]) for r in results)
+
+
+def make_browser(name):
+    from selenium import webdriver
+
+    if name == "safari":
+        return webdriver.Safari()
+    if name == "firefox":
+        options = webdriver.FirefoxOptions()
+        options.add_argument("-headless")
+        return webdriver.Firefox(options=options)
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    return webdriver.Chrome(options=options)
+
+
+# The Selenium loop only reads the first rendered page, so it is timed page-by-page over the same total
+def time_selenium(page_urls, browser, pages_per_table):
+    from webdriver import scrape_with_selenium
+
+    every_page = [url if n == 1 else f"{url}?page={n}" for url in page_urls for n in range(1, pages_per_table + 1)]
+    driver = make_browser(browser)
+    try:
+        started = time.perf_counter()
+        scrape_with_selenium(every_page, driver=driver)
+        return time.perf_counter() - started, len(every_page)
+    finally:
+        driver.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scraping throughput against the stand-in server.")
+    parser.add_argument("--repeat", type=int, default=4, help="How many times to scrape the URL list")
+    parser.add_argument("--rows", type=int, default=500, help="Players per stand-in page")
+    parser.add_argument("--pages", type=int, default=3, help="Pages per stand-in stats table")
+    parser.add_argument("--delay", type=float, default=0.05, help="Simulated server latency per request (s)")
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--browser", choices=["chrome", "firefox", "safari", "none"], default="chrome")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    league = StandInLeague(players_per_page=args.rows, pages_per_table=args.pages)
+    server, base_url = start_server(delay=args.delay, league=league)
+    page_urls = rebase_urls(urls, base_url) * args.repeat
+    results = {"tables": len(page_urls), "rows_per_page": args.rows, "pages_per_table": args.pages,
+               "delay": args.delay}
+
+    try:
+        print(f"🏟 Stand-in server at {base_url}, {len(page_urls)} tables")
+
+        elapsed, pages = time_engine(page_urls, per_host=1)
+        results["pages"] = pages
+        results["engine_sequential_pages_per_sec"] = pages / elapsed
+        print(f"🐢 Engine, 1 request/host:  {pages / elapsed:8.1f} pages/sec ({pages} pages)")
+
+        elapsed, pages = time_engine(page_urls, per_host=args.per_host)
+        results["engine_concurrent_pages_per_sec"] = pages / elapsed
+        print(f"🚀 Engine, {args.per_host} requests/host: {pages / elapsed:8.1f} pages/sec")
+
+        if args.browser != "none":
+            try:
+                elapsed, pages = time_selenium(page_urls, args.browser, args.pages)
+                results["selenium_pages_per_sec"] = pages / elapsed
+                print(f"🧭 Selenium ({args.browser}):      {pages / elapsed:8.1f} pages/sec")
+            except Exception as e:
+                results["selenium_pages_per_sec"] = None
+                print(f"⚠️ Selenium path skipped: {e}")
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
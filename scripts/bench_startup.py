@@ -0,0 +1,91 @@
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ⏱ Cold-start benchmark for the Streamlit entry points. Every run is a fresh interpreter,
+# like a new Streamlit worker or a container start, and measures:
+#   • import time: the script's own top-level imports
+#   • time-to-first-render: the first full script run (empty player box) through Streamlit's AppTest
+#   • rerun time: a second run in the same process, i.e. what a widget change costs
+# It also lists the heavy modules (sklearn, scipy, matplotlib, seaborn) the first render pulled in,
+# so a stray top-level import shows up as a regression, not just as a slower number.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+entry_points = ["basketball_ai_dashboard.py", "player_report_generator.py"]
+heavy_modules = ["sklearn", "scipy", "matplotlib", "seaborn", "joblib"]
+
+# Runs in the child interpreter: argv = script path, heavy module names, import statements (both JSON)
+probe = """
+import json, sys, time
+script, heavy = sys.argv[1], json.loads(sys.argv[2])
+started = time.perf_counter()
+for statement in json.loads(sys.argv[3]):
+    exec(statement, {})
+imported = time.perf_counter()
+import_modules = [name for name in heavy if name in sys.modules]
+
+from streamlit.testing.v1 import AppTest
+ready = time.perf_counter()
+app = AppTest.from_file(script, default_timeout=300)
+app.run()
+rendered = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+print(json.dumps({"import_s": imported - started, "first_render_s": rendered - ready, "rerun_s": rerun - rendered,
+                  "exception": bool(app.exception), "import_modules": import_modules,
+                  "render_modules": [name for name in heavy if name in sys.modules]}))
+"""
+
+
+# 📜 The script's top-level import statements, as source
+def top_level_imports(path):
+    with open(path) as fh:
+        tree = ast.parse(fh.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(script):
+    path = os.path.join(SCRIPTS_DIR, script)
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", probe, path, json.dumps(heavy_modules),
+                             json.dumps(top_level_imports(path))],
+                            capture_output=True, text=True, check=True, env={**os.environ, "PYTHONPATH": SCRIPTS_DIR})
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import time and time-to-first-render.")
+    parser.add_argument("--script", action="append", help="Entry points to measure (repeatable, default: dashboards)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per entry point (median is reported)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"\n⏱ {'entry point':<30} {'imports s':>10} {'1st render s':>13} {'rerun s':>8} {'process s':>10}  "
+          f"heavy modules")
+    for script in args.script or entry_points:
+        runs = [measure(script) for _ in range(args.runs)]
+        row = {key: statistics.median(run[key] for run in runs)
+               for key in ("import_s", "first_render_s", "rerun_s", "process_s")}
+        row.update(runs=runs, import_modules=runs[-1]["import_modules"], render_modules=runs[-1]["render_modules"])
+        results[script] = row
+        failed = " 🚨 script raised" if any(run["exception"] for run in runs) else ""
+        print(f"   {script:<30} {row['import_s']:>10.2f} {row['first_render_s']:>13.2f} {row['rerun_s']:>8.2f} "
+              f"{row['process_s']:>10.2f}  {', '.join(row['render_modules']) or '-'}{failed}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"runs": args.runs, "python": sys.version.split()[0], "entry_points": results}, fh, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from dataset_store import to_table
+from metrics import compute_metrics
+from model_store import train_points_model
+from player_identity import resolve
+from player_index import PlayerIndex
+from profiler import profile_frame
+from synthetic_league import generate_league, key_columns, shape_for_rows
+
+# ⏱ End-to-end benchmark of the hot paths on a synthetic league (see synthetic_league.py):
+# CSV write/load, store build, metrics, outlier pass, Ridge fit, report lookups, player
+# identity resolution and leaderboards, each timed with its peak memory. Results go to JSON so runs can be
+# diffed with --compare.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# 📈 Background RSS sampler: tracemalloc would slow the Python-heavy stages down by 10-50x
+class PeakRSS(threading.Thread):
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.process = psutil.Process()
+        self.interval = interval
+        self.start_rss = self.peak = self.process.memory_info().rss
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self):
+        self.done.set()
+        self.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return (self.peak - self.start_rss) / 2**20
+
+
+# ⏲ Time a block and record its peak RSS growth
+@contextmanager
+def stage(results, name, rows):
+    sampler = PeakRSS()
+    sampler.start()
+    started = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - started
+    results[name] = {
+        "seconds": seconds,
+        "rows": rows,
+        "rows_per_second": rows / seconds if seconds else None,
+        "peak_rss_mb": sampler.stop(),
+    }
+    print(f"  {name:<24} {seconds:10.3f} s  {results[name]['peak_rss_mb']:9.1f} MB peak")
+
+
+# 🐢 Legacy per-script IQR pass: two quantile scans plus a boolean frame per column
+def legacy_outliers(df):
+    numeric = df.select_dtypes(include="number")
+    q1, q3 = numeric.quantile(0.25), numeric.quantile(0.75)
+    iqr = q3 - q1
+    return ((numeric < (q1 - 1.5 * iqr)) | (numeric > (q3 + 1.5 * iqr))).sum()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(leagues, seasons, players, seed=0, lookups=200, workdir=None):
+    results = {}
+    rows = leagues * seasons * players
+
+    with stage(results, "generate", rows):
+        df = generate_league(leagues, seasons, players, seed)
+
+    csv_path = os.path.join(workdir, "league.csv")
+    with stage(results, "csv_write", rows):
+        df.to_csv(csv_path, index=False)
+    with stage(results, "csv_load", rows):
+        loaded = pd.read_csv(csv_path)
+    del loaded
+
+    with stage(results, "store_build", rows):
+        table = to_table(df.drop(columns=key_columns))
+    with stage(results, "store_to_pandas", rows):
+        table.to_pandas()
+    del table
+
+    with stage(results, "metrics", rows):
+        compute_metrics(df)
+
+    with stage(results, "outliers_legacy", rows):
+        legacy_outliers(df)
+    with stage(results, "outliers_profiler", rows):
+        profile_frame(df).summary()
+
+    with stage(results, "ridge_fit", rows):
+        train_points_model(df)
+
+    names = df["Player"].sample(min(lookups, len(df)), random_state=seed).tolist()
+    with stage(results, "report_lookup_scan", len(names)):
+        for name in names:
+            df[df["Player"].str.lower() == name.lower()]
+    with stage(results, "report_index_build", rows):
+        index = PlayerIndex(df["Player"])
+    with stage(results, "report_lookup_indexed", len(names)):
+        for name in names:
+            df.iloc[index.lookup(name)]
+
+    with stage(results, "identity_resolve", rows):
+        resolve({key: group["Player"] for key, group in df.groupby(key_columns, observed=True)})
+
+    with stage(results, "leaderboard_nlargest", rows):
+        df.groupby(key_columns, observed=True).apply(lambda group: group.nlargest(3, "EFF"), include_groups=False)
+    with stage(results, "leaderboard_sort_once", rows):
+        ranked = df.sort_values(key_columns + ["EFF"], ascending=[True, True, False])
+        ranked.groupby(key_columns, observed=True).head(3)
+
+    return results
+
+
+# 📉 Ratio of this run's stage times to a previous JSON result (> 1 means slower)
+def compare(results, baseline_path, threshold=1.2):
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)["stages"]
+    print(f"\n📉 vs {baseline_path}:")
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["seconds"] / baseline[name]["seconds"] if baseline[name]["seconds"] else float("nan")
+        flag = "🚨" if ratio > threshold else "  "
+        if ratio > threshold:
+            regressions.append(name)
+        print(f"  {flag} {name:<24} {baseline[name]['seconds']:9.3f} s → {result['seconds']:9.3f} s  ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths on a synthetic league.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Approximate total rows (up to ~10M)")
+    parser.add_argument("--leagues", type=int, default=None)
+    parser.add_argument("--seasons", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lookups", type=int, default=200, help="Single-player report lookups to time")
+    parser.add_argument("--repeat", type=int, default=1, help="Run the suite N times and keep each stage's best")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous --json result to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio flagged as a regression")
+    args = parser.parse_args(argv)
+
+    leagues, seasons, players = shape_for_rows(args.rows, args.leagues, args.seasons)
+    print(f"🏭 {leagues} leagues × {seasons} seasons × {players:,} players = {leagues * seasons * players:,} rows")
+
+    runs = []
+    for run in range(args.repeat):
+        print(f"\n⏱ Run {run + 1}/{args.repeat}")
+        with tempfile.TemporaryDirectory() as workdir:
+            runs.append(run_suite(leagues, seasons, players, args.seed, args.lookups, workdir))
+    results = {name: min((run[name] for run in runs), key=lambda result: result["seconds"]) for name in runs[0]}
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "rows": leagues * seasons * players,
+            "leagues": leagues, "seasons": seasons, "players": players, "seed": args.seed, "repeat": args.repeat,
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(),
+            "final_rss_mb": psutil.Process().memory_info().rss / 2**20,
+        },
+        "stages": results,
+    }
+
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"💾 Results written to {args.json}")
+    if regressions:
+        print(f"🚨 {len(regressions)} stage(s) slower than {args.threshold}x: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from jinja2 import Environment
+
+from dataset_store import data_version, load_frame, season_sources
+from instrument import span
+from model_store import get_serving_artifact
+from player_index import normalize_name
+from projections import get_projection_table
+
+# 📝 Bulk player reports: every player (or a filtered set) of one or more seasons rendered to
+# Markdown / HTML files before game night. Rows are grouped by player in one groupby, the
+# Jinja templates are compiled once per worker process, shards of reports are rendered on a
+# process pool, and a manifest of per-report content hashes means only players whose rows,
+# projection or template changed are re-rendered.
+
+REPORT_DIR = "reports"
+MANIFEST_FILE = "_reports.json"
+TEMPLATE_VERSION = 1
+SHARD_SIZE = 250
+
+stat_columns = ["PTS", "FG%", "TS%", "AST_RATIO", "EFF", "RPG", "APG", "SPG", "BPG"]
+
+template_sources = {
+    "md": """# 🏀 Player Report: {{ player }}
+_{{ season }}_
+
+✔ **Points Scored:** {{ first.PTS }}
+✔ **Field Goal %:** {{ "%.2f"|format(first["FG%"]) }}
+✔ **True Shooting %:** {{ "%.2f"|format(first["TS%"]) }}
+✔ **Assist Ratio:** {{ "%.2f"|format(first.AST_RATIO) }}
+✔ **Efficiency Rating:** {{ "%.2f"|format(first.EFF) }}
+
+## 📊 Detailed Stats
+
+| {{ columns|join(" | ") }} |
+|{% for column in columns %} ---: |{% endfor %}
+{% for row in rows %}| {% for column in columns %}{{ "%.2f"|format(row[column]) }} | {% endfor %}
+{% endfor %}
+## 🔮 Projected Performance for Next Game
+
+{% if predicted_pts is none %}🚨 No future prediction available for '{{ player }}'.
+{% else %}📊 **Expected Points:** **{{ "%.2f"|format(predicted_pts) }}** _(Based on current trends and AI predictions)_
+{% endif %}""",
+    "html": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Player Report: {{ player }}</title></head>
+<body>
+<h1>🏀 Player Report: {{ player }}</h1>
+<p><em>{{ season }}</em></p>
+<ul>
+<li><strong>Points Scored:</strong> {{ first.PTS }}</li>
+<li><strong>Field Goal %:</strong> {{ "%.2f"|format(first["FG%"]) }}</li>
+<li><strong>True Shooting %:</strong> {{ "%.2f"|format(first["TS%"]) }}</li>
+<li><strong>Assist Ratio:</strong> {{ "%.2f"|format(first.AST_RATIO) }}</li>
+<li><strong>Efficiency Rating:</strong> {{ "%.2f"|format(first.EFF) }}</li>
+</ul>
+<h2>📊 Detailed Stats</h2>
+<table>
+<tr>{% for column in columns %}<th>{{ column }}</th>{% endfor %}</tr>
+{% for row in rows %}<tr>{% for column in columns %}<td>{{ "%.2f"|format(row[column]) }}</td>{% endfor %}</tr>
+{% endfor %}</table>
+<h2>🔮 Projected Performance for Next Game</h2>
+{% if predicted_pts is none %}<p>🚨 No future prediction available for '{{ player }}'.</p>
+{% else %}<p><strong>Expected Points:</strong> {{ "%.2f"|format(predicted_pts) }} <em>(Based on current trends and AI predictions)</em></p>
+{% endif %}</body></html>
+""",
+}
+
+# Compiled once per process (workers import this module once); HTML output is autoescaped
+templates = {fmt: Environment(autoescape=fmt == "html", keep_trailing_newline=True).from_string(source)
+             for fmt, source in template_sources.items()}
+
+
+# 🏷 Anything that changes every report's output: template text + version
+def template_digest():
+    spec = json.dumps({"version": TEMPLATE_VERSION, "templates": template_sources}, sort_keys=True)
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", normalize_name(name)).strip("-") or "unknown"
+
+
+# 👥 One context per player, built from a single groupby over the season
+def player_contexts(df, projections, season, players=None):
+    df = df.assign(_key=df["Player"].astype(object).fillna("").map(normalize_name),
+                   predicted_pts=projections["predicted_pts"].to_numpy())
+    if players:
+        df = df[df["_key"].isin({normalize_name(name) for name in players})]
+
+    # Per-row content hashes summed per player (mod 2⁶⁴), so any changed row changes the player's digest
+    row_digests = pd.util.hash_pandas_object(df[["Player"] + stat_columns + ["predicted_pts"]], index=False)
+    groups = df.groupby("_key", sort=False).indices
+    hashes = row_digests.to_numpy()
+    records = df[stat_columns].to_dict("records")
+    names = df["Player"].to_numpy()
+    predicted = df["predicted_pts"].to_numpy()
+
+    contexts = {}
+    for key, positions in groups.items():
+        first = positions[0]
+        contexts[key] = {
+            "player": names[first],
+            "season": season,
+            "slug": slugify(key),
+            "columns": stat_columns,
+            "first": records[first],
+            "rows": [records[position] for position in positions],
+            "predicted_pts": None if np.isnan(predicted[first]) else float(predicted[first]),
+            "digest": f"{int(hashes[positions].sum(dtype=np.uint64)):016x}",
+        }
+    return contexts
+
+
+# 🧵 Worker: render and write one shard of reports
+def render_shard(jobs, output_dir, formats):
+    written = []
+    for job in jobs:
+        for fmt in formats:
+            path = os.path.join(output_dir, job["season"], f"{job['slug']}.{fmt}")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.write(templates[fmt].render(**job))
+            os.replace(tmp_path, path)
+            written.append(path)
+    return len(jobs), written
+
+
+def load_manifest(output_dir=REPORT_DIR):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_manifest(manifest, output_dir=REPORT_DIR):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+# 🚀 Render every changed report; returns counts + timings
+def generate_reports(seasons=None, players=None, formats=("md",), output_dir=REPORT_DIR, workers=None,
+                     force=False, shard_size=SHARD_SIZE):
+    started = time.perf_counter()
+    manifest = load_manifest(output_dir)
+    version = data_version()
+    templates_key = template_digest()
+    formats = tuple(formats)
+    pending, unchanged, removed = [], 0, 0
+
+    for season in seasons or season_sources:
+        df = load_frame(season)
+        artifact = get_serving_artifact(df, version=version and f"{version}:{season}")
+        projections = get_projection_table(df, artifact, season, version)
+        contexts = player_contexts(df, projections, season, players)
+        os.makedirs(os.path.join(output_dir, season), exist_ok=True)
+
+        season_manifest = manifest.setdefault(season, {})
+        for key, context in contexts.items():
+            digest = f"{context['digest']}:{artifact['key']}:{templates_key}:{','.join(formats)}"
+            context["digest"] = digest
+            if not force and season_manifest.get(context["slug"]) == digest:
+                unchanged += 1
+                continue
+            pending.append(context)
+
+        # Players gone from the season lose their reports (only on full runs)
+        if not players:
+            live = {context["slug"] for context in contexts.values()}
+            for slug in [slug for slug in season_manifest if slug not in live]:
+                for fmt in template_sources:
+                    path = os.path.join(output_dir, season, f"{slug}.{fmt}")
+                    if os.path.exists(path):
+                        os.remove(path)
+                del season_manifest[slug]
+                removed += 1
+    prepare_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    done = 0
+    shards = [pending[i:i + shard_size] for i in range(0, len(pending), shard_size)]
+    if shards:
+        with span("render.reports", reports=len(pending)), ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_shard, shard, output_dir, formats): shard for shard in shards}
+            for future in as_completed(futures):
+                count, _ = future.result()
+                done += count
+                for context in futures[future]:
+                    manifest[context["season"]][context["slug"]] = context["digest"]
+                elapsed = time.perf_counter() - started
+                print(f"  📝 {done:>7}/{len(pending)} reports  {done / elapsed:8.0f} reports/s", flush=True)
+        save_manifest(manifest, output_dir)
+    elif removed:
+        save_manifest(manifest, output_dir)
+
+    render_seconds = time.perf_counter() - started
+    return {"rendered": len(pending), "unchanged": unchanged, "removed": removed,
+            "prepare_seconds": prepare_seconds, "render_seconds": render_seconds}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render player reports for whole seasons to Markdown / HTML.")
+    parser.add_argument("--season", action="append", help="Seasons to render (repeatable, default: all)")
+    parser.add_argument("--player", action="append", help="Only these players (repeatable)")
+    parser.add_argument("--format", action="append", choices=sorted(template_sources),
+                        help="Output formats (repeatable, default: md)")
+    parser.add_argument("--output-dir", default=REPORT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Reports per pool task")
+    parser.add_argument("--force", action="store_true", help="Re-render even unchanged reports")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    result = generate_reports(args.season, args.player, args.format or ["md"], args.output_dir, args.workers,
+                              args.force, args.shard_size)
+    elapsed = time.perf_counter() - started
+    print(f"\n🎯 {result['rendered']} rendered, {result['unchanged']} unchanged, {result['removed']} removed "
+          f"in {elapsed:.2f}s (prepare {result['prepare_seconds']:.2f}s, render {result['render_seconds']:.2f}s)"
+          f" → {args.output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from instrument import span
+
+# 📊 Headless chart rendering for the EDA scripts, the model script and the dashboard.
+# A chart is (data slice, spec), e.g. {"kind": "box", "column": "PTS"}. Its PNG is cached under
+# data/charts/ by a hash of the columns the spec reads plus the spec itself, so an unchanged
+# chart is never drawn twice. Large inputs are reduced before drawing: box plots and histograms
+# are drawn from precomputed quartiles / bin counts, trends from binned quantiles, bars from the
+# top rows. Only those small payloads go to the render workers (matplotlib on the Agg backend,
+# never a window), and matplotlib is imported only when something actually has to be drawn.
+
+CHART_DIR = "data/charts"
+CHART_VERSION = 1
+CHART_DPI = 100
+HIST_BINS = 30
+MAX_FLIERS = 200  # outlier dots drawn per box plot (evenly spread over the sorted outliers)
+MAX_POINTS = 500  # x values a trend draws directly; above this x is binned into quantiles
+SHARD_SIZE = 8  # charts per pool task
+
+chart_stats = ["PTS", "EFF", "FG%", "TS%"]
+trend_stats = ["PPR", "EFF", "RPG", "APG"]
+margins = {
+    "default": {"left": 0.12, "right": 0.96, "top": 0.9, "bottom": 0.14},
+    "bar": {"left": 0.32, "right": 0.96, "top": 0.9, "bottom": 0.14},  # room for player names
+    "trend": {"left": 0.12, "right": 0.96, "top": 0.9, "bottom": 0.24},  # rotated season labels
+}
+
+# Process-wide cache: (version key, spec) → rendered path, so reruns skip hashing the data
+_paths = {}
+
+
+def spec_columns(spec):
+    columns = [spec[name] for name in ("x", "label", "column") if name in spec]
+    return columns + list(spec.get("y", []))
+
+
+# #️⃣ Hash of the columns the chart reads + the spec
+def chart_key(data, spec):
+    digest = hashlib.sha256(pd.util.hash_pandas_object(data[spec_columns(spec)], index=False).to_numpy().tobytes())
+    digest.update(json.dumps({"spec": spec, "version": CHART_VERSION}, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def chart_path(key, chart_dir=CHART_DIR):
+    return os.path.join(chart_dir, f"{key}.png")
+
+
+# 📦 Box-plot statistics (Tukey whiskers at 1.5 IQR), as matplotlib's bxp expects them
+def box_stats(values):
+    values = np.sort(values[~np.isnan(values)])
+    if not len(values):
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    fliers = values[(values < low) | (values > high)]
+    if len(fliers) > MAX_FLIERS:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(int)]
+    return {"q1": q1, "med": median, "q3": q3, "whislo": inside.min(), "whishi": inside.max(),
+            "fliers": fliers, "label": ""}
+
+
+# 🪶 Reduce (data, spec) to what the chart draws; payloads stay small whatever the input size
+def prepare(data, spec):
+    kind = spec["kind"]
+    if kind == "box":
+        return {"stats": box_stats(data[spec["column"]].to_numpy(dtype=np.float64))}
+    if kind == "hist":
+        values = data[spec["column"]].to_numpy(dtype=np.float64)
+        counts, edges = np.histogram(values[~np.isnan(values)], bins=spec.get("bins", HIST_BINS))
+        return {"counts": counts, "edges": edges}
+    if kind == "bar":
+        top = data.nlargest(spec.get("top", 10), spec["column"])
+        return {"labels": top[spec["label"]].fillna("Unknown").astype(str).tolist(),
+                "values": top[spec["column"]].to_numpy(dtype=np.float64)}
+    if kind == "trend":
+        x = data[spec["x"]]
+        numeric = pd.api.types.is_numeric_dtype(x)
+        if numeric and x.nunique() > MAX_POINTS:
+            x = pd.qcut(x, MAX_POINTS, duplicates="drop").map(lambda interval: interval.mid).astype(np.float64)
+        groups = data[list(spec["y"])].groupby(x.to_numpy(), sort=numeric)
+        bands = groups.quantile([0.1, 0.5, 0.9]).unstack().loc[groups.size().index]  # unstack sorts x
+        return {"x": bands.index.tolist(), "banded": bool(groups.size().max() > 1),
+                "series": {column: bands[column].to_numpy(dtype=np.float64).T for column in spec["y"]}}
+    raise ValueError(f"Unknown chart kind '{kind}'")
+
+
+def _pyplot():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+# 🖼 Draw one prepared chart to `path` (atomic write)
+def draw(payload, spec, path):
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=spec.get("size", (6, 4)))
+    kind = spec["kind"]
+    if kind == "box":
+        if payload["stats"] is not None:
+            style = {"widths": 0.6, "flierprops": {"marker": "d", "markersize": 4}}
+            try:
+                ax.bxp([payload["stats"]], orientation="horizontal", **style)
+            except TypeError:  # matplotlib < 3.10
+                ax.bxp([payload["stats"]], vert=False, **style)
+        ax.set_yticks([])
+        ax.set_xlabel(spec["column"])
+    elif kind == "hist":
+        ax.stairs(payload["counts"], payload["edges"], fill=True, alpha=0.8)
+        ax.set_xlabel(spec["column"])
+        ax.set_ylabel("Players")
+    elif kind == "bar":
+        positions = np.arange(len(payload["labels"]))
+        ax.barh(positions, payload["values"])
+        ax.set_yticks(positions, payload["labels"])
+        ax.invert_yaxis()
+        ax.set_xlabel(spec["column"])
+    else:
+        positions = np.arange(len(payload["x"]))
+        numeric = all(isinstance(value, (int, float)) for value in payload["x"])
+        xs = np.array(payload["x"], dtype=np.float64) if numeric else positions
+        for column, (low, median, high) in payload["series"].items():
+            line, = ax.plot(xs, median, marker="o" if len(xs) <= 20 else None, label=column)
+            if payload["banded"]:
+                ax.fill_between(xs, low, high, color=line.get_color(), alpha=0.2)
+        if not numeric:
+            ax.set_xticks(positions, payload["x"], rotation=20, ha="right")
+        ax.set_xlabel(spec["x"])
+        ax.legend()
+    ax.set_title(spec.get("title", ""))
+    # Fixed margins instead of tight_layout, which costs a full extra text layout pass per chart
+    fig.subplots_adjust(**margins.get(kind, margins["default"]))
+    fig.savefig(path + ".tmp", format="png", dpi=CHART_DPI)
+    plt.close(fig)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# Pool task: draw a batch of prepared charts
+def draw_shard(items):
+    return [draw(payload, spec, path) for payload, spec, path in items]
+
+
+# 🚀 Render many (data, spec) charts; cached ones are skipped and the rest are prepared here and
+# drawn on a process pool. Returns (paths in input order, number drawn).
+def render_charts(charts, chart_dir=CHART_DIR, workers=None, force=False, shard_size=SHARD_SIZE):
+    os.makedirs(chart_dir, exist_ok=True)
+    paths, pending, queued = [], [], set()
+    for data, spec in charts:
+        path = chart_path(chart_key(data, spec), chart_dir)
+        paths.append(path)
+        if (force or not os.path.exists(path)) and path not in queued:
+            queued.add(path)
+            pending.append((prepare(data, spec), spec, path))
+
+    if len(pending) <= 1 or workers == 1:
+        with span("charts.draw", charts=len(pending)):
+            draw_shard(pending)
+    else:
+        shards = [pending[i:i + shard_size] for i in range(0, len(pending), shard_size)]
+        with span("charts.draw", charts=len(pending)), ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(draw_shard, shard) for shard in shards]):
+                future.result()
+    return paths, len(pending)
+
+
+# 🖼 One chart's path, drawn in-process on a miss. With `version` (e.g. "<data version>:<season>")
+# repeat calls skip hashing the data.
+def get_chart(data, spec, version=None, chart_dir=CHART_DIR):
+    cache_key = version and (version, json.dumps(spec, sort_keys=True), chart_dir)
+    if cache_key in _paths and os.path.exists(_paths[cache_key]):
+        return _paths[cache_key]
+    path = render_charts([(data, spec)], chart_dir)[0][0]
+    if cache_key:
+        _paths[cache_key] = path
+    return path
+
+
+# 📋 Standard season charts: distributions of chart_stats + top-10 bars
+def season_charts(df, season):
+    charts = []
+    for column in chart_stats:
+        charts.append((df, {"kind": "box", "column": column, "title": f"{season}: {column} distribution"}))
+        charts.append((df, {"kind": "hist", "column": column, "title": f"{season}: {column} distribution"}))
+    for column in ("EFF", "PTS"):
+        charts.append((df, {"kind": "bar", "label": "Player", "column": column, "top": 10,
+                            "title": f"{season}: top 10 by {column}"}))
+    return charts
+
+
+def trend_spec(name):
+    return {"kind": "trend", "x": "season", "y": trend_stats, "title": f"{name}: season by season"}
+
+
+# 📈 trend_stats per player ID and season (oldest season first, aliases skipped), from the ID map
+_careers = {}
+
+
+def career_rows(version=None):
+    from dataset_store import distinct_seasons, load_frame, season_order
+    from player_identity import load_id_map, name_key, player_ids
+
+    if version in _careers:
+        return _careers[version]
+    id_map = load_id_map()
+    frames = []
+    for season in sorted(distinct_seasons(), key=season_order.index):
+        if not any(season in entry["seasons"] for entry in id_map["keys"].values()):
+            continue
+        df = load_frame(season, columns=["Player"] + trend_stats)
+        frames.append(df.assign(player_id=player_ids(df["Player"], id_map).to_numpy(), season=season,
+                                key=df["Player"].map(name_key).to_numpy()))
+    rows = pd.concat(frames, ignore_index=True).dropna(subset=["player_id"]) if frames else \
+        pd.DataFrame(columns=["Player", "player_id", "season", "key"] + trend_stats)
+    if version:
+        _careers[version] = rows
+    return rows
+
+
+# 📈 A player's season-by-season rows (empty when the name is not in the ID map)
+def player_trend(name, version=None):
+    from player_identity import name_key
+
+    rows = career_rows(version)
+    matches = rows[rows["key"] == name_key(name)]
+    if matches.empty:
+        return matches
+    return rows[rows["player_id"] == matches["player_id"].iat[0]]
+
+
+def main(argv=None):
+    from dataset_store import data_version, load_frame, season_sources
+
+    parser = argparse.ArgumentParser(description="Render season and player charts to data/charts/ (cached).")
+    parser.add_argument("--season", action="append", help="Seasons (repeatable, default: all)")
+    parser.add_argument("--players", action="store_true", help="Also render a trend chart for every player")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Redraw even cached charts")
+    parser.add_argument("--chart-dir", default=CHART_DIR)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    charts = []
+    for season in args.season or season_sources:
+        charts.extend(season_charts(load_frame(season), season))
+    if args.players:
+        rows = career_rows(data_version())
+        for _, player in rows.groupby("player_id", sort=False):
+            if player["season"].nunique() > 1:
+                charts.append((player, trend_spec(player["Player"].iat[-1])))
+
+    paths, drawn = render_charts(charts, args.chart_dir, args.workers, args.force)
+    print(f"\n🎯 {len(paths)} charts ({drawn} drawn, {len(paths) - drawn} cached) "
+          f"in {time.perf_counter() - started:.2f}s → {args.chart_dir}/")
+
+
+if __name__ == "__main__":
+    main()
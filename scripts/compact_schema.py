@@ -0,0 +1,131 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import load_frame, season_sources, source_path, standard_headers
+from metrics import derived_columns
+
+# 🗜 Compact in-memory schema for long-running processes holding many seasons / leagues.
+# Names and other identifiers become categoricals, box-score counts are downcast to int16
+# and rates to float32. Every downcast is validated against the frame it is applied to:
+# counts that are fractional or missing (the scraped layout shifts columns) fall back to
+# float32, and values outside a dtype's range are promoted (or rejected with strict=True)
+# instead of silently wrapping. The store on disk stays float64; this is a load-time view.
+
+count_columns = ["GP", "FT", "FGM", "FGA", "3PM", "3PA", "FTM", "FTA", "DREB", "OREB", "AST", "STL", "TO", "BLK",
+                 "PTS"]
+rate_columns = [col for col in standard_headers[1:] if col not in count_columns] + derived_columns
+
+compact_schema = {
+    "Player": "category",
+    **{col: "int16" for col in count_columns},
+    **{col: "float32" for col in rate_columns},
+}
+
+integer_ladder = ["int8", "int16", "int32", "int64"]
+
+
+# 🔢 Smallest integer dtype at least as wide as `target` that holds [low, high]
+def fitting_integer(target, low, high):
+    for dtype in integer_ladder[integer_ladder.index(target):]:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def _downcast(name, values, target, strict):
+    finite = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+    if target.startswith("int"):
+        if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+            low, high = (finite.min(), finite.max()) if len(finite) else (0, 0)
+            dtype = fitting_integer(target, low, high)
+            if dtype != target:
+                message = f"{name}: values {low:g}..{high:g} overflow {target}"
+                if strict:
+                    raise OverflowError(message)
+                print(f"⚠️ {message}; using {dtype}")
+            return values.astype(dtype)
+        # Missing or fractional values: no integer dtype can hold them exactly
+        target = "float32"
+
+    if len(finite) and np.abs(finite).max() > np.finfo(target).max:
+        message = f"{name}: values up to {np.abs(finite).max():g} overflow {target}"
+        if strict:
+            raise OverflowError(message)
+        print(f"⚠️ {message}; keeping {values.dtype}")
+        return values
+    return values.astype(target)
+
+
+# 🗜 Compact copy of a player-stats frame; columns outside compact_schema are left alone,
+# except string columns (league, season, team, …), which are always made categorical
+def compact_frame(df, strict=False):
+    columns = {}
+    for name in df.columns:
+        target = compact_schema.get(name)
+        column = df[name]
+        if target == "category" or (target is None and column.dtype == object):
+            columns[name] = column.astype("category")
+        elif target is None or column.dtype.kind not in "iuf":
+            columns[name] = column
+        else:
+            columns[name] = pd.Series(_downcast(name, column.to_numpy(), target, strict), index=df.index, name=name)
+    return pd.DataFrame(columns, index=df.index)
+
+
+# 🎯 Model feature matrix; float32 halves the memory of the search / batch scoring inputs
+def feature_matrix(df, feature_list, dtype=np.float64):
+    return df[list(feature_list)].to_numpy(dtype=dtype)
+
+
+def bytes_per_row(df):
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+# 📏 Bytes per row: legacy pd.read_csv vs float64 store frame vs compact frame
+def memory_report(seasons=None, data_dir="data"):
+    rows = []
+    for season in seasons or season_sources:
+        full = load_frame(season)
+        legacy = pd.read_csv(source_path(season_sources[season], data_dir))
+        compact = compact_frame(full)
+        rows.append({"season": season, "rows": len(full), "legacy_csv": bytes_per_row(legacy),
+                     "store": bytes_per_row(full), "compact": bytes_per_row(compact),
+                     "compact_dtypes": compact.dtypes.astype(str).value_counts().to_dict()})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare in-memory footprint of the loaders.")
+    parser.add_argument("--season", action="append", help="Seasons to report (repeatable, default: all)")
+    parser.add_argument("--rows", type=int, help="Also measure a synthetic league of about this many rows")
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args(argv)
+
+    rows = memory_report(args.season, args.data_dir)
+    if args.rows:
+        from dataset_store import with_metrics
+        from synthetic_league import generate_league, shape_for_rows
+
+        leagues, seasons, players = shape_for_rows(args.rows)
+        legacy = generate_league(leagues, seasons, players)
+        full, _ = with_metrics(legacy.drop(columns=["league", "season"]))
+        full = full.drop(columns="row_hash").assign(league=legacy["league"], season=legacy["season"])
+        compact = compact_frame(full)
+        rows.append({"season": f"synthetic ({leagues}×{seasons}×{players})", "rows": len(full),
+                     "legacy_csv": bytes_per_row(legacy), "store": bytes_per_row(full),
+                     "compact": bytes_per_row(compact),
+                     "compact_dtypes": compact.dtypes.astype(str).value_counts().to_dict()})
+
+    print(f"\n🗜 {'season':<30} {'rows':>10} {'read_csv B/row':>15} {'store B/row':>12} {'compact B/row':>14} "
+          f"{'saving':>7}")
+    for row in rows:
+        print(f"   {row['season']:<30} {row['rows']:>10,} {row['legacy_csv']:>15.0f} {row['store']:>12.0f} "
+              f"{row['compact']:>14.0f} {row['store'] / row['compact']:>6.1f}x")
+        print(f"   {'':<30} {', '.join(f'{count}×{dtype}' for dtype, count in row['compact_dtypes'].items())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,201 @@
-import pandas as pd
+import argparse
+import glob
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from ingest_schema import SCHEMA_VERSION, print_report, validate_stage
+from instrument import record, span
+
+# 🧼 Single-pass cleaning pipeline (replaces the data_cleaning.py → final_data_cleaning.py chain).
+# Each raw CSV is read once, run through the vectorized stages below and written to
+# data/processed/cleaned_<file>. Re-running is idempotent: inputs whose fingerprint and
+# pipeline version are unchanged are skipped, and output names never grow new prefixes.
+
+PIPELINE_VERSION = 1
+RAW_DIR = "data"
+PROCESSED_DIR = "data/processed"
+MANIFEST_FILE = "_cleaning_manifest.json"
+
+# 📋 Declarative stage list, applied in order
+stages = [
+    # Realign shifted player-stat tables and type them (see ingest_schema.py); other tables pass through
+    ("validate", {"schema_version": SCHEMA_VERSION}),
+    # Remove unnecessary columns if they exist
+    ("drop_columns", {"columns": ["Extra_0"]}),
+    # Missing strings → 'Unknown', missing numbers → column median
+    ("fill_missing", {"text_value": "Unknown"}),
+    # Clip extreme values: percentages to at most 100, FG% floor of 10, PPR capped at 30
+    ("clip", {"FG%": [10, 100], "PPR": [None, 30]}),
+]
+
+
+def drop_columns(df, columns):
+    return df.drop(columns=[col for col in columns if col in df.columns])
+
+
+def fill_missing(df, text_value):
+    numeric = df.select_dtypes(include="number").columns
+    text = df.columns.difference(numeric)
+    df[numeric] = df[numeric].fillna(df[numeric].median())
+    df[text] = df[text].fillna(text_value)
+    return df
+
+
+def clip(df, **bounds):
+    for col, (lower, upper) in bounds.items():
+        if col in df.columns:
+            df[col] = df[col].clip(lower=lower, upper=upper)
+    return df
+
+
+stage_functions = {"validate": validate_stage, "drop_columns": drop_columns, "fill_missing": fill_missing, "clip": clip}
+
+
+# 🏷 Pipeline version = code version + stage config, so editing a stage invalidates the cache
+def pipeline_version():
+    spec = json.dumps({"version": PIPELINE_VERSION, "stages": stages}, sort_keys=True)
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def file_fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def output_path_for(path, processed_dir=PROCESSED_DIR):
+    return os.path.join(processed_dir, f"cleaned_{os.path.basename(path)}")
+
+
+# 📄 One file through the same stages, in memory (delta batches that never land in data/processed)
+def read_cleaned(path):
+    df = pd.read_csv(path)
+    for name, params in stages:
+        df = stage_functions[name](df, **params)
+    return df
+
+
+# 🛠 Clean one file; runs inside a worker process and returns per-stage timings
+def clean_file(path, output_path):
+    timings = {}
+    started = time.perf_counter()
+    df = pd.read_csv(path)
+    timings["read"] = time.perf_counter() - started
+
+    validation = None
+    for name, params in stages:
+        started = time.perf_counter()
+        df = stage_functions[name](df, **params)
+        validation = df.attrs.get("validation", validation)
+        timings[name] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    tmp_path = output_path + ".tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+    timings["write"] = time.perf_counter() - started
+    return {"file": path, "output": output_path, "rows": len(df), "timings": timings, "validation": validation}
+
+
+def load_manifest(processed_dir=PROCESSED_DIR):
+    path = os.path.join(processed_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_manifest(manifest, processed_dir=PROCESSED_DIR):
+    with open(os.path.join(processed_dir, MANIFEST_FILE), "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+
+
+# 🚀 Clean every changed input on a process pool
+def run_pipeline(input_files, processed_dir=PROCESSED_DIR, workers=None, force=False):
+    os.makedirs(processed_dir, exist_ok=True)
+    manifest = load_manifest(processed_dir)
+    version = pipeline_version()
+
+    pending, skipped = [], []
+    for path in input_files:
+        output_path = output_path_for(path, processed_dir)
+        fingerprint = file_fingerprint(path)
+        entry = manifest.get(os.path.basename(path), {})
+        if (not force and entry.get("fingerprint") == fingerprint and entry.get("pipeline_version") == version
+                and os.path.exists(output_path)):
+            skipped.append(path)
+            continue
+        pending.append((path, output_path, fingerprint))
+
+    results = []
+    if pending:
+        with span("clean", files=len(pending)), ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(clean_file, path, output_path): (path, fingerprint)
+                       for path, output_path, fingerprint in pending}
+            for future, (path, fingerprint) in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"🚨 Error processing {path}: {str(e)}")
+                    continue
+                manifest[os.path.basename(path)] = {"fingerprint": fingerprint, "pipeline_version": version,
+                                                    "output": result["output"], "rows": result["rows"]}
+                results.append(result)
+                # Stage timings come back from the worker process; fold them into this process's trace
+                for stage, seconds in result["timings"].items():
+                    record(f"clean.{stage}", seconds, file=os.path.basename(path), worker=True)
 
-# Get list of CSV files from the current directory
-csv_files = [file for file in os.listdir() if file.endswith(".csv")]
+    save_manifest(manifest, processed_dir)
+    return results, skipped
 
-# Define columns that may contain extreme values
-extreme_columns = ["FG%", "PPR"]
 
-# Define columns to remove
-columns_to_remove = ["Extra_0"]
+# ⏱ Timing report: one row per file, one column per stage, plus stage totals
+def print_timing_report(results):
+    if not results:
+        return
+    report = pd.DataFrame({os.path.basename(r["file"]): r["timings"] for r in results}).T * 1000
+    report["total"] = report.sum(axis=1)
+    report.loc["TOTAL"] = report.sum()
+    print("\n⏱ Stage timings (ms):")
+    print(report.round(2).to_string())
 
-# Loop through all CSV files for cleaning
-for file in csv_files:
-    print(f"\n🛠 Cleaning: {file}")
 
-    try:
-        # Read CSV
-        df = pd.read_csv(file)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean raw scraped CSVs in one vectorized pass.")
+    parser.add_argument("inputs", nargs="*", help="CSV files to clean (default: data/*.csv)")
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-clean even if inputs are unchanged")
+    parser.add_argument("--no-store", action="store_true", help="Do not refresh the dataset store afterwards")
+    args = parser.parse_args(argv)
 
-        # Remove unnecessary columns if they exist
-        df = df.drop(columns=[col for col in columns_to_remove if col in df.columns], errors="ignore")
+    input_files = args.inputs or sorted(glob.glob(os.path.join(RAW_DIR, "*.csv")))
+    started = time.perf_counter()
+    results, skipped = run_pipeline(input_files, args.processed_dir, workers=args.workers, force=args.force)
 
-        # Fill missing values with appropriate replacements
-        for col in df.columns:
-            if df[col].isnull().sum() > 0:
-                if df[col].dtype == "object":
-                    df[col].fillna("Unknown", inplace=True)  # Fill missing strings with 'Unknown'
-                else:
-                    df[col].fillna(df[col].median(), inplace=True)  # Fill missing numeric values with median
+    for path in skipped:
+        print(f"⏭ Unchanged, skipped: {path}")
+    for result in results:
+        print(f"✅ Cleaned file saved: {result['output']} ({result['rows']} rows)")
+        if result["validation"]:
+            print_report(os.path.basename(result["file"]), result["validation"])
+    print_timing_report(results)
 
-        # Handle extreme values
-        for col in extreme_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(lambda x: x if x <= 100 else 100)  # Clip extreme percentages to 100
+    if results and not args.no_store:
+        from dataset_store import build_store
+        print("\n🗄 Refreshing dataset store:")
+        build_store()
 
-        # Save the cleaned dataset
-        cleaned_filename = f"cleaned_{file}"
-        df.to_csv(cleaned_filename, index=False)
-        print(f"✅ Cleaned file saved: {cleaned_filename}")
+    print(f"\n🎯 Data cleaning complete in {time.perf_counter() - started:.2f}s "
+          f"({len(results)} cleaned, {len(skipped)} skipped, pipeline {pipeline_version()})")
 
-    except Exception as e:
-        print(f"🚨 Error processing {file}: {str(e)}")
 
-print("\n🎯 Data cleaning complete!")
+if __name__ == "__main__":
+    main()
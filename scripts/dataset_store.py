@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs
+
+from instrument import span
+from metrics import METRICS_VERSION, compute_metrics_incremental, derived_columns
+
+# 🗄 Canonical columnar store for player stats.
+# One Arrow IPC (Feather v2) file per season under data/store/season=<key>/, written
+# uncompressed so readers can memory-map it and only touch the columns they ask for.
+# Derived metrics (metrics.py) are materialized at ingest next to a per-row content hash,
+# so a rebuild only recomputes them for rows that are new or changed.
+
+STORE_DIR = "data/store"
+META_FILE = "_store.json"
+STORE_VERSION = 3
+
+# Define standard headers for consistency across all datasets
+standard_headers = [
+    "Player", "GP", "FT", "FGM", "FGA", "FG%", "3PM", "3PA", "3P%", "FTM", "FTA", "FT%",
+    "DREB", "OREB", "AST", "STL", "TO", "BLK", "PTS", "RPG", "APG", "SPG", "BPG", "EFF", "PPR"
+]
+
+# 📐 Explicit schema: no dtype inference at load time. Stat columns stay float64 because
+# several scraped files carry NaN and fractional values in count columns.
+base_schema = pa.schema([pa.field("Player", pa.string())] +
+                        [pa.field(col, pa.float64()) for col in standard_headers[1:]])
+schema = pa.schema(list(base_schema) +
+                   [pa.field(col, pa.float64()) for col in derived_columns] +
+                   [pa.field("row_hash", pa.uint64())])
+
+# 📅 Season partitions and the scraped file each one comes from (standings live elsewhere)
+season_sources = {
+    "2023_24_regular_season": "2023_24_regular_season_statistics_stats.csv",
+    "2024_25_regular_season": "2024_25_regular_season_statistics_stats.csv",
+    "2024_spring": "2024_spring_statistics_stats.csv",
+    "summer": "summer_statistics_stats.csv",
+    "peg_city_basketball": "peg_city_basketball_stats.csv",
+}
+DEFAULT_SEASON = "peg_city_basketball"
+
+# 🪞 Seasons that are another season under a different page name (the league landing page
+# republishes the current regular season). Anything that combines seasons skips the alias.
+season_aliases = {"peg_city_basketball": "2024_25_regular_season"}
+
+# 🗓 Seasons oldest → newest (season_sources is in scrape order; "summer" is the 2024 summer league)
+season_order = ["2023_24_regular_season", "2024_spring", "summer", "2024_25_regular_season", "peg_city_basketball"]
+
+
+# 📅 Seasons to combine: an alias is dropped whenever the season it mirrors is also listed
+def distinct_seasons(seasons=None):
+    seasons = list(seasons or season_sources)
+    return [season for season in seasons if season_aliases.get(season) not in seasons]
+
+
+# 🔍 Cleaned copy of a scraped file (written by data_cleaning.py), else the raw scrape
+def source_path(filename, data_dir="data"):
+    cleaned = os.path.join(data_dir, "processed", f"cleaned_{filename}")
+    return cleaned if os.path.exists(cleaned) else os.path.join(data_dir, filename)
+
+
+def file_fingerprint(path, salt=""):
+    digest = hashlib.sha256(salt.encode())
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# 🧩 Coerce a loaded frame onto the base schema (missing columns become null)
+def coerce_frame(df):
+    df = df.reindex(columns=standard_headers)
+    df["Player"] = df["Player"].astype("string")
+    stats = df.columns[1:]
+    df[stats] = df[stats].apply(pd.to_numeric, errors="coerce").astype("float64")
+    return df
+
+
+# #️⃣ Content hash of each row's base columns; derived metrics are reused while it is unchanged
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df[standard_headers], index=False).to_numpy(dtype=np.uint64)
+
+
+# ➕ Attach derived metrics + row_hash; `previous` (row_hash + derived columns of the last
+# build) lets unchanged rows skip the recompute. Returns (frame, recomputed row count).
+def with_metrics(df, previous=None):
+    df = coerce_frame(df)
+    hashes = row_hashes(df)
+    metrics, recomputed = compute_metrics_incremental(df, hashes, previous)
+    df = pd.concat([df, metrics], axis=1)
+    df["row_hash"] = hashes
+    return df, recomputed
+
+
+def to_table(df, previous=None):
+    df, _ = with_metrics(df, previous)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def _write_partition(table, season, store_dir):
+    partition = os.path.join(store_dir, f"season={season}")
+    tmp_partition = partition + ".tmp"
+    shutil.rmtree(tmp_partition, ignore_errors=True)
+    os.makedirs(tmp_partition)
+    with pa.OSFile(os.path.join(tmp_partition, "part-0.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    shutil.rmtree(partition, ignore_errors=True)
+    os.replace(tmp_partition, partition)
+
+
+# Stored row_hash + derived columns of one season, or None if there is no compatible partition
+# (missing, other schema, or built with another METRICS_VERSION)
+def _read_previous_metrics(season, store_dir, metrics_version=None):
+    if metrics_version != METRICS_VERSION:
+        return None
+    path = os.path.join(store_dir, f"season={season}", "part-0.arrow")
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    if not table.schema.equals(schema):
+        return None
+    return table.select(["row_hash"] + derived_columns).to_pandas()
+
+
+def read_meta(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+# 🏗 Build (or refresh) the store; seasons whose source file is unchanged are skipped.
+# Sources are validated (and realigned) once here, see ingest_schema.py; the store is the typed cache.
+def build_store(store_dir=STORE_DIR, data_dir="data", seasons=None, force=False):
+    from ingest_schema import SCHEMA_VERSION, validate_frame
+
+    meta = read_meta(store_dir) or {}
+    if meta.get("store_version") != STORE_VERSION:
+        meta = {}
+    partitions = meta.get("partitions", {})
+
+    for season, filename in season_sources.items():
+        if seasons and season not in seasons:
+            continue
+        path = source_path(filename, data_dir)
+        if not os.path.exists(path):
+            print(f"⚠️ No source for {season}: {path}")
+            continue
+        fingerprint = file_fingerprint(path, salt=f"ingest-v{SCHEMA_VERSION}:metrics-v{METRICS_VERSION}")
+        if not force and partitions.get(season, {}).get("fingerprint") == fingerprint:
+            print(f"⏭ {season}: unchanged ({os.path.basename(path)})")
+            continue
+        with span("store.build", season=season):
+            stored_version = partitions.get(season, {}).get("metrics_version")
+            previous = None if force else _read_previous_metrics(season, store_dir, stored_version)
+            validated, report = validate_frame(pd.read_csv(path))
+            df, recomputed = with_metrics(validated, previous)
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            _write_partition(table, season, store_dir)
+        violations = sum(report["check_failures"].values()) + sum(report["range_errors"].values())
+        partitions[season] = {"source": path, "fingerprint": fingerprint, "rows": table.num_rows,
+                              "metrics_version": METRICS_VERSION,
+                              "validation": {"realigned": report["repaired"], "violations": violations}}
+        print(f"✅ {season}: {table.num_rows} rows from {path} (metrics recomputed for {recomputed}, "
+              f"{report['repaired']} realigned, {violations} rule violations)")
+
+    meta = {"store_version": STORE_VERSION, "schema": schema.to_string(), "partitions": partitions,
+            "data_version": data_version_of(partitions)}
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, META_FILE), "w") as fh:
+        json.dump(meta, fh, indent=2)
+    return meta
+
+
+def data_version_of(partitions):
+    key = json.dumps({season: part["fingerprint"] for season, part in sorted(partitions.items())})
+    return hashlib.sha256(f"{STORE_VERSION}:{key}".encode()).hexdigest()[:16]
+
+
+# 🏷 Short hash identifying the store contents; caches and artifacts key on it
+def data_version(store_dir=STORE_DIR):
+    meta = read_meta(store_dir)
+    return meta["data_version"] if meta else None
+
+
+def open_dataset(store_dir=STORE_DIR):
+    return ds.dataset(store_dir, format="ipc", partitioning="hive",
+                      schema=schema.append(pa.field("season", pa.string())),
+                      filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+# 📥 Read from the store with projection and filter pushdown, e.g.
+#   load_table(columns=["Player", "PTS"], seasons=["2024_spring"], filter=ds.field("GP") >= 5)
+def load_table(columns=None, seasons=None, filter=None, store_dir=STORE_DIR):
+    dataset = open_dataset(store_dir)
+    if seasons:
+        season_filter = ds.field("season").isin(list(seasons))
+        filter = season_filter if filter is None else season_filter & filter
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+# 🐼 Pandas view of one season; falls back to the CSV when the store has not been built yet.
+# compact=True returns the categorical / int16 / float32 view from compact_schema.py.
+def load_frame(season=DEFAULT_SEASON, columns=None, filter=None, store_dir=STORE_DIR, data_dir="data", compact=False):
+    if compact:
+        from compact_schema import compact_frame
+        return compact_frame(load_frame(season, columns, filter, store_dir, data_dir))
+
+    columns = columns or [name for name in schema.names if name != "row_hash"]
+    meta = read_meta(store_dir)
+    if meta and season in meta.get("partitions", {}):
+        with span("store.load", season=season):
+            return load_table(columns=columns, seasons=[season], filter=filter, store_dir=store_dir).to_pandas()
+
+    path = source_path(season_sources[season], data_dir)
+    print(f"⚠️ Dataset store not built for {season}; reading {path} (run: python scripts/dataset_store.py build)")
+    from ingest_schema import read_validated
+    df = to_table(read_validated(path)).to_pandas()
+    if filter is not None:
+        df = pa.Table.from_pandas(df, preserve_index=False).filter(filter).to_pandas()
+    return df[columns]
+
+
+def list_seasons(store_dir=STORE_DIR):
+    meta = read_meta(store_dir)
+    return sorted(meta["partitions"]) if meta else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the columnar player-stats store.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--season", action="append", help="Limit to these seasons (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Rewrite partitions even if sources are unchanged")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        meta = build_store(args.store_dir, args.data_dir, seasons=args.season, force=args.force)
+        print(f"\n🎯 Store ready in {time.perf_counter() - started:.2f}s (data version {meta['data_version']})")
+
+        # 🪪 Keep cross-season player IDs in step with the store (only changed seasons are read)
+        from player_identity import update_id_map
+        id_map, stats = update_id_map(store_dir=args.store_dir)
+        print(f"🪪 Player IDs: {stats['new_keys']} new names, {len(stats['fuzzy_merges'])} fuzzy merges, "
+              f"{stats['new_players']} new players ({len(id_map['keys'])} names known)")
+
+        # 🏆 Rebuild the materialized leaderboards of changed partitions
+        from leaderboards import build_all
+        print(f"🏆 Leaderboards: {len(build_all(args.season, store_dir=args.store_dir))} seasons ready")
+
+        # 🧊 Re-aggregate the cube cells of changed partitions and standings tables
+        from stat_cube import build_cube
+        cube, updated = build_cube(store_dir=args.store_dir, data_dir=args.data_dir)
+        print(f"🧊 Cube: {len(updated)} sources updated ({len(cube.rows)} materialized rows)")
+    else:
+        meta = read_meta(args.store_dir)
+        if not meta:
+            print("🚨 Store not built yet.")
+            return
+        print(f"📦 Data version {meta['data_version']}")
+        for season, part in sorted(meta["partitions"].items()):
+            print(f"  {season:<24} {part['rows']:>8} rows  ← {part['source']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,21 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, r2_score
 
-# 📥 Load Dataset
-file_path = "data/processed/final_final_cleaned_peg_city_basketball_cleaned.csv"  # Adjust path if needed
-df = pd.read_csv(file_path)
+from charts import get_chart
+from dataset_store import load_frame
+from leaderboards import get_leaderboards
+from profiler import profile_frame
 
-# 🛠 Convert Only Numeric Columns (Prevents String Errors)
-numeric_cols = df.select_dtypes(include=["number"]).columns
-df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+# 📥 Load Dataset (typed columnar store, see dataset_store.py)
+df = load_frame("peg_city_basketball")
 
-# 🔍 Identify Outliers (IQR Method)
-Q1 = df[numeric_cols].quantile(0.25)
-Q3 = df[numeric_cols].quantile(0.75)
-IQR = Q3 - Q1
-
-outliers = ((df[numeric_cols] < (Q1 - 1.5 * IQR)) | (df[numeric_cols] > (Q3 + 1.5 * IQR))).sum()
+# 🔍 Identify Outliers (IQR Method, one streaming pass, see profiler.py)
+outliers = profile_frame(df).summary()["outliers"].dropna().astype(int)
 print("\n🚨 Outlier Count per Column:\n", outliers)
 
-# 📊 Visualization of Extreme Players in PTS
-plt.figure(figsize=(6, 4))
-sns.boxplot(data=df, x="PTS")
-plt.title("Distribution of Points (PTS)")
-plt.show()
+# 📊 Visualization of Extreme Players in PTS (rendered off-screen and cached, see charts.py)
+print("\n📊 PTS box plot:", get_chart(df, {"kind": "box", "column": "PTS", "title": "Distribution of Points (PTS)"}))
 
 # 🔮 Predictive Model: FG% -> PTS (Can Shooting Efficiency Predict Scoring?)
 X = df[["FG%"]]  # Feature
@@ -49,5 +39,6 @@ print(f"\n🔮 Model Performance:\nMean Absolute Error: {mae:.2f}, R-squared: {r
 # 🏆 Top Players by Efficiency (Fixing Missing Player Names)
 df["Player"] = df["Player"].fillna("Unknown")  # Fill missing names
 
-top_players = df.sort_values(by="EFF", ascending=False).head(10)
+top_players = get_leaderboards("peg_city_basketball", df=df).top("EFF", 10)  # Materialized board, see leaderboards.py
+top_players["Player"] = top_players["Player"].fillna("Unknown")
 print("\n🏆 Top Efficient Players:\n", top_players[["Player", "PTS", "FG%", "EFF"]])
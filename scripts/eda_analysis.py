@@ -1,30 +1,33 @@
-import pandas as pd
-import os
+from dataset_store import season_sources
+from profiler import Profile, profile_season
 
-# Get list of CSV files from the current directory
-csv_files = [file for file in os.listdir() if file.endswith(".csv")]
-
-# Loop through all CSV files for EDA
-for file in csv_files:
-    print(f"\n🔍 Analyzing: {file}")
+# Loop through every season in the dataset store for EDA; each season is profiled in one
+# streaming pass (see profiler.py) and the per-season profiles merge into a league-wide one
+league = Profile()
+for season in season_sources:
+    print(f"\n🔍 Analyzing: {season}")
 
     try:
-        # Read CSV
-        df = pd.read_csv(file)
+        profile = profile_season(season)
+        summary = profile.summary()
 
         # Display basic information
-        print("\n📊 Data Overview:")
-        print(df.info())
+        print(f"\n📊 Data Overview: {profile.rows} rows, {len(summary)} columns")
 
         # Display missing values
         print("\n⚠️ Missing Values:")
-        print(df.isnull().sum())
+        print(summary["nulls"].astype(int).to_string())
 
         # Display summary statistics
         print("\n📈 Summary Statistics:")
-        print(df.describe())
+        print(summary.drop(columns="nulls").dropna(how="all").to_string(float_format=lambda value: f"{value:.2f}"))
+
+        league.merge(profile)
 
     except Exception as e:
-        print(f"🚨 Error processing {file}: {str(e)}")
+        print(f"🚨 Error processing {season}: {str(e)}")
+
+print(f"\n📚 All seasons ({league.rows} rows):")
+print(league.summary().to_string(float_format=lambda value: f"{value:.2f}"))
 
 print("\n✅ EDA complete!")
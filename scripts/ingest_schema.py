@@ -0,0 +1,279 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import standard_headers
+
+# 🧾 Declarative ingest schema for scraped player-stat tables, validated once per file.
+# The site's tables do not always line up with their headers: most carry an unlabeled column
+# between FT and FGM, so every later value sits one header to the left (FGM holds 0, FGA holds
+# FGM, …), and some seasons leave out the rebound/assist/steal block entirely. Each row is read
+# under every known site layout. The compiled consistency checks (FGM ≤ FGA, FG% ≈ FGM/FGA,
+# PTS = 2·FGM + 3PM + FTM, per-game ≈ total/GP) are scored on every layout at once, and the best
+# layout wins. A row keeps the file's layout unless another one clearly fits it better. The result is a typed frame in
+# standard_headers order plus a report of what was repaired and which rows still break a rule.
+# Tables no layout explains (standings, person lists) are left untouched.
+
+SCHEMA_VERSION = 2
+ROW_MARGIN = 2  # points a row's best layout must beat the file's layout by to override it
+
+count_columns = ["GP", "FT", "FGM", "FGA", "3PM", "3PA", "FTM", "FTA", "DREB", "OREB", "AST", "STL", "TO", "BLK",
+                 "PTS"]
+percent_columns = ["FG%", "3P%", "FT%"]
+
+# 📐 Column types and ranges
+column_schema = {
+    "Player": {"type": "string"},
+    **{col: {"type": "count", "min": 0} for col in count_columns},
+    **{col: {"type": "percent", "min": 0, "max": 100} for col in percent_columns},
+    **{col: {"type": "rate", "min": 0} for col in ["RPG", "APG", "SPG", "BPG"]},
+    "EFF": {"type": "rate"},
+    "PPR": {"type": "rate"},
+    "PPG": {"type": "rate", "min": 0},
+}
+
+# ✅ Consistency rules; per-game and percentage columns are rounded to one decimal on the site
+checks = [
+    {"name": "FGM ≤ FGA", "kind": "le", "left": "FGM", "right": "FGA"},
+    {"name": "3PM ≤ 3PA", "kind": "le", "left": "3PM", "right": "3PA"},
+    {"name": "FTM ≤ FTA", "kind": "le", "left": "FTM", "right": "FTA"},
+    {"name": "3PM ≤ FGM", "kind": "le", "left": "3PM", "right": "FGM"},
+    {"name": "FG% ≈ FGM/FGA", "kind": "ratio", "column": "FG%", "terms": ["FGM"], "per": "FGA", "scale": 100,
+     "tol": 0.1},
+    {"name": "3P% ≈ 3PM/3PA", "kind": "ratio", "column": "3P%", "terms": ["3PM"], "per": "3PA", "scale": 100,
+     "tol": 0.1},
+    {"name": "FT% ≈ FTM/FTA", "kind": "ratio", "column": "FT%", "terms": ["FTM"], "per": "FTA", "scale": 100,
+     "tol": 0.1},
+    {"name": "PTS = 2·FGM + 3PM + FTM", "kind": "sum", "column": "PTS", "terms": {"FGM": 2, "3PM": 1, "FTM": 1},
+     "tol": 0},
+    {"name": "RPG ≈ REB/GP", "kind": "ratio", "column": "RPG", "terms": ["DREB", "OREB"], "per": "GP", "scale": 1,
+     "tol": 0.06},
+    {"name": "APG ≈ AST/GP", "kind": "ratio", "column": "APG", "terms": ["AST"], "per": "GP", "scale": 1, "tol": 0.06},
+    {"name": "SPG ≈ STL/GP", "kind": "ratio", "column": "SPG", "terms": ["STL"], "per": "GP", "scale": 1, "tol": 0.06},
+    {"name": "BPG ≈ BLK/GP", "kind": "ratio", "column": "BPG", "terms": ["BLK"], "per": "GP", "scale": 1, "tol": 0.06},
+    {"name": "PPG ≈ PTS/GP", "kind": "ratio", "column": "PPG", "terms": ["PTS"], "per": "GP", "scale": 1, "tol": 0.06},
+]
+
+# Columns the site serves that are checked but not stored (points per game is PTS_PG in metrics.py)
+checked_columns = ["PPG"]
+
+# 🗺 Value order of each table layout the site has served (None = unlabeled column, dropped).
+# The shifted layouts end in points per game, then EFF where the table has it; no layout
+# carries a PPR value, so PPR stays empty for them.
+shooting = ["FGM", "FGA", "FG%", "3PM", "3PA", "3P%", "FTM", "FTA", "FT%"]
+layouts = {
+    "labeled": standard_headers[1:],
+    "box_score": ["GP", "FT", None] + shooting + ["DREB", "OREB", "AST", "STL", "TO", "BLK", "PTS", "RPG", "APG",
+                                                  "SPG", "BPG", "PPG", "EFF"],
+    "scoring": ["GP", "FT", None] + shooting + ["PTS", "RPG", "APG", "SPG", "BPG", "PPG"],
+    "per_game": ["GP", "FT", None] + shooting + ["RPG", "APG", "SPG", "BPG", "PPG"],
+}
+
+
+# ⚙️ Rule → vectorized function of {column: array} returning (applicable, passed) masks
+def compile_check(rule):
+    kind = rule["kind"]
+    if kind == "le":
+        def check(values):
+            left, right = values[rule["left"]], values[rule["right"]]
+            applicable = ~np.isnan(left) & ~np.isnan(right)
+            return applicable, left <= right
+    elif kind == "ratio":
+        def check(values):
+            total = sum(values[term] for term in rule["terms"])
+            per, column = values[rule["per"]], values[rule["column"]]
+            # Zero totals fit any layout (0 / anything = 0), so they are not evidence either way
+            applicable = (total > 0) & ~np.isnan(column) & (per > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                expected = rule["scale"] * total / per
+            return applicable, np.abs(column - expected) <= rule["tol"] + 1e-9
+    elif kind == "sum":
+        def check(values):
+            expected = sum(weight * values[term] for term, weight in rule["terms"].items())
+            column = values[rule["column"]]
+            applicable = ~np.isnan(expected) & ~np.isnan(column)
+            return applicable, np.abs(column - expected) <= rule["tol"] + 1e-9
+    else:
+        raise ValueError(f"Unknown check kind '{kind}'")
+    return rule["name"], check
+
+
+# 📦 Schema compiled once per process: checks as functions, ranges as per-column bounds
+class CompiledSchema:
+    def __init__(self, columns=column_schema, rules=checks, layout_map=layouts):
+        self.checks = [compile_check(rule) for rule in rules]
+        self.bounds = {col: (spec.get("min", -np.inf), spec.get("max", np.inf), spec["type"] == "count")
+                       for col, spec in columns.items() if spec["type"] != "string"}
+        self.layouts = layout_map
+        self.names = list(layout_map)
+
+    # Observed value columns (after Player, in file order) read as one layout: {column: array}
+    def read_as(self, observed, layout):
+        empty = np.full(len(observed[0]) if observed else 0, np.nan)
+        values = dict.fromkeys(standard_headers[1:] + checked_columns, empty)
+        for position, col in enumerate(self.layouts[layout]):
+            if col is not None:
+                values[col] = observed[position] if position < len(observed) else empty
+        return values
+
+    # Cells outside the column's range (or fractional counts)
+    def range_errors(self, col, values):
+        low, high, integer = self.bounds[col]
+        with np.errstate(invalid="ignore"):
+            bad = (values < low) | (values > high)
+            if integer:
+                bad |= values != np.round(values)
+        return bad & ~np.isnan(values)
+
+    # Passed checks minus failed checks minus out-of-range cells, per row. `cache` shares the
+    # range test of an observed column read as the same header across layouts.
+    def score(self, observed, layout, cache):
+        values = self.read_as(observed, layout)
+        total = np.zeros(len(observed[0]))
+        for position, col in enumerate(self.layouts[layout][:len(observed)]):
+            if col is not None:
+                if (position, col) not in cache:
+                    cache[position, col] = self.range_errors(col, observed[position])
+                total -= cache[position, col]
+        for _, check in self.checks:
+            applicable, passed = check(values)
+            total += np.where(applicable, np.where(passed, 1, -1), 0)
+        return total
+
+
+_compiled = None
+
+
+def compiled_schema():
+    global _compiled
+    if _compiled is None:
+        _compiled = CompiledSchema()
+    return _compiled
+
+
+# 🔢 Every column after Player as a float64 array, once; cells that are present but not numbers are counted
+def numeric_columns(df):
+    columns, type_errors = [], {}
+    for name in df.columns[1:]:
+        raw = df[name]
+        values = pd.to_numeric(raw, errors="coerce") if raw.dtype == object else raw
+        bad = int((values.isna() & raw.notna()).sum())
+        if bad:
+            type_errors[name] = bad
+        columns.append(values.to_numpy(dtype=np.float64, na_value=np.nan))
+    return columns, type_errors
+
+
+# 📏 Position of each row's last value + 1
+def row_lengths(observed):
+    lengths = np.zeros(len(observed[0]), dtype=np.int64)
+    for position in range(len(observed) - 1, -1, -1):
+        lengths = np.where((lengths == 0) & ~np.isnan(observed[position]), position + 1, lengths)
+    return lengths
+
+
+# 🩺 Validate (and realign) one scraped table. Returns (frame, report); the frame is typed on
+# standard_headers (Player string, stats float64) unless the table is not a player-stats table.
+def validate_frame(df, schema=None):
+    schema = schema or compiled_schema()
+    report = {"rows": len(df), "recognized": False, "layouts": {}, "repaired": 0, "type_errors": {},
+              "range_errors": {}, "check_failures": {}}
+    if len(df) == 0 or len(df.columns) < 2 or df.columns[0] != "Player":
+        return df, report
+
+    observed, report["type_errors"] = numeric_columns(df)
+    # Layouts are also penalised for every trailing value they leave unexplained
+    lengths, cache = row_lengths(observed), {}
+    scores = np.column_stack([schema.score(observed, layout, cache) -
+                              np.maximum(lengths - len(schema.layouts[layout]), 0) for layout in schema.names])
+    if not (scores > 0).any():
+        return df, report
+
+    # File layout = best total score; a row only leaves it on clear evidence (short rows, e.g.
+    # one game played, where per-game and total columns hold the same numbers, are ambiguous)
+    preferred = int(np.argmax(scores.sum(axis=0)))
+    bias = np.zeros(len(schema.names))
+    bias[preferred] = ROW_MARGIN - 0.5
+    chosen = np.argmax(scores + bias, axis=1)
+
+    stats = standard_headers[1:]
+    repaired = {col: np.full(len(df), np.nan) for col in stats + checked_columns}
+    for number, layout in enumerate(schema.names):
+        rows = chosen == number
+        if rows.all():
+            repaired = {col: values.copy() for col, values in schema.read_as(observed, layout).items()}
+        elif rows.any():
+            for col, values in schema.read_as([values[rows] for values in observed], layout).items():
+                repaired[col][rows] = values
+        if rows.any():
+            report["layouts"][layout] = int(rows.sum())
+
+    out = pd.DataFrame({col: repaired[col] for col in stats}, index=df.index)
+    out.insert(0, "Player", df["Player"].astype("string"))
+
+    for col in stats + checked_columns:
+        errors = int(schema.range_errors(col, repaired[col]).sum())
+        if errors:
+            report["range_errors"][col] = errors
+    for name, check in schema.checks:
+        applicable, passed = check(repaired)
+        failed = int((applicable & ~passed).sum())
+        if failed:
+            report["check_failures"][name] = failed
+    report["recognized"] = True
+    report["repaired"] = int((chosen != schema.names.index("labeled")).sum())
+    return out, report
+
+
+# 📥 pd.read_csv + validate_frame, for readers of raw scrapes and scraper deltas
+def read_validated(path):
+    return validate_frame(pd.read_csv(path))[0]
+
+
+# 🧼 data_cleaning.py stage: realign and type player-stat tables, leave anything else as it is.
+# schema_version is part of the stage config, so a schema change re-cleans every file.
+def validate_stage(df, schema_version=SCHEMA_VERSION):
+    validated, report = validate_frame(df)
+    validated.attrs["validation"] = report
+    return validated
+
+
+def print_report(name, report):
+    if not report["recognized"]:
+        print(f"⏭ {name}: not a player stats table ({report['rows']} rows), left as is")
+        return
+    layouts = ", ".join(f"{count} {layout}" for layout, count in report["layouts"].items())
+    print(f"✅ {name}: {report['rows']} rows ({layouts}); {report['repaired']} realigned")
+    for label, errors in [("non-numeric", report["type_errors"]), ("out of range", report["range_errors"]),
+                          ("failed check", report["check_failures"])]:
+        for column, count in errors.items():
+            print(f"   ⚠️ {count:>5} {label}: {column}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate scraped stat tables against the ingest schema.")
+    parser.add_argument("inputs", nargs="*", help="CSV files (default: the raw scrapes in data/)")
+    parser.add_argument("--json", help="Write the per-file reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    reports = {}
+    for path in args.inputs or sorted(glob.glob(os.path.join("data", "*.csv"))):
+        _, report = validate_frame(pd.read_csv(path))
+        reports[path] = report
+        print_report(os.path.basename(path), report)
+    print(f"\n🎯 Validated {len(reports)} files in {time.perf_counter() - started:.2f}s (schema v{SCHEMA_VERSION})")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(reports, fh, indent=2)
+        print(f"💾 Reports written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from ingest_schema import print_report, validate_frame
+
 # Get list of CSV files from the current directory
 csv_files = [file for file in os.listdir() if file.endswith(".csv")]
 
@@ -31,6 +33,9 @@ for file in csv_files:
         if extra_headers:
             print(f"⚠️ Extra headers found: {extra_headers}")
 
+        # Column shifts, types, ranges and box-score identities (see ingest_schema.py)
+        print_report(file, validate_frame(df)[1])
+
     except Exception as e:
         print(f"🚨 Error reading {file}: {str(e)}")
 
@@ -0,0 +1,223 @@
+import argparse
+import functools
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import psutil
+
+# 🩺 Lightweight pipeline instrumentation: timing + memory spans around each stage
+# (scraping, cleaning, metrics, training, prediction, rendering), exportable as JSON or as a
+# Chrome trace (chrome://tracing, Perfetto). Disabled by default; while disabled, span() hands
+# back one shared no-op context manager, so instrumented code pays a single flag check.
+# Enable with GAMECHANGER_TRACE=1, instrument.enable(), or by running a script through this one
+# (its spans are also kept in data/perf/<script>-last_run.json for the dashboard's perf panel):
+#   python scripts/instrument.py --chrome trace.json scripts/data_cleaning.py
+
+PERF_DIR = "data/perf"
+LAST_RUN_FILE = "last_run.json"
+MAX_SPANS = 100_000  # oldest spans are dropped, so a long-running traced process stays bounded
+
+_enabled = os.environ.get("GAMECHANGER_TRACE", "") not in ("", "0")
+_spans = deque(maxlen=MAX_SPANS)
+_local = threading.local()
+_process = psutil.Process()
+_null_span = nullcontext()
+_origin = time.perf_counter()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    global _origin
+    _spans.clear()
+    _origin = time.perf_counter()
+
+
+def spans():
+    return list(_spans)
+
+
+class _Span:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stack", [])
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        self.rss = _process.memory_info().rss
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        ended = time.perf_counter()
+        rss = _process.memory_info().rss
+        _local.stack.pop()
+        _spans.append({
+            "name": self.name,
+            "parent": self.parent,
+            "depth": self.depth,
+            "start_ms": (self.started - _origin) * 1000,
+            "duration_ms": (ended - self.started) * 1000,
+            "rss_mb": rss / 2**20,
+            "rss_delta_mb": (rss - self.rss) / 2**20,
+            "pid": os.getpid(),
+            "thread": threading.get_ident(),
+            "error": exc_type.__name__ if exc_type else None,
+            **self.attrs,
+        })
+        return False
+
+
+# ⏱ with span("clean.fill_missing", rows=len(df)): ...
+def span(name, **attrs):
+    if not _enabled:
+        return _null_span
+    return _Span(name, attrs)
+
+
+# 🧾 Add a span timed elsewhere (e.g. per-stage timings returned by a worker process)
+def record(name, seconds, **attrs):
+    if not _enabled:
+        return
+    stack = getattr(_local, "stack", None)
+    ended = time.perf_counter()
+    _spans.append({"name": name, "parent": stack[-1].name if stack else None, "depth": len(stack or ()),
+                   "start_ms": (ended - seconds - _origin) * 1000, "duration_ms": seconds * 1000,
+                   "rss_mb": None, "rss_delta_mb": 0.0, "pid": os.getpid(), "thread": threading.get_ident(),
+                   "error": None, **attrs})
+
+
+# 🎀 Decorator form: @traced("train.fit")
+def traced(name=None):
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# 📋 Total / count / mean per span name, slowest first
+def summary(records=None):
+    totals = {}
+    for record in records if records is not None else _spans:
+        entry = totals.setdefault(record["name"], {"name": record["name"], "calls": 0, "total_ms": 0.0,
+                                                   "max_ms": 0.0, "rss_delta_mb": 0.0})
+        entry["calls"] += 1
+        entry["total_ms"] += record["duration_ms"]
+        entry["max_ms"] = max(entry["max_ms"], record["duration_ms"])
+        entry["rss_delta_mb"] += record["rss_delta_mb"]
+    return sorted(totals.values(), key=lambda entry: -entry["total_ms"])
+
+
+def export_json(path, records=None):
+    _write(path, {"spans": records if records is not None else spans(), "summary": summary(records)})
+
+
+# 🧭 Chrome trace-event format: one complete ("X") event per span, times in µs
+def export_chrome_trace(path, records=None):
+    events = [{"name": record["name"], "ph": "X", "ts": record["start_ms"] * 1000, "dur": record["duration_ms"] * 1000,
+               "pid": record["pid"], "tid": record["thread"],
+               "args": {key: value for key, value in record.items()
+                        if key not in ("name", "start_ms", "duration_ms", "pid", "thread")}}
+              for record in (records if records is not None else _spans)]
+    _write(path, {"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+def save_last_run(name, perf_dir=PERF_DIR):
+    path = os.path.join(perf_dir, f"{name}-{LAST_RUN_FILE}")
+    export_json(path)
+    return path
+
+
+def load_last_run(name, perf_dir=PERF_DIR):
+    path = os.path.join(perf_dir, f"{name}-{LAST_RUN_FILE}")
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+# 📂 Names with a saved last run, e.g. ["dashboard", "data_cleaning"]
+def list_last_runs(perf_dir=PERF_DIR):
+    if not os.path.isdir(perf_dir):
+        return []
+    suffix = f"-{LAST_RUN_FILE}"
+    return sorted(name[:-len(suffix)] for name in os.listdir(perf_dir) if name.endswith(suffix))
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(payload, fh, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def print_summary(records=None):
+    rows = summary(records)
+    if not rows:
+        print("⚠️ No spans recorded.")
+        return
+    print(f"\n🩺 {'stage':<36} {'calls':>6} {'total ms':>10} {'max ms':>9} {'ΔRSS MB':>8}")
+    for row in rows:
+        print(f"   {row['name']:<36} {row['calls']:>6} {row['total_ms']:>10.1f} {row['max_ms']:>9.1f} "
+              f"{row['rss_delta_mb']:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a script with instrumentation enabled and export its spans.")
+    parser.add_argument("--json", help="Write spans + summary to this JSON file")
+    parser.add_argument("--chrome", help="Write a Chrome trace (chrome://tracing / Perfetto) to this file")
+    parser.add_argument("script", help="Script to run, e.g. scripts/data_cleaning.py")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the script")
+    args = parser.parse_args(argv)
+
+    # The traced script imports `instrument`; make that this module, not a second copy of it
+    sys.modules.setdefault("instrument", sys.modules[__name__])
+    enable()
+    reset()
+    name = os.path.splitext(os.path.basename(args.script))[0]
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    try:
+        with span("script", path=args.script):
+            runpy.run_path(args.script, run_name="__main__")
+    finally:
+        print_summary()
+        save_last_run(name)
+        if args.json:
+            export_json(args.json)
+            print(f"💾 Spans written to {args.json}")
+        if args.chrome:
+            export_chrome_trace(args.chrome)
+            print(f"💾 Chrome trace written to {args.chrome}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import argparse
+import glob
+import heapq
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import read_cleaned
+from dataset_store import (DEFAULT_SEASON, STORE_DIR, coerce_frame, load_frame, read_meta, season_sources,
+                           with_metrics)
+from player_index import normalize_name
+from scrape_manifest import DEFAULT_DELTA_DIR
+
+# 🏆 Materialized leaderboards: top-K tables per (league, season, stat, minimum games),
+# built once per store partition and kept current as delta rows arrive. Each board is a
+# bounded min-heap holding the top K + SLACK rows and a "floor" that every row outside the
+# heap sorts at or below. A delta row that beats the floor is pushed in (the weakest row
+# falls out). A row that drops below it just leaves the heap, and the heap stays an exact
+# top-N. Only when fewer than K rows remain is the board rebuilt from the full season.
+# Readers (dashboard, API, EDA) take rows off the top of a board and never sort.
+
+LEADERBOARD_DIR = "data/leaderboards"
+LEADERBOARD_VERSION = 1
+DEFAULT_LEAGUE = "pegcityball"
+TOP_K = 25
+SLACK = 25  # extra rows per board, so decreases rarely force a rebuild
+
+leaderboard_stats = ["PTS", "EFF", "EFF_CALC", "TS%", "eFG%", "FG%", "3P%", "FT%", "AST_RATIO", "RPG", "APG", "SPG",
+                     "BPG", "PPR", "PTS_PG", "REB_PG", "AST_PG"]
+min_games = [0, 5, 10]
+display_columns = ["Player", "GP", "PTS", "FG%", "TS%", "EFF"]
+
+
+# 🔑 One leaderboard entry per player: normalized name, or the row position when the name is missing
+def row_keys(names):
+    return [normalize_name(name) if isinstance(name, str) and name.strip() else f"#{i}"
+            for i, name in enumerate(names)]
+
+
+def _json_value(value):
+    if isinstance(value, str) or value is None:
+        return value
+    return None if np.isnan(value) else float(value)
+
+
+class Leaderboard:
+    def __init__(self, stat, min_gp=0, k=TOP_K, capacity=TOP_K + SLACK):
+        self.stat = stat
+        self.min_gp = min_gp
+        self.k = k
+        self.capacity = capacity
+        self.heap = []     # min-heap of (value, -row, key): ties rank the earlier row first, like nlargest
+        self.records = {}  # key → displayed row
+        self.floor = None  # every ranked row outside the heap sorts ≤ floor (None: nothing outside)
+
+    # 🏗 Full build from column arrays (values / games / keys aligned with `records`)
+    def fill(self, values, games, keys, records):
+        candidates = np.flatnonzero(~np.isnan(values) & (games >= self.min_gp))
+        order = candidates[np.lexsort((candidates, -values[candidates]))]
+        # Best row per player only
+        _, first = np.unique(np.asarray(keys, dtype=object)[order], return_index=True)
+        order = order[np.sort(first)]
+
+        self.heap = [(float(values[row]), -int(row), keys[row]) for row in order[:self.capacity]]
+        heapq.heapify(self.heap)
+        self.records = {keys[row]: records[row] for row in order[:self.capacity]}
+        self.floor = ((float(values[order[self.capacity]]), -int(order[self.capacity]))
+                      if len(order) > self.capacity else None)
+
+    # 🔁 New or changed row for `key`; returns True when the board must be rebuilt
+    def update(self, key, row, record):
+        if key in self.records:
+            self.heap = [item for item in self.heap if item[2] != key]
+            heapq.heapify(self.heap)
+            del self.records[key]
+
+        value, games = record.get(self.stat), record.get("GP")
+        if value is not None and games is not None and games >= self.min_gp:
+            item = (value, -row, key)
+            if self.floor is None or item > self.floor:
+                heapq.heappush(self.heap, item)
+                self.records[key] = record
+                if len(self.heap) > self.capacity:
+                    dropped = heapq.heappop(self.heap)
+                    del self.records[dropped[2]]
+                    self.floor = dropped[:2]
+        return self.stale
+
+    @property
+    def stale(self):
+        return self.floor is not None and len(self.heap) < self.k
+
+    def top(self, n=TOP_K):
+        return [self.records[key] for _, _, key in heapq.nlargest(min(n, self.k), self.heap)]
+
+    def to_dict(self):
+        return {"stat": self.stat, "min_gp": self.min_gp, "k": self.k, "capacity": self.capacity,
+                "heap": self.heap, "records": self.records, "floor": self.floor}
+
+    @classmethod
+    def from_dict(cls, data):
+        board = cls(data["stat"], data["min_gp"], data["k"], data["capacity"])
+        board.heap = [tuple(item) for item in data["heap"]]
+        board.records = data["records"]
+        board.floor = tuple(data["floor"]) if data["floor"] is not None else None
+        return board
+
+
+# 📚 Every board of one (league, season)
+class SeasonLeaderboards:
+    def __init__(self, league, season, fingerprint=None):
+        self.league = league
+        self.season = season
+        self.fingerprint = fingerprint
+        self.rows = {}  # key → row position (tie-break), new players are appended
+        self.next_row = 0
+        self.boards = {}
+        self.deltas = []
+
+    def build(self, df):
+        keys = row_keys(df["Player"].tolist())
+        columns = list(dict.fromkeys(display_columns + leaderboard_stats))
+        records = [{column: _json_value(value) for column, value in zip(columns, values)}
+                   for values in zip(*(df[column].tolist() for column in columns))]
+        games = df["GP"].to_numpy(dtype=np.float64)
+        games = np.where(np.isnan(games), -1, games)
+        self.rows = {}
+        for row, key in enumerate(keys):
+            self.rows.setdefault(key, row)
+        self.next_row = len(keys)
+        for stat in leaderboard_stats:
+            values = df[stat].to_numpy(dtype=np.float64)
+            for min_gp in min_games:
+                board = self.boards.setdefault(f"{stat}|{min_gp}", Leaderboard(stat, min_gp))
+                board.fill(values, games, keys, records)
+        return self
+
+    # ➕ Fold delta rows (cleaned, see data_cleaning.read_cleaned) into every board; returns the stale boards
+    def apply(self, delta):
+        delta, _ = with_metrics(delta)
+        columns = list(dict.fromkeys(display_columns + leaderboard_stats))
+        stale = set()
+        for key, values in zip(row_keys(delta["Player"].tolist()), zip(*(delta[c].tolist() for c in columns))):
+            record = {column: _json_value(value) for column, value in zip(columns, values)}
+            if key not in self.rows:
+                self.rows[key] = self.next_row
+                self.next_row += 1
+            row = self.rows[key]
+            for name, board in self.boards.items():
+                if board.update(key, row, record):
+                    stale.add(name)
+        return stale
+
+    def board(self, stat, min_gp=0):
+        return self.boards.get(f"{stat}|{min_gp}")
+
+    # 📋 Top n rows as a frame: Player, the stat, then the other display columns
+    def top(self, stat, n=10, min_gp=0):
+        board = self.board(stat, min_gp)
+        columns = list(dict.fromkeys(["Player", stat] + display_columns))
+        return pd.DataFrame(board.top(n) if board else [], columns=columns)
+
+    def to_dict(self):
+        return {"version": LEADERBOARD_VERSION, "league": self.league, "season": self.season,
+                "fingerprint": self.fingerprint, "deltas": self.deltas, "rows": self.rows, "next_row": self.next_row,
+                "boards": {name: board.to_dict() for name, board in self.boards.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        boards = cls(data["league"], data["season"], data["fingerprint"])
+        boards.rows = data["rows"]
+        boards.next_row = data["next_row"]
+        boards.deltas = data["deltas"]
+        boards.boards = {name: Leaderboard.from_dict(board) for name, board in data["boards"].items()}
+        return boards
+
+
+def leaderboard_path(season, league=DEFAULT_LEAGUE, leaderboard_dir=LEADERBOARD_DIR):
+    return os.path.join(leaderboard_dir, league, f"{season}.json")
+
+
+def save_leaderboards(boards, leaderboard_dir=LEADERBOARD_DIR):
+    path = leaderboard_path(boards.season, boards.league, leaderboard_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(boards.to_dict(), fh, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _partition_fingerprint(season, store_dir=STORE_DIR):
+    return ((read_meta(store_dir) or {}).get("partitions", {}).get(season) or {}).get("fingerprint")
+
+
+# Process-wide cache: leaderboard file path → (mtime, boards)
+_boards = {}
+
+
+# 📦 Load-or-build the boards of one season; rebuilt when its store partition changes.
+# The cache follows the file's mtime, so a running dashboard sees delta updates on its next rerun.
+def get_leaderboards(season, league=DEFAULT_LEAGUE, df=None, leaderboard_dir=LEADERBOARD_DIR, store_dir=STORE_DIR):
+    fingerprint = _partition_fingerprint(season, store_dir)
+    path = leaderboard_path(season, league, leaderboard_dir)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _boards.get(path)
+    if cached and cached[0] == mtime and cached[1].fingerprint == fingerprint:
+        return cached[1]
+
+    boards = None
+    if mtime is not None:
+        with open(path) as fh:
+            data = json.load(fh)
+        if data.get("version") == LEADERBOARD_VERSION and data["fingerprint"] == fingerprint:
+            boards = SeasonLeaderboards.from_dict(data)
+    if boards is None:
+        boards = SeasonLeaderboards(league, season, fingerprint).build(
+            df if df is not None else load_frame(season, store_dir=store_dir))
+        if fingerprint is not None:
+            save_leaderboards(boards, leaderboard_dir)
+    if fingerprint is not None:
+        _boards[path] = (os.path.getmtime(path), boards)
+    return boards
+
+
+# 🧩 Replace rows of `current` by player key with the delta's rows; unknown players are appended
+def overlay(current, delta):
+    positions = {}
+    for row, key in enumerate(row_keys(current["Player"].tolist())):
+        positions.setdefault(key, row)
+    delta_keys = row_keys(delta["Player"].tolist())
+    known = [i for i, key in enumerate(delta_keys) if key in positions]
+    current = current.copy()
+    current.iloc[[positions[delta_keys[i]] for i in known]] = delta.iloc[known].to_numpy()
+    added = delta.iloc[[i for i, key in enumerate(delta_keys) if key not in positions]]
+    return pd.concat([current, added], ignore_index=True)
+
+
+# 🔄 Apply scraper delta files (data/delta/<scraped file>.csv) to the matching seasons
+def apply_deltas(delta_files, league=DEFAULT_LEAGUE, leaderboard_dir=LEADERBOARD_DIR, store_dir=STORE_DIR,
+                 data_dir="data"):
+    seasons_by_file = {filename: season for season, filename in season_sources.items()}
+    report = []
+    for path in delta_files:
+        season = seasons_by_file.get(os.path.basename(path))
+        if season is None:
+            report.append({"file": path, "season": None, "rows": 0, "rebuilt": []})
+            continue
+        boards = get_leaderboards(season, league, leaderboard_dir=leaderboard_dir, store_dir=store_dir)
+        # Delta and full table are raw scraper output: clean them like the files the store is built from
+        delta = read_cleaned(path)
+        stale = boards.apply(delta)
+        if stale:
+            # Too few rows left above the floor: rebuild those boards from the full table. The scraper
+            # writes the whole table next to each delta, so that file is fresher than the store.
+            source = os.path.join(data_dir, season_sources[season])
+            current = coerce_frame(read_cleaned(source) if os.path.exists(source) else load_frame(season,
+                                                                                                  store_dir=store_dir))
+            current = overlay(current, coerce_frame(delta))
+            rebuilt = SeasonLeaderboards(league, season).build(with_metrics(current)[0])
+            for name in stale:
+                boards.boards[name] = rebuilt.boards[name]
+        boards.deltas.append(os.path.basename(path))
+        save_leaderboards(boards, leaderboard_dir)
+        report.append({"file": path, "season": season, "rows": len(delta), "rebuilt": sorted(stale)})
+    return report
+
+
+def build_all(seasons=None, league=DEFAULT_LEAGUE, force=False, leaderboard_dir=LEADERBOARD_DIR, store_dir=STORE_DIR):
+    built = []
+    for season in seasons or season_sources:
+        path = leaderboard_path(season, league, leaderboard_dir)
+        if force:
+            _boards.pop(path, None)
+            if os.path.exists(path):
+                os.remove(path)
+        built.append(get_leaderboards(season, league, leaderboard_dir=leaderboard_dir, store_dir=store_dir))
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, update or show the materialized leaderboards.")
+    parser.add_argument("command", choices=["build", "update", "show"])
+    parser.add_argument("deltas", nargs="*", help="Delta CSVs for update (default: data/delta/*.csv)")
+    parser.add_argument("--season", action="append", help="Seasons (repeatable, default: all)")
+    parser.add_argument("--league", default=DEFAULT_LEAGUE)
+    parser.add_argument("--stat", default="EFF", choices=leaderboard_stats)
+    parser.add_argument("--min-gp", type=int, default=0, choices=min_games)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the store is unchanged")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "build":
+        for boards in build_all(args.season, args.league, args.force):
+            print(f"✅ {boards.league}/{boards.season}: {len(boards.boards)} boards")
+        print(f"\n🎯 Leaderboards ready in {time.perf_counter() - started:.2f}s → {LEADERBOARD_DIR}/")
+    elif args.command == "update":
+        delta_files = args.deltas or sorted(glob.glob(os.path.join(DEFAULT_DELTA_DIR, "*.csv")))
+        if not delta_files:
+            print("⏭ No delta files to apply.")
+            return
+        for entry in apply_deltas(delta_files, args.league):
+            if entry["season"] is None:
+                print(f"⏭ {entry['file']}: not a season stats file")
+            else:
+                rebuilt = f", rebuilt {', '.join(entry['rebuilt'])}" if entry["rebuilt"] else ""
+                print(f"✅ {entry['season']}: {entry['rows']} delta rows{rebuilt}")
+        print(f"\n🎯 Applied {len(delta_files)} delta file(s) in {time.perf_counter() - started:.3f}s")
+    else:
+        for season in args.season or [DEFAULT_SEASON]:
+            boards = get_leaderboards(season, args.league)
+            print(f"\n🏆 {season} — top {args.top} by {args.stat} (GP ≥ {args.min_gp})")
+            print(boards.top(args.stat, args.top, args.min_gp).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from instrument import span
+
+# 🧮 Shared advanced-metrics engine. One place for the TS% / AST_RATIO / EFF formulas that
+# used to be copy-pasted (slightly differently) into every script. All metrics are
+# computed from a single float matrix of the box-score columns with guarded division,
+# and are materialized into the dataset store at ingest.
+
+# Bump whenever a formula below changes; stored metrics from another version are never reused
+METRICS_VERSION = 1
+
+# Box-score inputs, in matrix column order
+inputs = ["GP", "FGM", "FGA", "3PM", "FTM", "FTA", "DREB", "OREB", "AST", "STL", "TO", "BLK", "PTS"]
+
+derived_columns = [
+    "TS%",        # True shooting: PTS / (2 · (FGA + 0.44 · FTA)), capped at 1
+    "eFG%",       # Effective FG: (FGM + 0.5 · 3PM) / FGA
+    "AST_RATIO",  # Assist-to-turnover share: AST / (AST + TO)
+    "EFF_CALC",   # Efficiency from the box score (scraped EFF column is left as-is)
+    "USG_PROXY",  # Possessions used per game: (FGA + 0.44 · FTA + TO) / GP
+    "PTS_PG", "REB_PG", "AST_PG", "STL_PG", "BLK_PG", "TO_PG",
+]
+
+
+# ➗ a / b, with 0 wherever b is 0 or either side is missing
+def safe_divide(a, b):
+    out = np.zeros(np.broadcast(a, b).shape)
+    np.divide(a, b, out=out, where=(b != 0) & ~np.isnan(a) & ~np.isnan(b))
+    return out
+
+
+def compute_metrics(df):
+    with span("features.metrics", rows=len(df)):
+        X = df.reindex(columns=inputs).to_numpy(dtype=np.float64)
+        gp, fgm, fga, tpm, ftm, fta, dreb, oreb, ast, stl, to, blk, pts = X.T
+
+        shooting_possessions = fga + 0.44 * fta
+        per_game = safe_divide(np.column_stack([pts, dreb + oreb, ast, stl, blk, to]), gp[:, None])
+
+        out = np.column_stack([
+            np.minimum(safe_divide(pts, 2 * shooting_possessions), 1.0),
+            safe_divide(fgm + 0.5 * tpm, fga),
+            safe_divide(ast, ast + to),
+            (pts + dreb + oreb + ast + stl + blk) - (fga - fgm) - (fta - ftm) - to,
+            safe_divide(shooting_possessions + to, gp),
+            per_game,
+        ])
+        return pd.DataFrame(out, columns=derived_columns, index=df.index)
+
+
+# 🔁 Recompute metrics only for rows whose hash is not in `previous` (a frame holding
+# row_hash + derived columns from the last build); unchanged rows reuse stored values.
+def compute_metrics_incremental(df, row_hash, previous=None):
+    if previous is None or previous.empty:
+        return compute_metrics(df), len(df)
+
+    previous = previous.drop_duplicates("row_hash").set_index("row_hash")
+    positions = previous.index.get_indexer(row_hash)
+    reused = positions >= 0
+
+    result = pd.DataFrame(index=df.index, columns=derived_columns, dtype=np.float64)
+    result.loc[reused] = previous[derived_columns].to_numpy()[positions[reused]]
+    if (~reused).any():
+        result.loc[~reused] = compute_metrics(df.loc[~reused]).to_numpy()
+    return result, int((~reused).sum())
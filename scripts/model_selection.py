@@ -0,0 +1,284 @@
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compact_schema import feature_matrix
+from dataset_store import DEFAULT_SEASON, data_version, load_frame, season_aliases, season_sources
+from instrument import record
+from model_store import (MODEL_DIR, artifact_key, features, register_model, save_artifact, target,
+                         train_points_model)
+
+# 🔬 Model selection for the points model: alpha × feature-subset search.
+#   1. Leave-one-out on every season in closed form (one SVD per subset covers every alpha)
+#      to rank all subsets cheaply and keep a shortlist.
+#   2. k-fold CV within each season and season-held-out CV across seasons for the shortlist.
+# Seasons / folds run on a process pool; the winner is trained, saved and registered in
+# models/registry.json, which the dashboards load from.
+
+default_alphas = np.logspace(-3, 3, 13)
+MIN_FEATURES = 3
+MIN_SEASONS = 2  # seasons a feature subset must be scored on (season-held-out needs two)
+DEFAULT_FOLDS = 5
+DEFAULT_SHORTLIST = 25
+
+
+# 🧮 Ridge on standardized features for many alphas at once (intercept unpenalized, like sklearn).
+# Returns weights (p × alphas), intercepts (alphas,) in standardized space plus the scaling.
+def _standardize(X):
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    return (X - mean) / scale, mean, scale
+
+
+def ridge_path(X, y, alphas):
+    Z, mean, scale = _standardize(X)
+    U, s, Vt = np.linalg.svd(Z, full_matrices=False)
+    y_mean = y.mean()
+    shrink = s[:, None] / (s[:, None] ** 2 + alphas[None, :])
+    weights = Vt.T @ (shrink * (U.T @ (y - y_mean))[:, None])
+    return weights, y_mean, mean, scale
+
+
+def predict_path(X, path):
+    weights, y_mean, mean, scale = path
+    return ((X - mean) / scale) @ weights + y_mean
+
+
+def scores(y, predictions):
+    residuals = predictions - y[:, None]
+    total = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - (residuals ** 2).sum(axis=0) / total if total > 0 else np.full(residuals.shape[1], np.nan)
+    return np.abs(residuals).mean(axis=0), r2
+
+
+# ⚡ Exact leave-one-out for every alpha from one SVD: e_loo = e / (1 - h_ii),
+# with hat diagonal h_ii = 1/n + Σ_j U_ij² · s_j² / (s_j² + α). Scaling uses all rows (GCV-style).
+def loo_scores(X, y, alphas):
+    Z, _, _ = _standardize(X)
+    U, s, _ = np.linalg.svd(Z, full_matrices=False)
+    y_centered = y - y.mean()
+    gain = s[:, None] ** 2 / (s[:, None] ** 2 + alphas[None, :])
+    fitted = U @ (gain * (U.T @ y_centered)[:, None])
+    hat = (U ** 2) @ gain + 1.0 / len(y)
+    residuals = (y_centered[:, None] - fitted) / (1 - hat)
+    total = (y_centered ** 2).sum()
+    return np.abs(residuals).mean(axis=0), 1 - (residuals ** 2).sum(axis=0) / total
+
+
+def feature_subsets(feature_list, min_features=MIN_FEATURES):
+    return [list(combo) for size in range(min_features, len(feature_list) + 1)
+            for combo in itertools.combinations(feature_list, size)]
+
+
+# 🧵 Pool tasks: each returns MAE / R² arrays of shape (subsets, alphas)
+def loo_task(name, X, y, subsets, alphas):
+    started = time.perf_counter()
+    results = [loo_scores(X[:, subset], y, alphas) for subset in subsets]
+    mae, r2 = (np.array(part) for part in zip(*results))
+    return {"name": name, "mae": mae, "r2": r2, "seconds": time.perf_counter() - started}
+
+
+def holdout_task(name, X_train, y_train, X_test, y_test, subsets, alphas):
+    started = time.perf_counter()
+    results = [scores(y_test, predict_path(X_test[:, subset], ridge_path(X_train[:, subset], y_train, alphas)))
+               for subset in subsets]
+    mae, r2 = (np.array(part) for part in zip(*results))
+    return {"name": name, "mae": mae, "r2": r2, "seconds": time.perf_counter() - started}
+
+
+def kfold_indices(n, folds, seed=42):
+    order = np.random.default_rng(seed).permutation(n)
+    return np.array_split(order, folds)
+
+
+# 📥 Training matrices per season: (X, y, available). A season only uses the features it has
+# (`available`; the others are NaN columns) and the rows complete on those plus the target.
+# An alias and the season it mirrors are the same rows, so only the copy with more features is
+# kept; no season is then held out against its own copy or counted twice in the means.
+def load_seasons(feature_list=None, seasons=None, min_rows=2 * DEFAULT_FOLDS, dtype=np.float64):
+    feature_list = list(feature_list or features)
+    data = {}
+    for season in seasons or season_sources:
+        df = load_frame(season, columns=feature_list + [target])
+        available = df[feature_list].notna().any().to_numpy()
+        df = df.dropna(subset=[name for name, keep in zip(feature_list, available) if keep] + [target])
+        if len(df) < min_rows or not available.any():
+            print(f"⏭ {season}: {len(df)} usable rows, skipped")
+            continue
+        data[season] = (feature_matrix(df, feature_list, dtype), df[target].to_numpy(dtype=dtype), available)
+    for alias, original in season_aliases.items():
+        if alias in data and original in data:
+            keep = alias if data[alias][2].sum() > data[original][2].sum() else original
+            drop = original if keep == alias else alias
+            print(f"⏭ {drop}: same rows as {keep}, skipped")
+            del data[drop]
+    return data
+
+
+def _mean_over(results):
+    mae, r2 = np.array([r["mae"] for r in results]), np.array([r["r2"] for r in results])
+    count = (~np.isnan(mae)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (np.where(count, np.nansum(mae, axis=0) / count, np.nan),
+                np.where(count, np.nansum(r2, axis=0) / count, np.nan))
+
+
+# Task result for some subsets → MAE / R² arrays over all `rows` subsets (NaN where not scored)
+def _scatter(result, index, rows):
+    full = {}
+    for name in ("mae", "r2"):
+        full[name] = np.full((rows, result[name].shape[1]), np.nan)
+        full[name][index] = result[name]
+    return {**result, **full}
+
+
+# 🚀 Full search; returns the ranked shortlist and per-stage timings. Each subset is scored on the
+# seasons that have all of its features and needs at least MIN_SEASONS of them.
+def search(data, feature_list=None, alphas=default_alphas, folds=DEFAULT_FOLDS, shortlist=DEFAULT_SHORTLIST,
+           min_features=MIN_FEATURES, workers=None):
+    if len(data) < MIN_SEASONS:
+        raise ValueError(f"Model selection needs at least {MIN_SEASONS} usable seasons, got {list(data) or 'none'}")
+    feature_list = list(feature_list or features)
+    alphas = np.asarray(alphas, dtype=np.float64)
+    subsets = feature_subsets(feature_list, min_features)
+    columns = [[feature_list.index(name) for name in subset] for subset in subsets]
+    # Seasons that can score each subset
+    covered = {season: [i for i, subset in enumerate(columns) if available[subset].all()]
+               for season, (_, _, available) in data.items()}
+    coverage = np.bincount([i for index in covered.values() for i in index], minlength=len(subsets))
+    if not (coverage >= MIN_SEASONS).any():
+        raise ValueError(f"No feature subset is available in {MIN_SEASONS} of the seasons {list(data)}")
+    timings = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Stage 1: closed-form LOO over every subset × alpha, one task per season
+        started = time.perf_counter()
+        seasons = [season for season in data if covered[season]]
+        loo = list(pool.map(loo_task, seasons, *zip(*[data[season][:2] for season in seasons]),
+                            [[columns[i] for i in covered[season]] for season in seasons], itertools.repeat(alphas)))
+        loo = [_scatter(result, covered[season], len(subsets)) for season, result in zip(seasons, loo)]
+        loo_mae, loo_r2 = _mean_over(loo)
+        loo_mae[coverage < MIN_SEASONS] = np.nan
+        timings["loo"] = time.perf_counter() - started
+
+        ranked = [flat for flat in np.argsort(loo_mae, axis=None) if not np.isnan(loo_mae.flat[flat])][:shortlist]
+        candidates = [np.unravel_index(flat, loo_mae.shape) for flat in ranked]
+        short_columns = sorted({subset for subset, _ in candidates})
+        short_index = {subset: i for i, subset in enumerate(short_columns)}
+
+        # Stage 2: k-fold within each season + season-held-out (trained on the other seasons that
+        # have the subset), one task per fold / held-out season and training-season group
+        started = time.perf_counter()
+        kfold_futures, season_futures = [], []
+        for season, (X, y, _) in data.items():
+            index = [row for row, subset in enumerate(short_columns) if subset in covered[season]]
+            if not index:
+                continue
+            subset_columns = [columns[short_columns[row]] for row in index]
+            for fold, test in enumerate(kfold_indices(len(y), folds)):
+                train = np.setdiff1d(np.arange(len(y)), test)
+                kfold_futures.append((index, pool.submit(holdout_task, f"{season}/fold{fold}", X[train], y[train],
+                                                         X[test], y[test], subset_columns, alphas)))
+            groups = {}
+            for row in index:
+                others = tuple(name for name in data if name != season and short_columns[row] in covered[name])
+                if others:
+                    groups.setdefault(others, []).append(row)
+            for others, rows in groups.items():
+                X_train = np.vstack([data[name][0] for name in others])
+                y_train = np.concatenate([data[name][1] for name in others])
+                season_futures.append((season, rows, pool.submit(
+                    holdout_task, f"{season}<-{'+'.join(others)}", X_train, y_train, X, y,
+                    [columns[short_columns[row]] for row in rows], alphas)))
+        kfold = [_scatter(future.result(), index, len(short_columns)) for index, future in kfold_futures]
+        held_out_parts = [(season, _scatter(future.result(), rows, len(short_columns)))
+                          for season, rows, future in season_futures]
+        timings["cv"] = time.perf_counter() - started
+
+    # One held-out result per season (its training-season groups cover disjoint subsets)
+    held_out = []
+    for season in dict.fromkeys(season for season, _ in held_out_parts):
+        parts = [part for name, part in held_out_parts if name == season]
+        merged = {"name": season, "seconds": sum(part["seconds"] for part in parts)}
+        for name in ("mae", "r2"):
+            merged[name] = np.fmax.reduce([part[name] for part in parts])
+        held_out.append(merged)
+
+    kfold_mae, kfold_r2 = _mean_over(kfold)
+    if held_out:
+        season_mae, season_r2 = _mean_over(held_out)
+
+    results = []
+    for subset, alpha in candidates:
+        row = short_index[subset]
+        results.append({
+            "features": subsets[subset],
+            "alpha": float(alphas[alpha]),
+            "seasons": [season for season in data if subset in covered[season]],
+            "loo": {"mae": float(loo_mae[subset, alpha]), "r2": float(loo_r2[subset, alpha])},
+            "kfold": {"mae": float(kfold_mae[row, alpha]), "r2": float(kfold_r2[row, alpha]), "folds": folds},
+            "season_holdout": ({"mae": float(season_mae[row, alpha]), "r2": float(season_r2[row, alpha])}
+                               if held_out else None),
+        })
+    results.sort(key=lambda result: result["kfold"]["mae"])
+    timings["tasks"] = {result["name"]: result["seconds"]
+                        for result in loo + kfold + [part for _, part in held_out_parts]}
+    record("train.search_loo", timings["loo"], candidates=int(np.isfinite(loo_mae).sum()))
+    record("train.search_cv", timings["cv"], candidates=len(short_columns) * len(alphas))
+    return results, {"subsets": len(subsets), "alphas": len(alphas), "seasons": list(data)}, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search alpha × feature subsets for the points model and "
+                                                 "register the winner.")
+    parser.add_argument("--season", action="append", help="Seasons to search on (repeatable, default: all usable)")
+    parser.add_argument("--train-season", default=DEFAULT_SEASON, help="Season the registered model is fitted on")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--shortlist", type=int, default=DEFAULT_SHORTLIST, help="Candidates kept after LOO")
+    parser.add_argument("--min-features", type=int, default=MIN_FEATURES)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Print the ranking without registering a model")
+    parser.add_argument("--float32", action="store_true", help="Search on float32 feature matrices "
+                                                               "(the registered model is still fitted in float64)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = load_seasons(seasons=args.season, min_rows=2 * args.folds,
+                        dtype=np.float32 if args.float32 else np.float64)
+    load_seconds = time.perf_counter() - started
+    results, space, timings = search(data, folds=args.folds, shortlist=args.shortlist,
+                                     min_features=args.min_features, workers=args.workers)
+    timings["load"] = load_seconds
+
+    print(f"\n🔬 {space['subsets']} feature subsets × {space['alphas']} alphas on {', '.join(space['seasons'])} "
+          f"(LOO {timings['loo']:.2f}s, CV {timings['cv']:.2f}s)")
+    print(f"{'k-fold MAE':>10} {'R²':>6} {'held-out MAE':>12} {'LOO MAE':>8} {'alpha':>8}  features")
+    for result in results[:10]:
+        holdout = result["season_holdout"]["mae"] if result["season_holdout"] else float("nan")
+        print(f"{result['kfold']['mae']:>10.3f} {result['kfold']['r2']:>6.2f} {holdout:>12.3f} "
+              f"{result['loo']['mae']:>8.3f} {result['alpha']:>8.3g}  {', '.join(result['features'])}")
+
+    if args.dry_run or not results:
+        return
+
+    best = results[0]
+    started = time.perf_counter()
+    df = load_frame(args.train_season)
+    params = {"alpha": best["alpha"]}
+    key = artifact_key(df, best["features"], params)
+    save_artifact(train_points_model(df, best["features"], params), key, args.model_dir)
+    timings["fit"] = time.perf_counter() - started
+
+    entry = register_model(key, best["features"], params, {**best, "search_space": space}, timings,
+                           season=args.train_season, version=data_version(), model_dir=args.model_dir)
+    print(f"\n✅ Registered model v{entry['version']} ({key}): alpha={best['alpha']:.3g}, "
+          f"{len(best['features'])} features, k-fold MAE {best['kfold']['mae']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
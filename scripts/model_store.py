@@ -0,0 +1,315 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from instrument import span, traced
+
+# 🧠 Persisted scaler + Ridge artifacts for the points model.
+# Artifacts are keyed by a hash of the training rows, the feature list and the
+# hyperparameters, written once to models/ and then served from a process-wide cache,
+# so Streamlit reruns and API workers never refit.
+# Each artifact also gets a small JSON "serving" copy: the scaler folded into the Ridge
+# weights (see projections.linear_weights). Serving processes load that one, so they never
+# import sklearn or unpickle the estimators (seconds of a cold start); sklearn is only
+# imported here when a model is actually trained or keyed.
+
+MODEL_DIR = "models"
+MODEL_NAME = "points_ridge"
+REGISTRY_FILE = "registry.json"
+KEY_INDEX_FILE = "artifact_keys.json"
+
+features = ["FG%", "AST", "DREB", "OREB", "3P%", "EFF", "RPG", "APG", "SPG", "BPG", "PPR"]
+target = "PTS"
+default_params = {"alpha": 1.0, "test_size": 0.2, "random_state": 42}
+
+# Process-wide caches: artifact key → loaded artifact / serving copy; key slot → artifact key
+_artifacts = {}
+_serving = {}
+_keys = {}
+
+
+# #️⃣ Content key: training rows + features + hyperparameters + sklearn version
+def artifact_key(df, feature_list=None, params=None):
+    import sklearn
+
+    feature_list = list(feature_list or features)
+    params = {**default_params, **(params or {})}
+    X = df[feature_list].dropna()
+    rows = pd.util.hash_pandas_object(pd.concat([X, df.loc[X.index, target]], axis=1), index=False)
+    digest = hashlib.sha256(rows.to_numpy().tobytes())
+    digest.update(json.dumps({"features": feature_list, "params": params, "sklearn": sklearn.__version__},
+                             sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+# 🗝 Artifact key for a frame identified by `version` (e.g. "<data version>:<season>"): read from the
+# process cache or models/artifact_keys.json, so a cold start finds its artifact with one lookup.
+# The training rows are hashed only for a (version, features, params, sklearn) slot seen for the
+# first time. Without a version there is nothing safe to look up, so the rows are hashed.
+def lookup_artifact_key(df, feature_list=None, params=None, version=None, model_dir=MODEL_DIR):
+    if version is None:
+        return artifact_key(df, feature_list, params)
+    from importlib.metadata import version as package_version
+
+    feature_list = list(feature_list or features)
+    params = {**default_params, **(params or {})}
+    slot = json.dumps({"data": version, "features": feature_list, "params": params,
+                       "sklearn": package_version("scikit-learn")}, sort_keys=True)
+    if slot in _keys:
+        return _keys[slot]
+
+    path = os.path.join(model_dir, KEY_INDEX_FILE)
+    index = {}
+    if os.path.exists(path):
+        with open(path) as fh:
+            index = json.load(fh)
+    if slot not in index:
+        index[slot] = artifact_key(df, feature_list, params)
+        os.makedirs(model_dir, exist_ok=True)
+        with open(path + ".tmp", "w") as fh:
+            json.dump(index, fh, indent=1)
+        os.replace(path + ".tmp", path)
+    _keys[slot] = index[slot]
+    return _keys[slot]
+
+
+def artifact_path(key, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"{MODEL_NAME}-{key}.joblib")
+
+
+# 🌟 Fit scaler + Ridge exactly as the dashboard used to (80/20 split, held-out MAE/R²)
+@traced("train.fit")
+def train_points_model(df, feature_list=None, params=None):
+    from sklearn.linear_model import Ridge
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    feature_list = list(feature_list or features)
+    params = {**default_params, **(params or {})}
+
+    X = df[feature_list].dropna()
+    y = df.loc[X.index, target]
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=params["test_size"],
+                                                        random_state=params["random_state"])
+
+    ridge_model = Ridge(alpha=params["alpha"])
+    ridge_model.fit(X_train, y_train)
+
+    y_pred = ridge_model.predict(X_test)
+    return {
+        "scaler": scaler,
+        "model": ridge_model,
+        "features": feature_list,
+        "params": params,
+        "metrics": {"mae": mean_absolute_error(y_test, y_pred), "r2": r2_score(y_test, y_pred)},
+        "trained_rows": len(X),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def save_artifact(artifact, key, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    path = artifact_path(key, model_dir)
+    tmp_path = path + ".tmp"
+    import joblib
+
+    joblib.dump({**artifact, "key": key}, tmp_path)
+    os.replace(tmp_path, path)
+    save_serving_artifact(artifact, key, model_dir)
+    return path
+
+
+def serving_path(key, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"{MODEL_NAME}-{key}.serving.json")
+
+
+# 📏 Per-feature mean / scale the model standardizes with (full artifact or its serving copy)
+def scaler_stats(artifact):
+    if "_scaler" in artifact:
+        return artifact["_scaler"]
+    return artifact["scaler"].mean_, artifact["scaler"].scale_
+
+
+# 🪶 sklearn-free copy of an artifact: features, metrics, scaler statistics and the folded linear weights
+def save_serving_artifact(artifact, key, model_dir=MODEL_DIR):
+    from projections import linear_weights
+
+    weights, intercept = linear_weights(artifact)
+    mean, scale = scaler_stats(artifact)
+    payload = {name: artifact[name] for name in ("features", "params", "metrics", "trained_rows", "created_at")}
+    payload.update(key=key, weights=weights.tolist(), intercept=float(intercept), scaler_mean=np.asarray(mean).tolist(),
+                   scaler_scale=np.asarray(scale).tolist())
+    path = serving_path(key, model_dir)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(payload, fh, indent=1)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# None when the copy is missing or predates the scaler statistics (it is rewritten from the artifact)
+def load_serving_artifact(key, model_dir=MODEL_DIR):
+    path = serving_path(key, model_dir)
+    if not os.path.exists(path):
+        return None
+    with span("model.load_serving", key=key):
+        with open(path) as fh:
+            artifact = json.load(fh)
+    if "scaler_mean" not in artifact:
+        return None
+    artifact["_linear"] = (np.array(artifact.pop("weights")), artifact.pop("intercept"))
+    artifact["_scaler"] = (np.array(artifact.pop("scaler_mean")), np.array(artifact.pop("scaler_scale")))
+    return artifact
+
+
+# 📦 Load-or-build: memory cache → artifact on disk → train once and persist.
+# `version` identifies the frame's contents (see lookup_artifact_key).
+def get_artifact(df, feature_list=None, params=None, model_dir=MODEL_DIR, build_missing=True, version=None):
+    key = lookup_artifact_key(df, feature_list, params, version, model_dir)
+    if key in _artifacts:
+        return _artifacts[key]
+
+    path = artifact_path(key, model_dir)
+    if os.path.exists(path):
+        import joblib
+
+        with span("model.load", key=key):
+            artifact = joblib.load(path)
+    elif build_missing:
+        print(f"⚠️ No model artifact {key}; training once (prebuild with: python scripts/model_store.py build)")
+        artifact = train_points_model(df, feature_list, params)
+        save_artifact(artifact, key, model_dir)
+        artifact["key"] = key
+    else:
+        raise FileNotFoundError(path)
+
+    _artifacts[key] = artifact
+    return artifact
+
+
+# 📚 Versioned model registry (models/registry.json), written by model_selection.py
+def load_registry(model_dir=MODEL_DIR):
+    path = os.path.join(model_dir, REGISTRY_FILE)
+    if not os.path.exists(path):
+        return {"current": None, "versions": []}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def register_model(key, feature_list, params, scores, timings, season=None, version=None, model_dir=MODEL_DIR):
+    registry = load_registry(model_dir)
+    entry = {
+        "version": len(registry["versions"]) + 1,
+        "artifact": key,
+        "features": list(feature_list),
+        "params": {**default_params, **params},
+        "scores": scores,
+        "timings": timings,
+        "season": season,
+        "data_version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    registry["versions"].append(entry)
+    registry["current"] = entry["version"]
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, REGISTRY_FILE)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(registry, fh, indent=2)
+    os.replace(path + ".tmp", path)
+    return entry
+
+
+def current_entry(model_dir=MODEL_DIR):
+    registry = load_registry(model_dir)
+    for entry in registry["versions"]:
+        if entry["version"] == registry["current"]:
+            return entry
+    return None
+
+
+# 🏆 Features + params of the registered winner (defaults when nothing is registered yet)
+def registered_params(model_dir=MODEL_DIR):
+    entry = current_entry(model_dir)
+    if entry is None:
+        return list(features), dict(default_params)
+    return entry["features"], entry["params"]
+
+
+# 🔄 Current registered artifact. The registry is re-read on every call, so a long-running
+# dashboard hot-swaps to a newly registered version (e.g. an online update) on its next rerun.
+def get_registered_artifact(df, model_dir=MODEL_DIR, version=None):
+    entry = current_entry(model_dir)
+    if entry is None:
+        return get_artifact(df, model_dir=model_dir, version=version)
+    key = entry["artifact"]
+    if key in _artifacts:
+        return _artifacts[key]
+    path = artifact_path(key, model_dir)
+    if not os.path.exists(path):
+        return get_artifact(df, entry["features"], entry["params"], model_dir, version=version)
+    import joblib
+
+    with span("model.load", key=key):
+        artifact = joblib.load(path)
+    _artifacts[key] = artifact
+    return artifact
+
+
+# 🚀 Registered model for serving (dashboard, API, bulk reports): the JSON serving copy when it
+# exists, else the full artifact, whose serving copy is written for the next cold start
+def get_serving_artifact(df, model_dir=MODEL_DIR, version=None):
+    entry = current_entry(model_dir)
+    key = entry and entry["artifact"]
+    if key is not None:
+        artifact = _serving.get(key) or load_serving_artifact(key, model_dir)
+        if artifact is not None:
+            _serving[key] = artifact
+            return artifact
+    artifact = get_registered_artifact(df, model_dir, version)
+    if load_serving_artifact(artifact["key"], model_dir) is None:
+        save_serving_artifact(artifact, artifact["key"], model_dir)
+    return artifact
+
+
+def main(argv=None):
+    from dataset_store import DEFAULT_SEASON, load_frame
+
+    parser = argparse.ArgumentParser(description="Build the points-model artifact offline.")
+    parser.add_argument("command", choices=["build", "registry"])
+    parser.add_argument("--season", default=DEFAULT_SEASON)
+    parser.add_argument("--alpha", type=float, default=default_params["alpha"])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "registry":
+        registry = load_registry(args.model_dir)
+        for entry in registry["versions"]:
+            marker = "*" if entry["version"] == registry["current"] else " "
+            online = entry["scores"].get("online")
+            detail = (f"online +{online['added']} rows ({online['rows']} total)" if online
+                      else f"k-fold MAE {entry['scores']['kfold']['mae']:.3f}")
+            print(f"{marker} v{entry['version']:<3} {entry['artifact']}  alpha={entry['params']['alpha']:.3g}  "
+                  f"{detail}  {entry['created_at']}")
+        return
+
+    df = load_frame(args.season)
+    params = {"alpha": args.alpha}
+    key = artifact_key(df, params=params)
+    started = time.perf_counter()
+    artifact = train_points_model(df, params=params)
+    path = save_artifact(artifact, key, args.model_dir)
+    print(f"✅ Saved {path} in {time.perf_counter() - started:.2f}s "
+          f"(MAE {artifact['metrics']['mae']:.2f}, R² {artifact['metrics']['r2']:.2f}, {artifact['trained_rows']} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import glob
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.preprocessing import StandardScaler
+
+from data_cleaning import read_cleaned
+from dataset_store import (DEFAULT_SEASON, coerce_frame, data_version, load_frame, season_aliases,
+                           season_sources)
+from model_store import (MODEL_DIR, current_entry, get_registered_artifact, register_model, save_artifact,
+                         target)
+from player_index import normalize_name
+from scrape_manifest import DEFAULT_DELTA_DIR
+
+# ♻️ Online updates for the points model.
+# The artifact carries the sufficient statistics of every row it has absorbed
+# (n, Σx, Σy, XᵀX, Xᵀy, Σy²) plus the current row of each player, so a delta batch of new
+# or corrected stat lines is folded in (a corrected line replaces the old one) with
+# O(new rows · features²) work and the StandardScaler + Ridge pair is re-solved exactly,
+# as if it had been refit on all rows. Each update is saved as a new artifact and
+# registered as a new registry version; the dashboards pick it up on their next rerun.
+
+# Relative prediction gap vs a from-scratch refit above which the online model is replaced
+DRIFT_TOLERANCE = 1e-6
+# Layout of the statistics in the artifact; older statistics are reseeded from the season
+STATS_VERSION = 2
+
+
+def empty_stats(n_features):
+    return {"version": STATS_VERSION, "n": 0, "sum_x": np.zeros(n_features), "sum_y": 0.0,
+            "xtx": np.zeros((n_features, n_features)), "xty": np.zeros(n_features), "yty": 0.0, "keys": [],
+            "row_hashes": np.empty(0, dtype=np.uint64), "X": np.empty((0, n_features)), "y": np.empty(0), "sources": []}
+
+
+def _accumulate(stats, X, y, sign=1):
+    stats["n"] += sign * len(y)
+    stats["sum_x"] += sign * X.sum(axis=0)
+    stats["sum_y"] += sign * y.sum()
+    stats["xtx"] += sign * (X.T @ X)
+    stats["xty"] += sign * (X.T @ y)
+    stats["yty"] += sign * (y @ y)
+
+
+# ➕ Fold a batch into the statistics, one row per player key (the batch's last row wins).
+# Unchanged rows (same content hash) are skipped; a changed row first downdates the row it
+# replaces, so a corrected stat line is never counted twice. Returns the rows absorbed.
+def update_stats(stats, X, y, hashes, keys, source=None):
+    last = ~pd.Series(keys).duplicated(keep="last").to_numpy()
+    X, y, hashes = X[last], y[last], hashes[last]
+    keys = [key for key, keep in zip(keys, last) if keep]
+
+    positions = {key: row for row, key in enumerate(stats["keys"])}
+    old = np.array([positions.get(key, -1) for key in keys], dtype=np.int64)
+    known = old >= 0
+    changed = known.copy()
+    changed[known] = stats["row_hashes"][old[known]] != hashes[known]
+    fresh = ~known
+
+    replaced = old[changed]
+    _accumulate(stats, stats["X"][replaced], stats["y"][replaced], sign=-1)
+    _accumulate(stats, X[changed | fresh], y[changed | fresh])
+    stats["X"][replaced], stats["y"][replaced], stats["row_hashes"][replaced] = X[changed], y[changed], hashes[changed]
+    stats["X"] = np.vstack([stats["X"], X[fresh]])
+    stats["y"] = np.concatenate([stats["y"], y[fresh]])
+    stats["row_hashes"] = np.concatenate([stats["row_hashes"], hashes[fresh]])
+    stats["keys"] = stats["keys"] + [key for key, new in zip(keys, fresh) if new]
+
+    absorbed = int((changed | fresh).sum())
+    if source and absorbed:
+        stats["sources"].append(source)
+    return absorbed
+
+
+# 🧮 Exact StandardScaler + Ridge from the statistics (intercept unpenalized, population variance)
+def solve(stats, feature_list, alpha):
+    n = stats["n"]
+    mean = stats["sum_x"] / n
+    y_mean = stats["sum_y"] / n
+    centered_xtx = stats["xtx"] - n * np.outer(mean, mean)
+    centered_xty = stats["xty"] - n * mean * y_mean
+    var = np.clip(np.diag(centered_xtx) / n, 0, None)
+    scale = np.sqrt(var)
+    scale[scale == 0] = 1.0
+
+    gram = centered_xtx / np.outer(scale, scale)
+    coef = np.linalg.solve(gram + alpha * np.eye(len(feature_list)), centered_xty / scale)
+
+    scaler = StandardScaler()
+    scaler.mean_, scaler.var_, scaler.scale_ = mean, var, scale
+    scaler.n_samples_seen_, scaler.n_features_in_ = n, len(feature_list)
+    scaler.feature_names_in_ = np.array(feature_list, dtype=object)
+    model = Ridge(alpha=alpha)
+    model.coef_, model.intercept_, model.n_features_in_ = coef, y_mean, len(feature_list)
+    return scaler, model
+
+
+def _predict(scaler, model, X, feature_list):
+    return model.predict(scaler.transform(pd.DataFrame(X, columns=feature_list)))
+
+
+# 🗓 Season a table belongs to, aliases resolved (the current season arrives under two file names);
+# files that are not a season source stand for themselves
+def season_key(season=None, filename=None):
+    if season is None:
+        season = {source: name for name, source in season_sources.items()}.get(filename, filename)
+    return season_aliases.get(season, season)
+
+
+# 🔢 (X, y, row hashes, player keys) of the complete rows; a key is "<season>|<normalized name>"
+def batch_matrices(df, feature_list, season):
+    df = coerce_frame(df)
+    df = df[df[feature_list + [target]].notna().all(axis=1)]
+    X = df[feature_list].to_numpy(dtype=np.float64)
+    keys = [f"{season}|{normalize_name(name)}" for name in df["Player"].tolist()]
+    # Hash only what the model reads, so a row only counts as changed when its features or target do
+    hashes = pd.util.hash_pandas_object(df[feature_list + [target]], index=False).to_numpy(dtype=np.uint64)
+    return X, df[target].to_numpy(dtype=np.float64), hashes, keys
+
+
+# 🩺 Compare the online solution with StandardScaler + Ridge refit from scratch on the same rows
+def drift_check(artifact, X, y):
+    feature_list = artifact["features"]
+    scaler = StandardScaler().fit(pd.DataFrame(X, columns=feature_list))
+    refit = Ridge(alpha=artifact["params"]["alpha"]).fit(scaler.transform(pd.DataFrame(X, columns=feature_list)), y)
+    online = _predict(artifact["scaler"], artifact["model"], X, feature_list)
+    full = _predict(scaler, refit, X, feature_list)
+    gap = float(np.abs(online - full).max() / max(np.abs(full).max(), 1e-12))
+    return {"max_relative_gap": gap, "ok": gap <= DRIFT_TOLERANCE, "refit": (scaler, refit)}
+
+
+# 🔁 Absorb delta files into the current registered model and register the result
+def update_model(delta_files, season=DEFAULT_SEASON, model_dir=MODEL_DIR, verify=False):
+    timings = {}
+    started = time.perf_counter()
+    version = data_version()
+    base = get_registered_artifact(load_frame(season), model_dir, version and f"{version}:{season}")
+    feature_list, params = base["features"], base["params"]
+    stats = base.get("stats")
+    if stats is None or stats.get("version") != STATS_VERSION:
+        # First online update: seed the statistics with the season the base model came from
+        stats = empty_stats(len(feature_list))
+        update_stats(stats, *batch_matrices(load_frame(season), feature_list, season_key(season)),
+                     source=f"season:{season}")
+    else:
+        stats = {key: (value.copy() if hasattr(value, "copy") else value) for key, value in stats.items()}
+    timings["load"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    added, batch_errors = 0, []
+    for path in delta_files:
+        # Deltas are raw scraper output: clean them exactly like the files the store is built from
+        X, y, hashes, keys = batch_matrices(read_cleaned(path), feature_list,
+                                            season_key(filename=os.path.basename(path)))
+        if len(y):
+            # Prequential error: the current model scores the batch before absorbing it
+            batch_errors.append(np.abs(_predict(base["scaler"], base["model"], X, feature_list) - y))
+        added += update_stats(stats, X, y, hashes, keys, source=path)
+    timings["update"] = time.perf_counter() - started
+
+    if added == 0:
+        return None, {"added": 0, "timings": timings}
+
+    started = time.perf_counter()
+    scaler, model = solve(stats, feature_list, params["alpha"])
+    timings["solve"] = time.perf_counter() - started
+
+    artifact = {key: value for key, value in base.items() if not key.startswith("_")}
+    artifact.update({"scaler": scaler, "model": model, "stats": stats, "trained_rows": stats["n"],
+                     "parent": base["key"]})
+    report = {"added": added, "rows": stats["n"], "timings": timings}
+    if batch_errors:
+        report["batch_mae"] = float(np.concatenate(batch_errors).mean())
+
+    if verify:
+        started = time.perf_counter()
+        X, y = stats["X"], stats["y"]
+        check = drift_check(artifact, X, y)
+        report["drift"] = {"max_relative_gap": check["max_relative_gap"], "ok": check["ok"]}
+        if not check["ok"]:
+            print(f"⚠️ Online model drifted from a full refit (gap {check['max_relative_gap']:.2e}); using the refit")
+            artifact["scaler"], artifact["model"] = check["refit"]
+        predictions = _predict(artifact["scaler"], artifact["model"], X, feature_list)
+        report["fit"] = {"mae": mean_absolute_error(y, predictions), "r2": r2_score(y, predictions)}
+        timings["verify"] = time.perf_counter() - started
+
+    digest = hashlib.sha256(base["key"].encode())
+    digest.update(np.sort(stats["row_hashes"]).tobytes())
+    key = digest.hexdigest()[:16]
+    save_artifact(artifact, key, model_dir)
+    entry = register_model(key, feature_list, params, {**current_scores(model_dir), "online": report}, timings,
+                           season=season, version=data_version(), model_dir=model_dir)
+    return entry, report
+
+
+def current_scores(model_dir=MODEL_DIR):
+    entry = current_entry(model_dir)
+    return {name: value for name, value in (entry or {}).get("scores", {}).items() if name != "online"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold new stat lines into the points model without a full retrain.")
+    parser.add_argument("deltas", nargs="*", help="Delta CSVs (default: data/delta/*.csv from the scraper)")
+    parser.add_argument("--season", default=DEFAULT_SEASON, help="Season that seeds the first online update")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--verify", action="store_true", help="Check the result against a full refit")
+    args = parser.parse_args(argv)
+
+    delta_files = args.deltas or sorted(glob.glob(os.path.join(DEFAULT_DELTA_DIR, "*.csv")))
+    if not delta_files:
+        print("⏭ No delta files to absorb.")
+        return
+
+    started = time.perf_counter()
+    entry, report = update_model(delta_files, args.season, args.model_dir, verify=args.verify)
+    if entry is None:
+        print(f"⏭ No new rows in {len(delta_files)} delta file(s); model unchanged.")
+        return
+    print(f"✅ Registered model v{entry['version']} ({entry['artifact']}): +{report['added']} rows "
+          f"→ {report['rows']} in {time.perf_counter() - started:.3f}s")
+    if "batch_mae" in report:
+        print(f"📊 MAE on the new rows before the update: {report['batch_mae']:.2f}")
+    if "drift" in report:
+        print(f"🩺 Max relative gap vs full refit: {report['drift']['max_relative_gap']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import count_columns
+from dataset_store import STORE_DIR, distinct_seasons, load_frame, read_meta, season_sources
+from player_index import normalize_name
+
+# 🪪 Cross-season player identity: one stable player ID for every spelling of a player
+# across season files. Exact matches share a normalized name key (case, accents, punctuation
+# and token order ignored). Fuzzy matches are only scored for candidate pairs from blocking:
+# a phonetic block (Soundex of every name token) plus a sorted-neighbourhood window over the
+# keys and over the reversed keys, so work grows with players × window, not players².
+# Two names seen in the same season are never merged. The ID map is persisted, and later
+# builds only load seasons whose store partition changed and only score pairs with a new key.
+
+IDENTITY_DIR = "data/identity"
+ID_MAP_FILE = "player_ids.json"
+ID_MAP_VERSION = 1
+MATCH_THRESHOLD = 0.9
+WINDOW = 4
+MAX_BLOCK = 50  # larger phonetic blocks (very common names) are left to the sorted-neighbourhood pass
+
+soundex_codes = {letter: digit for digit, letters in enumerate(["aeiouy", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"])
+                 for letter in letters}
+
+
+# 🔑 "O'Neil,  José" → "jose oneil"
+def name_key(name):
+    tokens = re.sub(r"[^a-z0-9 ]", "", normalize_name(name).replace("-", " ")).split()
+    return " ".join(sorted(tokens))
+
+
+def soundex(token):
+    if not token[0].isalpha():
+        return token
+    code, last = token[0], soundex_codes.get(token[0])
+    for letter in token[1:]:
+        if letter in "hw":
+            continue
+        digit = soundex_codes.get(letter)
+        if digit and digit != last:
+            code += str(digit)
+            if len(code) == 4:
+                break
+        last = digit
+    return code.ljust(4, "0")
+
+
+def phonetic_key(key):
+    return " ".join(sorted(soundex(token) for token in key.split()))
+
+
+def numbers(key):
+    return {token for token in key.split() if token.isdigit()}
+
+
+# 🧱 Candidate pairs (i < j) from the phonetic blocks + sorted-neighbourhood windows;
+# with `new` given, only pairs touching at least one new key
+def candidate_pairs(keys, new=None, window=WINDOW, max_block=MAX_BLOCK):
+    pairs = set()
+    touches = (lambda a, b: True) if new is None else (lambda a, b: a in new or b in new)
+
+    blocks = defaultdict(list)
+    for i, key in enumerate(keys):
+        blocks[phonetic_key(key)].append(i)
+    for members in blocks.values():
+        if 1 < len(members) <= max_block:
+            pairs.update((a, b) for a, b in combinations(members, 2) if touches(a, b))
+
+    for order in (sorted(range(len(keys)), key=keys.__getitem__),
+                  sorted(range(len(keys)), key=lambda i: keys[i][::-1])):
+        for position, a in enumerate(order):
+            for b in order[position + 1:position + 1 + window]:
+                if touches(a, b):
+                    pairs.add((min(a, b), max(a, b)))
+    return pairs
+
+
+# 📏 Similarity, or None below the threshold (cheap upper bounds first, as difflib.get_close_matches does)
+def match_score(a, b, threshold=MATCH_THRESHOLD):
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return None
+    score = matcher.ratio()
+    return score if score >= threshold else None
+
+
+def empty_id_map():
+    return {"version": ID_MAP_VERSION, "next_id": 1, "sources": {}, "keys": {}}
+
+
+# 🧩 Resolve `season_names` ({season: raw names}) into `id_map`, in place.
+# Existing keys keep their IDs; new keys join an existing player or get a new ID.
+def resolve(season_names, id_map=None, threshold=MATCH_THRESHOLD, window=WINDOW, max_block=MAX_BLOCK):
+    id_map = id_map or empty_id_map()
+    entries = id_map["keys"]
+    stats = {"names": 0, "new_keys": 0, "pairs": 0, "fuzzy_merges": [], "new_players": 0}
+
+    # Keys are computed once per distinct spelling, however many seasons it appears in
+    raw = {season: pd.unique(pd.Series(names, dtype=object).dropna()) for season, names in season_names.items()}
+    distinct = pd.unique(np.concatenate(list(raw.values()))) if raw else []
+    key_of = dict(zip(distinct, map(name_key, distinct)))
+
+    # Season membership of every key; a reloaded season replaces its old membership
+    known = {season for entry in entries.values() for season in entry["seasons"]}
+    for season, names in raw.items():
+        if season in known:
+            for entry in entries.values():
+                if season in entry["seasons"]:
+                    entry["seasons"].remove(season)
+        stats["names"] += len(names)
+        for name in names:
+            key = key_of[name]
+            if not key:
+                continue
+            entry = entries.setdefault(key, {"id": None, "name": name, "seasons": []})
+            if season not in entry["seasons"]:
+                entry["seasons"].append(season)
+
+    keys = list(entries)
+    new = {i for i, key in enumerate(keys) if entries[key]["id"] is None}
+    stats["new_keys"] = len(new)
+    if not new:
+        return id_map, stats
+
+    # Union-find over keys, seeded with the clusters already in the map
+    parent = list(range(len(keys)))
+    seasons = [set(entries[key]["seasons"]) for key in keys]
+    ids = [entries[key]["id"] for key in keys]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        parent[b] = a
+        seasons[a] |= seasons[b]
+        ids[a] = ids[a] or ids[b]
+
+    first_with_id = {}
+    for i, player_id in enumerate(ids):
+        if player_id is not None:
+            if player_id in first_with_id:
+                union(find(first_with_id[player_id]), find(i))
+            else:
+                first_with_id[player_id] = i
+
+    pairs = candidate_pairs(keys, new, window, max_block)
+    stats["pairs"] = len(pairs)
+    # Numeric tokens (jersey numbers, league suffixes) must agree exactly
+    digits = [numbers(key) for key in keys]
+    scored = [(score, a, b) for a, b in pairs
+              if digits[a] == digits[b] and (score := match_score(keys[a], keys[b], threshold)) is not None]
+
+    # Best matches first; never merge names that share a season or two already-stable IDs
+    for score, a, b in sorted(scored, reverse=True):
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b or seasons[root_a] & seasons[root_b] or (ids[root_a] and ids[root_b]):
+            continue
+        union(root_a, root_b)
+        stats["fuzzy_merges"].append((entries[keys[a]]["name"], entries[keys[b]]["name"], round(score, 3)))
+
+    for i in sorted(new):
+        root = find(i)
+        if ids[root] is None:
+            ids[root] = f"p{id_map['next_id']:06d}"
+            id_map["next_id"] += 1
+            stats["new_players"] += 1
+        entries[keys[i]]["id"] = ids[root]
+    return id_map, stats
+
+
+def id_map_path(identity_dir=IDENTITY_DIR):
+    return os.path.join(identity_dir, ID_MAP_FILE)
+
+
+def load_id_map(identity_dir=IDENTITY_DIR):
+    path = id_map_path(identity_dir)
+    if not os.path.exists(path):
+        return empty_id_map()
+    with open(path) as fh:
+        id_map = json.load(fh)
+    return id_map if id_map.get("version") == ID_MAP_VERSION else empty_id_map()
+
+
+def save_id_map(id_map, identity_dir=IDENTITY_DIR):
+    os.makedirs(identity_dir, exist_ok=True)
+    path = id_map_path(identity_dir)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(id_map, fh, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+# 🔄 Bring the persisted map up to date with the store; only changed seasons are read
+def update_id_map(seasons=None, full=False, threshold=MATCH_THRESHOLD, window=WINDOW, identity_dir=IDENTITY_DIR,
+                  store_dir=STORE_DIR):
+    id_map = empty_id_map() if full else load_id_map(identity_dir)
+    partitions = (read_meta(store_dir) or {}).get("partitions", {})
+    season_names, skipped = {}, []
+    for season in seasons or season_sources:
+        fingerprint = partitions.get(season, {}).get("fingerprint")
+        if fingerprint is not None and id_map["sources"].get(season) == fingerprint:
+            skipped.append(season)
+            continue
+        season_names[season] = load_frame(season, columns=["Player"], store_dir=store_dir)["Player"]
+        id_map["sources"][season] = fingerprint
+
+    id_map, stats = resolve(season_names, id_map, threshold, window)
+    stats["skipped"] = skipped
+    save_id_map(id_map, identity_dir)
+    return id_map, stats
+
+
+# 🏷 Player ID for every name (None where the name is unknown to the map)
+def player_ids(names, id_map):
+    entries = id_map["keys"]
+    return pd.Series(names, dtype=object).map(lambda name: entries.get(name_key(name), {}).get("id")
+                                              if isinstance(name, str) else None)
+
+
+# 📚 Career totals per player ID across seasons (an alias never adds its season a second time)
+def career_stats(id_map, seasons=None):
+    frames = []
+    for season in distinct_seasons(seasons or id_map["sources"]):
+        df = load_frame(season, columns=["Player"] + count_columns)
+        frames.append(df.assign(player_id=player_ids(df["Player"], id_map).to_numpy(), season=season))
+    df = pd.concat(frames, ignore_index=True).dropna(subset=["player_id"])
+    names = {entry["id"]: entry["name"] for entry in id_map["keys"].values()}
+    careers = df.groupby("player_id")[count_columns].sum()
+    careers.insert(0, "seasons", df.groupby("player_id")["season"].nunique())
+    careers.insert(0, "Player", careers.index.map(names))
+    return careers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assign stable player IDs across season files.")
+    parser.add_argument("command", choices=["build", "lookup", "careers"])
+    parser.add_argument("name", nargs="?", help="Player name for lookup")
+    parser.add_argument("--season", action="append", help="Limit to these seasons (repeatable)")
+    parser.add_argument("--full", action="store_true", help="Rebuild the map from scratch (IDs may change)")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="Fuzzy match similarity")
+    parser.add_argument("--window", type=int, default=WINDOW, help="Sorted-neighbourhood window")
+    parser.add_argument("--stat", default="PTS", help="Career stat to rank by")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--identity-dir", default=IDENTITY_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        id_map, stats = update_id_map(args.season, args.full, args.threshold, args.window, args.identity_dir)
+        players = len({entry["id"] for entry in id_map["keys"].values()})
+        for season in stats["skipped"]:
+            print(f"⏭ {season}: unchanged")
+        for a, b, score in stats["fuzzy_merges"]:
+            print(f"🔗 {a!r} ≈ {b!r} ({score})")
+        print(f"\n🎯 {stats['names']} names → {stats['new_keys']} new keys, {stats['pairs']} candidate pairs, "
+              f"{len(stats['fuzzy_merges'])} fuzzy merges, {stats['new_players']} new players "
+              f"({players} players, {len(id_map['keys'])} keys) in {time.perf_counter() - started:.2f}s "
+              f"→ {id_map_path(args.identity_dir)}")
+        return
+
+    id_map = load_id_map(args.identity_dir)
+    if not id_map["keys"]:
+        print("🚨 No ID map yet (run: python scripts/player_identity.py build)")
+        return
+
+    if args.command == "lookup":
+        player_id = player_ids([args.name or ""], id_map).iat[0]
+        if player_id is None:
+            print(f"🚨 '{args.name}' is not in the ID map.")
+            return
+        print(f"🪪 {player_id}")
+        for key, entry in id_map["keys"].items():
+            if entry["id"] == player_id:
+                print(f"  {entry['name']:<30} {', '.join(sorted(entry['seasons']))}")
+    else:
+        careers = career_stats(id_map, args.season)
+        print(careers.nlargest(args.top, args.stat).to_string())
+
+
+if __name__ == "__main__":
+    main()
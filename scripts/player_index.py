@@ -0,0 +1,91 @@
+import bisect
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+# 🔎 Player name index, built once per dataset version:
+#   • normalized-name hash map → row positions (exact lookups in O(1))
+#   • sorted key list → prefix autocomplete via binary search (O(log n + k))
+#   • character trigram postings → typo-tolerant suggestions
+
+
+# 🧽 "  José  O'Neil " → "jose o'neil"
+def normalize_name(name):
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerIndex:
+    def __init__(self, names):
+        names = pd.Series(names, dtype=object).fillna("").astype(str)
+        keys = names.map(normalize_name).to_numpy()
+
+        # Group row positions by normalized key in one stable sort
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        groups = np.split(order, boundaries) if len(order) else []
+
+        self.keys = [sorted_keys[group_start] for group_start in np.r_[0, boundaries]] if len(order) else []
+        self.positions = dict(zip(self.keys, groups))
+        self.display = {key: names.iloc[rows[0]] for key, rows in self.positions.items()}
+
+        self.grams = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                self.grams[gram].append(key_id)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # Row positions (into the frame the index was built from) for an exact name match
+    def lookup(self, name):
+        return self.positions.get(normalize_name(name), np.empty(0, dtype=np.intp))
+
+    # Display names starting with `prefix`, alphabetical
+    def complete(self, prefix, limit=10):
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "￿", lo=start)
+        return [self.display[key] for key in self.keys[start:min(end, start + limit)]]
+
+    # Closest display names to a possibly misspelled query
+    def suggest(self, name, limit=5, min_score=0.5):
+        query = normalize_name(name)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        shared = Counter(key_id for gram in query_grams for key_id in self.grams.get(gram, ()))
+        # Re-rank only the candidates sharing the most trigrams
+        candidates = [key_id for key_id, _ in shared.most_common(limit * 10)]
+        scored = []
+        for key_id in candidates:
+            key = self.keys[key_id]
+            jaccard = shared[key_id] / len(query_grams | trigrams(key))
+            score = 0.5 * jaccard + 0.5 * SequenceMatcher(None, query, key).ratio()
+            if score >= min_score:
+                scored.append((score, key))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.display[key] for _, key in scored[:limit]]
+
+
+# Process-wide cache: one index per version key (e.g. "<data_version>:<season>")
+_indexes = {}
+
+
+def get_index(df, version=None):
+    cache_key = version or pd.util.hash_pandas_object(df["Player"], index=False).sum()
+    if cache_key not in _indexes:
+        _indexes[cache_key] = PlayerIndex(df["Player"])
+    return _indexes[cache_key]
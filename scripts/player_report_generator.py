@@ -1,43 +1,43 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import Ridge
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, r2_score
-
-# 📥 Load Dataset
-file_path = "data/processed/final_final_cleaned_peg_city_basketball_stats.csv"
-df = pd.read_csv(file_path)
-
-# 🔍 Ensure TS% & AST_RATIO Columns Exist
-if "TS%" not in df.columns:
-    df["TS%"] = df["PTS"] / (2 * (df["FGA"] + (0.44 * df["FTA"])))
-    df["TS%"] = df["TS%"].replace([float('inf'), -float('inf')], 0).fillna(0)
-    df.loc[(df["PTS"] == 0) | (df["FGA"] + (0.44 * df["FTA"]) == 0), "TS%"] = 0
-    df.loc[df["TS%"] > 1, "TS%"] = 1  # Ensures valid TS% values
-
-if "AST_RATIO" not in df.columns:
-    df["AST_RATIO"] = df["AST"] / (df["AST"] + df["TO"])
-    df["AST_RATIO"] = df["AST_RATIO"].fillna(0)  # Handles NaN values
+
+from dataset_store import data_version, load_frame
+from leaderboards import get_leaderboards
+from model_store import get_serving_artifact
+from player_index import get_index
+from projections import get_projection_table
+
+# 📥 Load Dataset (typed columnar store with TS%, AST_RATIO & co. precomputed, see metrics.py)
+season = "peg_city_basketball"
+df = load_frame(season)
+
+# 🌟 Ridge Regression Model: registered winner of model_selection.py, loaded once per process from its
+# sklearn-free serving copy (see model_store.py)
+version = data_version()
+artifact = get_serving_artifact(df, version=version and f"{version}:{season}")
+mae_ridge, r2_ridge = artifact["metrics"]["mae"], artifact["metrics"]["r2"]
+
+# 🔎 Player name index (hash lookup + autocomplete + typo suggestions), built once per data version
+player_index = get_index(df, version and f"{version}:{season}")
+
+def find_player_rows(player_name):
+    return df.iloc[player_index.lookup(player_name)]
+
+# 📈 Projected points for the whole season, scored in one batch and stored per data/model version
+projections = get_projection_table(df, artifact, season, version)
 
 # 🔮 Predicting Future Points for Player
 def predict_future_performance(player_name):
-    player_stats = df[df["Player"].str.lower() == player_name.lower()]  # Exact match
-    if player_stats.empty:
+    rows = player_index.lookup(player_name)  # Exact (normalized) match
+    if not len(rows):
         return f"🚨 No future prediction available for '{player_name}'."
 
-    player_features = player_stats[["FG%", "AST", "DREB", "OREB", "3P%", "EFF", "RPG", "APG", "SPG", "BPG", "PPR"]]
-    player_features_scaled = scaler.transform(player_features)  # Standardizing features
-
-    predicted_pts = ridge_model.predict(player_features_scaled)[0]  # Predict future points
+    predicted_pts = projections.iloc[rows[0]]["predicted_pts"]  # Precomputed batch prediction
 
     return f"🔮 **Projected Points in Next Game:** **{predicted_pts:.2f}** _(Based on current trends and AI predictions)_"
 
 # 🔍 Helper Function: Generate Player Report (Exact Match Fix)
 def generate_report(player_name):
-    player_stats = df[df["Player"].str.lower() == player_name.lower()]  # Exact match only
+    player_stats = find_player_rows(player_name)  # Exact (normalized) match only
     if player_stats.empty:
         return f"🚨 No data available for '{player_name}'.\n❌ **Possible reasons:**\n• Name is incorrect—please enter the full name as listed in the stats.\n• No recorded games—this player may not have played yet."
 
@@ -58,17 +58,16 @@ st.set_page_config(page_title="GameChanger: AI Basketball Dashboard", layout="wi
 st.title("🏀 GameChanger Basketball AI Dashboard")
 st.sidebar.header("Enter a Player Name:")
 
-# ⚡ Correct session state handling
-if "previous_player" not in st.session_state:
-    st.session_state.previous_player = ""
-
-player_name = st.sidebar.text_input("Player Name", "")
+# Streamlit already reruns the script when the input changes, so no manual st.rerun() here
+player_name = st.sidebar.text_input("Player Name", "").strip()
 
-# 🧹 Refresh dashboard only when a valid new name is entered
-if player_name.strip():  # Avoids blank screen when Enter is pressed with an empty input
-    if player_name != st.session_state.previous_player:
-        st.session_state.previous_player = player_name
-        st.rerun()  # Corrected function for smooth UI refresh
+# 💡 Autocomplete: offer prefix matches, or close spellings, when the name isn't an exact hit
+if player_name and not len(player_index.lookup(player_name)):
+    suggestions = player_index.complete(player_name) or player_index.suggest(player_name)
+    if suggestions:
+        choice = st.sidebar.selectbox("Did you mean…", suggestions, index=None, placeholder="Pick a player")
+        if choice:
+            player_name = choice
 
 # 📊 Generate Report if Name is Entered
 if player_name:
@@ -76,7 +75,7 @@ if player_name:
     st.write(report)
 
     # 📊 Display Player Stats Table (Compact Format)
-    player_stats_display = df[df["Player"].str.lower() == player_name.lower()][["PTS", "FG%", "TS%", "AST_RATIO", "EFF", "RPG", "APG", "SPG", "BPG"]]
+    player_stats_display = find_player_rows(player_name)[["PTS", "FG%", "TS%", "AST_RATIO", "EFF", "RPG", "APG", "SPG", "BPG"]]
 
     if player_stats_display.empty:
         st.write(f"🚨 No data available for '{player_name}'.\n❌ **Possible reasons:**\n• Name is incorrect—please enter the full name as listed in the stats.\n• No recorded games—this player may not have played yet.")
@@ -88,25 +87,6 @@ if player_name:
     prediction = predict_future_performance(player_name)
     st.write(prediction)
 
-# 🔮 Predictive Model Setup
-features = ["FG%", "AST", "DREB", "OREB", "3P%", "EFF", "RPG", "APG", "SPG", "BPG", "PPR"]
-X = df[features].dropna()
-y = df.loc[X.index, "PTS"]
-
-# 🔍 Feature Scaling for Predictions
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-
-# 🌟 Ridge Regression Model
-ridge_model = Ridge(alpha=1.0)
-ridge_model.fit(X_train, y_train)
-
-# Predictions & Evaluation
-y_pred_ridge = ridge_model.predict(X_test)
-mae_ridge = mean_absolute_error(y_test, y_pred_ridge)
-r2_ridge = r2_score(y_test, y_pred_ridge)
-
 # 🔮 Coach-Friendly Prediction Summary
 st.subheader("🔮 Performance Prediction Accuracy")
 st.write(f"📊 **Expected Points Deviation:** ±{mae_ridge:.2f} _(Predictions are close but allow for slight variation)_")
@@ -114,7 +94,7 @@ st.write(f"📈 **Trend Reliability:** **{r2_ridge:.0%}** _(Model captures trend
 
 # 🏀 Game Summary (Final Section)
 st.subheader("🏀 Team-Wide Insights")
-top_players = df.nlargest(3, "EFF")[["Player", "EFF", "PTS", "FG%", "TS%"]]
+top_players = get_leaderboards(season, df=df).top("EFF", 3)[["Player", "EFF", "PTS", "FG%", "TS%"]]
 
 if top_players.empty:
     st.write("No top players found for this dataset.")
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from dataset_store import open_dataset, read_meta, season_sources, source_path
+
+# 📏 One-pass streaming profiler: count, nulls, mean/std/skew/kurtosis, min/max, approximate
+# quantiles and IQR outlier counts for every column, computed chunk by chunk with bounded
+# memory. Moments merge exactly (Chan/Pébay pairwise updates) and quantiles come from a KLL
+# sketch, so profiles of files, chunks and seasons can be merged into one.
+
+DEFAULT_K = 1000  # KLL size: ~3·k items kept per column whatever the row count; rank error shrinks as ~1 / k
+DEFAULT_CHUNKSIZE = 100_000
+PROFILE_DIR = "data/profiles"
+
+
+# 🎯 KLL quantile sketch: level h holds items of weight 2^h; full levels sort and promote
+# every other item (random offset) to the level above.
+class KLLSketch:
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                keep, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self.rng.integers(2)::2]])
+                level = 0  # Capacities shift when a level is added; re-check from the bottom
+                continue
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, qs):
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:  # Nothing compacted yet: exact, with pandas' linear interpolation
+            return np.quantile(self.levels[0], qs)
+        items, cumulative = self._weighted()
+        targets = np.asarray(qs) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, targets), len(items) - 1)]
+
+    # Estimated number of items < x (or <= x)
+    def rank(self, x, inclusive=False):
+        if self.n == 0:
+            return 0.0
+        items, cumulative = self._weighted()
+        position = np.searchsorted(items, x, side="right" if inclusive else "left")
+        return float(cumulative[position - 1] / cumulative[-1] * self.n) if position else 0.0
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [np.array(items, dtype=np.float64) for items in data["levels"]]
+        return sketch
+
+
+# 📊 Mergeable profile of a table; numeric columns get moments + a sketch, others counts/nulls
+class Profile:
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.rows = 0
+        self.columns = {}
+
+    def _column(self, name, numeric):
+        if name not in self.columns:
+            self.columns[name] = {"numeric": numeric, "count": 0, "nulls": 0}
+            if numeric:
+                self.columns[name].update({"mean": 0.0, "m2": 0.0, "m3": 0.0, "m4": 0.0, "min": np.inf,
+                                           "max": -np.inf, "sketch": KLLSketch(self.k, seed=len(self.columns))})
+        return self.columns[name]
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            series = chunk[name]
+            numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            column = self._column(name, numeric)
+            nulls = int(series.isna().sum())
+            column["nulls"] += nulls
+            if not column["numeric"]:
+                column["count"] += len(series) - nulls
+                continue
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if len(values):
+                mean = values.mean()
+                centered = values - mean
+                squared = centered * centered  # Plain products: ** 3 / ** 4 fall back to slow pow()
+                batch = {"count": len(values), "mean": mean, "m2": squared.sum(),
+                         "m3": (squared * centered).sum(), "m4": (squared * squared).sum()}
+                _merge_moments(column, batch)
+                column["min"] = min(column["min"], values.min())
+                column["max"] = max(column["max"], values.max())
+                column["sketch"].update(values)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for name, theirs in other.columns.items():
+            ours = self._column(name, theirs["numeric"])
+            ours["nulls"] += theirs["nulls"]
+            if not ours["numeric"]:
+                ours["count"] += theirs["count"]
+                continue
+            _merge_moments(ours, theirs)
+            ours["min"] = min(ours["min"], theirs["min"])
+            ours["max"] = max(ours["max"], theirs["max"])
+            ours["sketch"].merge(theirs["sketch"])
+        return self
+
+    # 📋 describe()-style table plus nulls, shape statistics and IQR outlier counts
+    def summary(self):
+        rows = {}
+        for name, column in self.columns.items():
+            if not column["numeric"]:
+                rows[name] = {"count": column["count"], "nulls": column["nulls"]}
+                continue
+            n = column["count"]
+            q1, median, q3 = column["sketch"].quantile([0.25, 0.5, 0.75])
+            low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            sketch = column["sketch"]
+            rows[name] = {
+                "count": n,
+                "nulls": column["nulls"],
+                "mean": column["mean"] if n else np.nan,
+                "std": np.sqrt(column["m2"] / (n - 1)) if n > 1 else np.nan,
+                "min": column["min"] if n else np.nan,
+                "25%": q1, "50%": median, "75%": q3,
+                "max": column["max"] if n else np.nan,
+                "skew": np.sqrt(n) * column["m3"] / column["m2"] ** 1.5 if column["m2"] > 0 else np.nan,
+                "kurtosis": n * column["m4"] / column["m2"] ** 2 - 3 if column["m2"] > 0 else np.nan,
+                "outliers": round(sketch.rank(low) + n - sketch.rank(high, inclusive=True)) if n else 0,
+            }
+        return pd.DataFrame(rows).T
+
+    def to_dict(self):
+        columns = {name: {key: (value.to_dict() if key == "sketch" else value) for key, value in column.items()}
+                   for name, column in self.columns.items()}
+        return {"k": self.k, "rows": self.rows, "columns": columns}
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(data["k"])
+        profile.rows = data["rows"]
+        profile.columns = {name: {key: (KLLSketch.from_dict(value) if key == "sketch" else value)
+                                  for key, value in column.items()}
+                           for name, column in data["columns"].items()}
+        return profile
+
+
+# ➕ Pairwise merge of count / mean / central moments (Pébay 2008), in place into `into`
+def _merge_moments(into, other):
+    na, nb = into["count"], other["count"]
+    if nb == 0:
+        return
+    if na == 0:
+        into.update({key: other[key] for key in ("count", "mean", "m2", "m3", "m4")})
+        return
+    n = na + nb
+    delta = other["mean"] - into["mean"]
+    m2 = into["m2"] + other["m2"] + delta ** 2 * na * nb / n
+    m3 = (into["m3"] + other["m3"] + delta ** 3 * na * nb * (na - nb) / n ** 2
+          + 3 * delta * (na * other["m2"] - nb * into["m2"]) / n)
+    m4 = (into["m4"] + other["m4"] + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+          + 6 * delta ** 2 * (na ** 2 * other["m2"] + nb ** 2 * into["m2"]) / n ** 2
+          + 4 * delta * (na * other["m3"] - nb * into["m3"]) / n)
+    into.update({"count": n, "mean": into["mean"] + delta * nb / n, "m2": m2, "m3": m3, "m4": m4})
+
+
+# 📥 Streaming sources: in-memory frames, CSVs read in chunks, store seasons read batch by batch
+def profile_frame(df, k=DEFAULT_K, chunksize=DEFAULT_CHUNKSIZE):
+    profile = Profile(k)
+    for start in range(0, len(df), chunksize):
+        profile.update(df.iloc[start:start + chunksize])
+    return profile
+
+
+def profile_csv(path, k=DEFAULT_K, chunksize=DEFAULT_CHUNKSIZE):
+    profile = Profile(k)
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        profile.update(chunk)
+    return profile
+
+
+def profile_season(season, k=DEFAULT_K, chunksize=DEFAULT_CHUNKSIZE):
+    meta = read_meta()
+    if not meta or season not in meta["partitions"]:
+        return profile_csv(source_path(season_sources[season]), k, chunksize)
+    profile = Profile(k)
+    dataset = open_dataset()
+    columns = [name for name in dataset.schema.names if name not in ("row_hash", "season")]
+    for batch in dataset.to_batches(columns=columns, filter=ds.field("season") == season, batch_size=chunksize):
+        profile.update(batch.to_pandas())
+    return profile
+
+
+def save_profile(profile, name, profile_dir=PROFILE_DIR):
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"{name}.json")
+    with open(path + ".tmp", "w") as fh:
+        json.dump(profile.to_dict(), fh)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_profile(path):
+    with open(path) as fh:
+        return Profile.from_dict(json.load(fh))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile seasons or CSV files in one streaming pass.")
+    parser.add_argument("inputs", nargs="*", help="CSV files or saved profile JSONs (default: every store season)")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="KLL sketch size (larger = more accurate quantiles)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--save", action="store_true", help=f"Write each profile to {PROFILE_DIR}/<name>.json")
+    args = parser.parse_args(argv)
+
+    merged = Profile(args.k)
+    for source in args.inputs or list(season_sources):
+        started = time.perf_counter()
+        if source.endswith(".json"):
+            profile = load_profile(source)
+        elif source.endswith(".csv"):
+            profile = profile_csv(source, args.k, args.chunksize)
+        else:
+            profile = profile_season(source, args.k, args.chunksize)
+        name = os.path.splitext(os.path.basename(source))[0]
+        print(f"\n🔍 {name}: {profile.rows} rows profiled in {time.perf_counter() - started:.3f}s")
+        print(profile.summary().to_string(float_format=lambda value: f"{value:.2f}"))
+        if args.save:
+            print(f"💾 {save_profile(profile, name)}")
+        merged.merge(profile)
+
+    print(f"\n📚 Merged profile ({merged.rows} rows):")
+    print(merged.summary().to_string(float_format=lambda value: f"{value:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
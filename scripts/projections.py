@@ -0,0 +1,116 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from instrument import span, traced
+
+# 📈 Batch scoring for the points model and a materialized projection table.
+# A whole roster / season is scored with one matrix product instead of one
+# scaler.transform + predict per player, and the results are stored per
+# (season, data version, model key) so the dashboard and reports just read rows.
+
+PROJECTION_DIR = "data/projections"
+
+# Process-wide cache: projection file path → loaded table
+_tables = {}
+
+
+# 🧮 Fold StandardScaler into the Ridge weights: ((x - μ) / σ) · w + b  ==  x · (w / σ) + (b - μ · w / σ)
+def linear_weights(artifact):
+    scaler, model = artifact["scaler"], artifact["model"]
+    scale = np.where(scaler.scale_ == 0, 1.0, scaler.scale_)
+    weights = model.coef_ / scale
+    intercept = model.intercept_ - np.dot(scaler.mean_, weights)
+    return weights, intercept
+
+
+# 🚀 Predicted points for every row of `df` (NaN where a feature is missing).
+# dtype=np.float32 scores from a half-size feature matrix (see compact_schema.py).
+@traced("predict.batch")
+def predict_points(df, artifact, dtype=np.float64):
+    if "_linear" not in artifact:
+        artifact["_linear"] = linear_weights(artifact)
+    weights, intercept = artifact["_linear"]
+    X = df[artifact["features"]].to_numpy(dtype=dtype)
+    predictions = (X @ weights.astype(dtype) + intercept).astype(np.float64)
+    predictions[np.isnan(X).any(axis=1)] = np.nan
+    return predictions
+
+
+# 👥 Predictions for many players at once; unknown names come back with NaN
+def predict_batch(player_names, df, artifact, player_index):
+    positions = [player_index.lookup(name) for name in player_names]
+    first_rows = np.array([rows[0] if len(rows) else -1 for rows in positions])
+    found = first_rows >= 0
+    predicted = np.full(len(player_names), np.nan)
+    predicted[found] = predict_points(df.iloc[first_rows[found]], artifact)
+    return pd.DataFrame({"Player": list(player_names), "found": found, "predicted_pts": predicted})
+
+
+def build_projection_table(df, artifact, season, version):
+    table = pd.DataFrame({
+        "Player": df["Player"].to_numpy(),
+        "row": np.arange(len(df)),
+        "predicted_pts": predict_points(df, artifact),
+        "projected_fg": df["FG%"].to_numpy() * 1.05,  # Assuming a slight improvement trend
+    })
+    table["season"] = season
+    table["data_version"] = version
+    table["model_key"] = artifact["key"]
+    return table
+
+
+def projection_path(season, version, model_key, projection_dir=PROJECTION_DIR):
+    return os.path.join(projection_dir, f"{season}-{version}-{model_key}.arrow")
+
+
+# 📦 Load-or-build the projection table for one season / data version / model.
+# Without a data version (store not built) there is nothing safe to key on, so it is not persisted.
+def get_projection_table(df, artifact, season, version, projection_dir=PROJECTION_DIR):
+    if version is None:
+        return build_projection_table(df, artifact, season, version)
+
+    path = projection_path(season, version, artifact["key"], projection_dir)
+    if path in _tables:
+        return _tables[path]
+
+    if os.path.exists(path):
+        with span("predict.load_projections", season=season):
+            table = feather.read_table(path, memory_map=True).to_pandas()
+    else:
+        table = build_projection_table(df, artifact, season, version)
+        os.makedirs(projection_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        feather.write_feather(pa.Table.from_pandas(table, preserve_index=False), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+
+    _tables[path] = table
+    return table
+
+
+def main(argv=None):
+    from dataset_store import DEFAULT_SEASON, data_version, load_frame
+    from model_store import get_serving_artifact
+
+    parser = argparse.ArgumentParser(description="Materialize projected points for a whole season.")
+    parser.add_argument("--season", default=DEFAULT_SEASON)
+    parser.add_argument("--top", type=int, default=10, help="Print the top N projections")
+    args = parser.parse_args(argv)
+
+    df = load_frame(args.season)
+    version = data_version()
+    artifact = get_serving_artifact(df, version=version and f"{version}:{args.season}")
+    started = time.perf_counter()
+    table = get_projection_table(df, artifact, args.season, version)
+    print(f"✅ {len(table)} projections for {args.season} in {time.perf_counter() - started:.3f}s "
+          f"→ {projection_path(args.season, version, artifact['key'])}")
+    print(table.nlargest(args.top, "predicted_pts")[["Player", "predicted_pts", "projected_fg"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import statistics
+import time
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+import pandas as pd
+from lxml import etree
+
+from instrument import record, span
+from scrape_manifest import (DEFAULT_DELTA_DIR, DEFAULT_MANIFEST, hex_hashes, known_pages, load_manifest,
+                             read_previous, record_result, row_hashes, save_manifest)
+
+# List of URLs to scrape (Removed broken playoff link)
+urls = [
+    "https://pegcityball.info/2024-25-regular-season-statistics/",
+    "https://pegcityball.info/2023-24-regular-season-statistics/",
+    "https://pegcityball.info/summer-statistics/",
+    "https://pegcityball.info/2024-spring-statistics/",
+    "https://pegcityball.info",
+    "https://pegcityball.info/standings-2024-summer-league/",
+    "https://pegcityball.info/2024-spring-standings/",
+    "https://pegcityball.info/2023-summer-standings/"
+]
+
+# Define standard headers for consistency across all datasets
+standard_headers = [
+    "Player", "GP", "FT", "FGM", "FGA", "FG%", "3PM", "3PA", "3P%", "FTM", "FTA", "FT%",
+    "DREB", "OREB", "AST", "STL", "TO", "BLK", "PTS", "RPG", "APG", "SPG", "BPG", "EFF", "PPR"
+]
+
+# ⚙️ Engine defaults (pages per host in flight, seconds per request)
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_PAGES = 200
+USER_AGENT = "GameChanger-Scraper/1.0"
+
+
+# 📄 Create a clean filename from the URL (same names the Safari loop produced)
+def filename_for(url):
+    slug = urlparse(url).path.strip("/").split("/")[-1]
+    filename = slug if slug else "peg_city_general"
+    return filename.replace("-", "_") + "_stats.csv"
+
+
+# 🔢 Page links look like ?page=3, ?paged=3 or /page/3/ depending on the table plugin
+page_link_pattern = re.compile(r"([?&](?:page|paged|pg)=|/page/)(\d+)")
+# Classes of the elements table plugins wrap their pager in
+pager_classes = {"pagination", "pager", "nav-links", "page-numbers", "wp-pagenavi"}
+
+
+# 🧱 Pull every <td> row out of the first table in one parse
+def parse_table_rows(page_html):
+    return parse_page(page_html)[0]
+
+
+# 📖 Parse a page once: its table rows plus the URLs of the league table's other pages
+def parse_page(page_html, url=""):
+    tree = etree.fromstring(page_html, etree.HTMLParser())
+    return _table_rows(tree), _page_links(tree, url)
+
+
+def _table_rows(tree):
+    table = tree.find(".//table") if tree is not None else None
+    if table is None:
+        raise ValueError("no <table> element found")
+
+    data = []
+    for row in table.iter("tr"):
+        # Plain cells are read straight off .text; only nested markup pays for itertext()
+        row_data = [(cell.text or "").strip() if len(cell) == 0 else "".join(cell.itertext()).strip()
+                    for cell in row.iterfind("td")]
+        if row_data:  # Avoid empty rows (header rows only hold <th>)
+            data.append(row_data)
+    return data
+
+
+# 🏠 Host + path of a page URL with any /page/N/ segment removed
+def _table_path(url):
+    parsed = urlparse(url)
+    return parsed.netloc, re.sub(r"/page/\d+/?$", "/", parsed.path).rstrip("/")
+
+
+# A link belongs to the table's pager if it points at the table's own path or sits inside a
+# pager element; blog or news "/page/N/" links elsewhere on the page must not widen the fan-out
+def _is_pager_link(link, absolute, url):
+    if url and _table_path(absolute) == _table_path(url):
+        return True
+    return any(pager_classes & set((ancestor.get("class") or "").split()) for ancestor in link.iterancestors()) and \
+        (not url or urlparse(absolute).netloc == urlparse(url).netloc)
+
+
+# 🔗 Expand the pager into every page URL. Numbered pagers only show a window of
+# links (1 2 3 … 9), so we take the highest number and fill in the gaps ourselves.
+def _page_links(tree, url):
+    if tree is None:
+        return {"pages": [], "next": None}
+
+    numbered = {}
+    next_url = None
+    for link in tree.iter("a"):
+        href = link.get("href")
+        if not href:
+            continue
+        absolute = urljoin(url, href)
+        if not _is_pager_link(link, absolute, url):
+            continue
+        match = page_link_pattern.search(absolute)
+        if match:
+            numbered[int(match.group(2))] = (absolute, match)
+        if link.get("rel") == "next" or "next" in (link.get("class") or "").split():
+            next_url = absolute
+
+    pages = []
+    if numbered:
+        last, (template, match) = max(numbered.items())
+        start, end = match.span(2)
+        pages = [template[:start] + str(number) + template[end:] for number in range(2, last + 1)]
+    return {"pages": pages, "next": next_url}
+
+
+# 🏷 Map raw rows onto standard_headers exactly like the original webdriver loop
+def normalize_table(data):
+    df = pd.DataFrame(data)
+
+    # Ensure header detection is correct
+    if not df.empty and all(str(col).isalpha() for col in df.iloc[0]):
+        extracted_headers = list(df.iloc[0])  # Assume first row contains headers
+        df = df[1:]  # Remove header row from data
+    else:
+        extracted_headers = standard_headers[:df.shape[1]]  # Use default headers
+
+    # Assign headers dynamically, adjusting for column mismatches
+    expected_columns = df.shape[1]
+    if expected_columns > len(standard_headers):
+        extra_headers = [f"Extra_{i}" for i in range(expected_columns - len(standard_headers))]
+        df.columns = standard_headers + extra_headers  # Expand headers list
+    else:
+        df.columns = extracted_headers[:expected_columns]  # Standard assignment
+
+    # Add missing columns from standard list
+    for missing in standard_headers:
+        if missing not in df.columns:
+            df[missing] = None  # Add empty column
+
+    # Remove extra columns if they exist
+    extra_columns = [col for col in df.columns if col not in standard_headers]
+    df = df.drop(columns=extra_columns, errors="ignore")
+    return df.reset_index(drop=True)
+
+
+# 🌐 Fetch one page; the connector caps how many requests hit each host at once.
+# Passing the validators from the last run turns it into a conditional GET.
+async def fetch_page(session, url, validators=None):
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    started = time.perf_counter()
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            body = None
+        else:
+            response.raise_for_status()
+            body = await response.read()
+        return {
+            "status": response.status,
+            "body": body,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "seconds": time.perf_counter() - started,
+        }
+
+
+async def _fetch_and_parse(session, url, page, validators=None):
+    fetched = await fetch_page(session, url, validators)
+    timing = {"page": page, "url": url, "seconds": fetched["seconds"], "status": fetched["status"],
+              "etag": fetched["etag"], "last_modified": fetched["last_modified"], "rows": 0, "sha256": None,
+              "error": None}
+    if fetched["body"] is None:
+        return None, None, timing
+
+    # Parsing is CPU-bound; keep it off the event loop so other fetches keep flowing
+    data, links = await asyncio.to_thread(parse_page, fetched["body"], url)
+    timing["rows"] = len(data)
+    timing["sha256"] = hashlib.sha256(fetched["body"]).hexdigest()
+    return normalize_table(data), links, timing
+
+
+# 🩹 Pages after the first: a failure is recorded on the page and the rest of the table is kept
+async def _fetch_other_page(session, url, page, validators=None):
+    started = time.perf_counter()
+    try:
+        return await _fetch_and_parse(session, url, page, validators)
+    except Exception as e:
+        return None, {"pages": [], "next": None}, {
+            "page": page, "url": url, "seconds": time.perf_counter() - started, "status": None, "etag": None,
+            "last_modified": None, "rows": 0, "sha256": None, "error": str(e)}
+
+
+# 🔁 Re-validate every page we saw last time with conditional GETs: {page URL: (frame, links, timing)}.
+# Pages the server re-sent are parsed right away; 304 pages come back without a frame.
+async def _revalidate_pages(session, url, known):
+    if not known or url not in known["pages"]:
+        return {}
+    checks = await asyncio.gather(*(_fetch_other_page(session, page_url, number, page)
+                                    for number, (page_url, page) in enumerate(known["pages"].items(), start=1)))
+    return {check[2]["url"]: check for check in checks}
+
+
+# ♻️ Rows of a page we saw before, from the saved CSV (None when any of them can't be found)
+def _previous_page(previous, page):
+    if previous is None or page.get("row_hashes") is None:
+        return None
+    frame, positions = previous
+    rows = [positions.get(int(h, 16)) for h in page["row_hashes"]]
+    if any(row is None for row in rows):
+        return None
+    return frame.iloc[rows].reset_index(drop=True)
+
+
+# 📚 Walk every page of one league table. Numbered pagers are fanned out in parallel;
+# tables that only expose a "next" link are followed one page at a time.
+# With `known` (this table's manifest entry, see scrape_manifest.known_pages) every page seen
+# before is re-validated first. If none changed the table is reported unchanged; otherwise the
+# re-sent pages are used as downloaded, 304 pages (and seen pages that failed to load) are
+# rebuilt from the saved CSV, and only pages never seen before are downloaded.
+async def _scrape_one(session, url, max_pages=DEFAULT_MAX_PAGES, known=None):
+    try:
+        checks = await _revalidate_pages(session, url, known)
+        if checks and all(check[2]["status"] == 304 for check in checks.values()):
+            timings = [check[2] for check in checks.values()]
+            return {"url": url, "frame": None, "unchanged": True, "seconds": sum(t["seconds"] for t in timings),
+                    "pages": timings, "failed_pages": [], "error": None}
+
+        seen = list(checks)
+        reuse = any(check[2]["status"] != 200 for check in checks.values())
+        previous = await asyncio.to_thread(read_previous, known["file"]) if reuse else None
+
+        async def load(page_url, number):
+            if page_url not in checks:
+                return await (_fetch_and_parse(session, page_url, number) if number == 1 else
+                              _fetch_other_page(session, page_url, number))
+            frame, links, timing = checks[page_url]
+            if timing["status"] == 200:
+                return frame, links, timing
+            page = known["pages"][page_url]
+            frame = _previous_page(previous, page)
+            if frame is None:  # Rows not in the saved CSV any more: download the page again
+                return await (_fetch_and_parse(session, page_url, number) if number == 1 else
+                              _fetch_other_page(session, page_url, number))
+            # An unchanged page links where it did last time: page 1 to the pages we know, others to the next one
+            position = seen.index(page_url)
+            links = {"pages": seen[1:] if position == 0 else [],
+                     "next": seen[position + 1] if position + 1 < len(seen) else None}
+            timing = {**timing, "rows": len(frame),
+                      **{key: timing[key] or page.get(key) for key in ("etag", "last_modified", "sha256")}}
+            return frame, links, timing
+
+        frame, links, timing = await load(url, 1)
+        frames, timings = [frame], [timing]
+
+        if links["pages"]:
+            page_urls = links["pages"][:max_pages - 1]
+            pages = await asyncio.gather(*(load(page_url, number)
+                                           for number, page_url in enumerate(page_urls, start=2)))
+            frames += [page[0] for page in pages]
+            timings += [page[2] for page in pages]
+        else:
+            walked = {url}
+            next_url = links["next"]
+            while next_url and next_url not in walked and len(frames) < max_pages:
+                walked.add(next_url)
+                frame, links, timing = await load(next_url, len(frames) + 1)
+                frames.append(frame)
+                timings.append(timing)
+                next_url = links["next"]
+
+        for frame, timing in zip(frames, timings):
+            timing["row_hashes"] = hex_hashes(row_hashes(frame)) if frame is not None else None
+
+        # Pages can overlap when the table shifts mid-scrape; keep each stat line once
+        merged = pd.concat([frame for frame in frames if frame is not None],
+                           ignore_index=True).drop_duplicates(ignore_index=True)
+        return {"url": url, "frame": merged, "unchanged": False, "seconds": sum(t["seconds"] for t in timings),
+                "pages": timings, "failed_pages": [t for t in timings if t.get("error")], "error": None}
+    except Exception as e:
+        return {"url": url, "frame": None, "unchanged": False, "seconds": None, "pages": [], "failed_pages": [],
+                "error": str(e)}
+
+
+# 🚀 Scrape every URL concurrently with one pooled HTTP client.
+# known_pages maps a table URL to its saved CSV and pages, from scrape_manifest.known_pages.
+async def scrape_async(url_list, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT, max_pages=DEFAULT_MAX_PAGES,
+                       known_pages=None):
+    known_pages = known_pages or {}
+    connector = aiohttp.TCPConnector(limit_per_host=per_host)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    headers = {"User-Agent": USER_AGENT}
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=headers) as session:
+        return await asyncio.gather(*(_scrape_one(session, url, max_pages, known_pages.get(url))
+                                      for url in url_list))
+
+
+def scrape(url_list=None, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT, max_pages=DEFAULT_MAX_PAGES,
+           known_pages=None):
+    with span("scrape", tables=len(url_list or urls)):
+        results = asyncio.run(scrape_async(url_list or urls, per_host=per_host, timeout=timeout, max_pages=max_pages,
+                                           known_pages=known_pages))
+    # Tables are fetched concurrently on one event loop, so each is recorded with its own wall time
+    for result in results:
+        if result["seconds"] is not None:
+            record("scrape.table", result["seconds"], url=result["url"], pages=len(result["pages"]),
+                   unchanged=result["unchanged"])
+    return results
+
+
+# ⏱ Per-page fetch timings for one scraped table
+def report_page_timings(result):
+    seconds = [page["seconds"] for page in result["pages"]]
+    if not seconds:
+        return
+    print(f"   ⏱ {len(seconds)} pages: min {min(seconds):.2f}s, median {statistics.median(seconds):.2f}s, "
+          f"max {max(seconds):.2f}s")
+    for page in result["pages"]:
+        fetched = "not modified" if page.get("status") == 304 else \
+            f"failed ({page['error']})" if page.get("error") else f"{page['rows']:>4} rows"
+        print(f"      page {page['page']:>3}: {fetched} in {page['seconds']:.2f}s")
+
+
+# 💾 Write each scraped table as <slug>_stats.csv. With a manifest, tables the server
+# reports as unchanged (or whose rows hash the same) are left untouched and changed
+# tables also get a delta CSV holding only their new/changed rows.
+def save_results(results, output_dir, manifest=None, delta_dir=DEFAULT_DELTA_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    saved = []
+    for result in results:
+        if result["error"]:
+            print(f"🚨 Skipping {result['url']} - Error: {result['error']}")
+            continue
+        if result["failed_pages"]:
+            print(f"⚠️ {result['url']}: {len(result['failed_pages'])} page(s) failed to load "
+                  f"(kept their previous rows where known)")
+        filename = os.path.join(output_dir, filename_for(result["url"]))
+
+        if manifest is None:
+            result["frame"].to_csv(filename, index=False)
+            saved.append(filename)
+            print(f"✅ Saved: {filename} ({len(result['frame'])} rows, {result['seconds']:.2f}s)")
+        else:
+            status, delta_filename = record_result(manifest, result, filename, delta_dir)
+            if status == "updated":
+                saved.append(filename)
+                entry = manifest["tables"][result["url"]]
+                print(f"✅ Saved: {filename} ({entry['rows']} rows, {entry['delta_rows']} new/changed, "
+                      f"{entry['removed_rows']} gone) → delta {delta_filename}")
+            elif status == "same-content":
+                print(f"⏭ Same rows as last scrape, kept: {filename}")
+            elif status == "missing":
+                print(f"⚠️ Not modified (304) but {filename} is missing; it will be fetched in full next run")
+            else:
+                print(f"⏭ Not modified (304), kept: {filename}")
+        report_page_timings(result)
+    return saved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Peg City Ball stat tables without a browser.")
+    parser.add_argument("--output-dir", default="data", help="Directory for the *_stats.csv files")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent requests per host")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout in seconds")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="Stop after this many pages per table")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Scrape manifest used for incremental runs")
+    parser.add_argument("--delta-dir", default=DEFAULT_DELTA_DIR, help="Where changed-row CSVs are written")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and rewrite every table")
+    parser.add_argument("urls", nargs="*", help="Override the default URL list")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    started = time.perf_counter()
+    results = scrape(args.urls or urls, per_host=args.per_host, timeout=args.timeout, max_pages=args.max_pages,
+                     known_pages=None if args.full else known_pages(manifest))
+    saved = save_results(results, args.output_dir, manifest, args.delta_dir)
+    save_manifest(manifest, args.manifest)
+
+    # 🏆 Fold the new/changed rows into the materialized leaderboards (see leaderboards.py)
+    if saved:
+        from leaderboards import apply_deltas
+        for entry in apply_deltas([os.path.join(args.delta_dir, os.path.basename(filename)) for filename in saved],
+                                  data_dir=args.output_dir):
+            if entry["season"]:
+                print(f"🏆 Leaderboards {entry['season']}: {entry['rows']} delta rows applied")
+        # 🧊 …and into the aggregation cube (player seasons and standings tables, see stat_cube.py)
+        from stat_cube import apply_deltas as apply_cube_deltas
+        applied = [entry for entry in apply_cube_deltas([os.path.join(args.delta_dir, os.path.basename(filename))
+                                                         for filename in saved], data_dir=args.output_dir)
+                   if entry["source"]]
+        print(f"🧊 Cube: {len(applied)} delta table(s) re-aggregated")
+    elapsed = time.perf_counter() - started
+    pages = sum(len(result["pages"]) for result in results)
+    print(f"\n🎯 Scraped {len(results)} tables ({pages} pages) in {elapsed:.2f}s ({pages / elapsed:.1f} pages/sec)")
+
+
+if __name__ == "__main__":
+    main()
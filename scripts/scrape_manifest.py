@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# 🗂 Scrape manifest: what each table looked like last time we saw it.
+# Per table URL we keep the HTTP validators (ETag / Last-Modified), content hash and row hashes
+# of every page, a hash of the whole merged table, and one 64-bit hash per row so a re-scrape can
+# emit just the rows that are new or changed. A page that answers 304 is rebuilt from the saved
+# CSV through its row hashes, so only changed or never-seen pages are downloaded.
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST = "data/scrape_manifest.json"
+DEFAULT_DELTA_DIR = "data/delta"
+
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "tables": {}}
+    with open(path) as fh:
+        manifest = json.load(fh)
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"⚠️ Ignoring {path}: manifest version {manifest.get('version')} != {MANIFEST_VERSION}")
+        return {"version": MANIFEST_VERSION, "tables": {}}
+    return manifest
+
+
+def save_manifest(manifest, path=DEFAULT_MANIFEST):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp_path, path)  # Never leave a half-written manifest behind
+
+
+# 🔑 Per table URL: its saved CSV and every page's validators (sent as conditional GET headers),
+# content hash and row hashes. Tables whose CSV is gone are left out, so they are fetched in full.
+def known_pages(manifest):
+    keys = ("etag", "last_modified", "sha256", "row_hashes")
+    return {url: {"file": table["file"],
+                  "pages": {page["url"]: {key: page.get(key) for key in keys} for page in table.get("pages", [])}}
+            for url, table in manifest["tables"].items() if table.get("file") and os.path.exists(table["file"])}
+
+
+# #️⃣ One stable 64-bit hash per row (values only, index ignored). Missing cells hash like empty
+# strings, which is all a saved CSV can tell apart, so rows read back from it hash the same.
+def row_hashes(frame):
+    return pd.util.hash_pandas_object(frame.astype("string").fillna(""), index=False).to_numpy(dtype=np.uint64)
+
+
+def hex_hashes(hashes):
+    return [f"{h:016x}" for h in hashes]
+
+
+# 📄 A saved table read back exactly as scraped (every cell a string), indexed by row hash
+def read_previous(filename):
+    frame = pd.read_csv(filename, dtype=str, keep_default_na=False)
+    return frame, {h: position for position, h in enumerate(row_hashes(frame))}
+
+
+def table_sha256(hashes):
+    return hashlib.sha256(np.sort(hashes).tobytes()).hexdigest()
+
+
+# 📝 Fold one scrape result into the manifest, writing the full CSV and a delta CSV only
+# when the table content actually changed. Returns "unchanged", "same-content", "updated" or
+# "missing" (every page was 304 but the CSV is gone: the table is forgotten, so the next run
+# fetches it in full)
+# The delta directory only ever holds this run's changes, so stale deltas are removed.
+def record_result(manifest, result, filename, delta_dir=DEFAULT_DELTA_DIR):
+    url = result["url"]
+    previous = manifest["tables"].get(url, {})
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    delta_filename = os.path.join(delta_dir, os.path.basename(filename))
+
+    if result["unchanged"] and not os.path.exists(filename):
+        manifest["tables"].pop(url, None)
+        _remove(delta_filename)
+        return "missing", None
+
+    if result["unchanged"]:  # Every page answered 304 Not Modified
+        previous["checked_at"] = now
+        manifest["tables"][url] = previous
+        _remove(delta_filename)
+        return "unchanged", None
+
+    frame = result["frame"]
+    hashes = row_hashes(frame)
+    digest = table_sha256(hashes)
+    pages = [{key: page.get(key) for key in ("url", "etag", "last_modified", "sha256", "row_hashes")}
+             for page in result["pages"]]
+    entry = {"file": filename, "table_sha256": digest, "rows": len(frame), "pages": pages,
+             "row_hashes": hex_hashes(hashes), "checked_at": now, "changed_at": now}
+
+    if previous.get("table_sha256") == digest and os.path.exists(filename):
+        # Server re-sent the page (no validators, or a cosmetic change) but the rows are identical
+        entry["changed_at"] = previous.get("changed_at", now)
+        manifest["tables"][url] = entry
+        _remove(delta_filename)
+        return "same-content", None
+
+    old_hashes = np.array([int(h, 16) for h in previous.get("row_hashes", [])], dtype=np.uint64)
+    is_new = ~np.isin(hashes, old_hashes)
+    delta = frame[is_new]
+    entry["delta_rows"] = int(is_new.sum())
+    entry["removed_rows"] = int((~np.isin(old_hashes, hashes)).sum())
+
+    frame.to_csv(filename, index=False)
+    os.makedirs(delta_dir, exist_ok=True)
+    delta.to_csv(delta_filename, index=False)
+
+    manifest["tables"][url] = entry
+    return "updated", delta_filename
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
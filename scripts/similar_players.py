@@ -0,0 +1,246 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from instrument import span, traced
+from model_store import scaler_stats
+
+# 👯 "Who plays like X?": nearest neighbours over standardized stat vectors.
+# Players are the registered points model's feature vectors, standardized with the mean / scale
+# its StandardScaler was fitted with, and compared by Euclidean distance. Every player's top-K
+# neighbours are computed once per (season, data version, model artifact) and stored, so
+# a lookup is a row read. Ad-hoc queries (k > K, or a stat line that is not in the data) go
+# through a KD-tree for large low-dimensional sets and a blocked NumPy brute force otherwise;
+# small seasons also skip the sklearn import that way.
+
+SIMILAR_DIR = "data/similar"
+SIMILAR_VERSION = 1
+K = 10  # neighbours materialized per player
+KD_TREE_MAX_DIMS = 16  # above this a KD-tree degrades to scanning most leaves anyway
+BRUTE_FORCE_ROWS = 20_000  # below this, blocked brute force beats building a tree
+BLOCK_CELLS = 1 << 24  # distance matrix cells per brute-force block (64 MB of float32)
+
+# Process-wide cache: index file path → loaded index
+_indexes = {}
+
+
+# 📏 Standardized complete rows as float32 (NaN rows excluded); mean / scale default to
+# StandardScaler statistics over those rows
+def standardize(df, feature_list, mean=None, scale=None):
+    X = df[feature_list].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(X).any(axis=1)
+    if mean is None:
+        mean = X[valid].mean(axis=0) if valid.any() else np.zeros(len(feature_list))
+        scale = X[valid].std(axis=0) if valid.any() else np.ones(len(feature_list))
+    mean, scale = np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64).copy()
+    scale[scale == 0] = 1.0
+    return ((X[valid] - mean) / scale).astype(np.float32), np.flatnonzero(valid), mean, scale
+
+
+def choose_algorithm(rows, dims):
+    return "kd_tree" if rows >= BRUTE_FORCE_ROWS and dims <= KD_TREE_MAX_DIMS else "brute"
+
+
+# 🧱 k nearest vectors for each query by brute force, one block of queries at a time:
+# ‖q - x‖² = ‖q‖² - 2·q·x + ‖x‖², so each block is a single matrix product
+def brute_force_knn(vectors, queries, k):
+    k = min(k, len(vectors))
+    norms = np.einsum("ij,ij->i", vectors, vectors)
+    neighbors = np.empty((len(queries), k), dtype=np.int64)
+    distances = np.empty((len(queries), k), dtype=np.float32)
+    block = max(1, BLOCK_CELLS // max(len(vectors), 1))
+    for start in range(0, len(queries), block):
+        query = queries[start:start + block]
+        squared = norms - 2 * (query @ vectors.T) + np.einsum("ij,ij->i", query, query)[:, None]
+        nearest = np.argpartition(squared, k - 1, axis=1)[:, :k] if k < len(vectors) else \
+            np.broadcast_to(np.arange(k), squared.shape)
+        nearest_sq = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(nearest_sq, axis=1, kind="stable")
+        neighbors[start:start + block] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:start + block] = np.sqrt(np.maximum(np.take_along_axis(nearest_sq, order, axis=1), 0))
+    return neighbors, distances
+
+
+# 🚫 Drop each query's own row from k + 1 candidates (or the farthest one when ties pushed it out)
+def drop_self(neighbors, distances, own):
+    keep = neighbors != own[:, None]
+    keep[keep.all(axis=1), -1] = False
+    shape = (len(neighbors), neighbors.shape[1] - 1)
+    return neighbors[keep].reshape(shape), distances[keep].reshape(shape)
+
+
+class SimilarityIndex:
+    def __init__(self, features, mean, scale, rows, vectors, neighbors, distances, frame_rows, algorithm):
+        self.features = list(features)
+        self.mean, self.scale = mean, scale
+        self.rows = rows  # frame positions of the indexed (complete) rows
+        self.vectors = vectors
+        self.neighbors = neighbors  # top-K per indexed row, as positions into self.rows
+        self.distances = distances
+        self.algorithm = algorithm
+        self.tree = None
+        self.position = np.full(frame_rows, -1, dtype=np.int64)
+        self.position[rows] = np.arange(len(rows))
+
+    # 🏗 Index over `feature_list`; pass the model scaler's mean / scale to standardize like the model
+    @classmethod
+    @traced("similar.build")
+    def build(cls, df, feature_list, k=K, algorithm="auto", mean=None, scale=None):
+        feature_list = list(feature_list)
+        vectors, rows, mean, scale = standardize(df, feature_list, mean, scale)
+        if algorithm == "auto":
+            algorithm = choose_algorithm(len(rows), len(feature_list))
+        index = cls(feature_list, mean, scale, rows, vectors, None, None, len(df), algorithm)
+        neighbors, distances = index._knn(vectors, min(k, len(rows) - 1) + 1) if len(rows) > 1 else \
+            (np.empty((len(rows), 1), dtype=np.int64), np.empty((len(rows), 1), dtype=np.float32))
+        index.neighbors, index.distances = drop_self(neighbors, distances, np.arange(len(rows)))
+        return index
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def k(self):
+        return self.neighbors.shape[1]
+
+    def _knn(self, queries, k):
+        if self.algorithm == "kd_tree":
+            if self.tree is None:
+                from sklearn.neighbors import KDTree
+
+                self.tree = KDTree(self.vectors)
+            distances, neighbors = self.tree.query(queries, k=min(k, len(self.vectors)), breadth_first=True)
+            return neighbors, distances.astype(np.float32)
+        return brute_force_knn(self.vectors, queries.astype(np.float32), k)
+
+    # 👯 Frame positions + distances of the k players closest to frame row `row` (itself excluded);
+    # empty when the row has a missing feature
+    def similar(self, row, k=5):
+        position = self.position[row]
+        if position < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if k <= self.k:
+            return self.rows[self.neighbors[position, :k]], self.distances[position, :k]
+        neighbors, distances = self._knn(self.vectors[position:position + 1], k + 1)
+        neighbors, distances = drop_self(neighbors, distances, np.array([position]))
+        return self.rows[neighbors[0]], distances[0]
+
+    # 📋 Top-k for every indexed player at once: (frame rows, neighbour frame rows, distances)
+    def all_similar(self, k=5):
+        if k <= self.k:
+            return self.rows, self.rows[self.neighbors[:, :k]], self.distances[:, :k]
+        neighbors, distances = self._knn(self.vectors, k + 1)
+        neighbors, distances = drop_self(neighbors, distances, np.arange(len(self.rows)))
+        return self.rows, self.rows[neighbors], distances
+
+    # 🎯 Players closest to an arbitrary stat line ({feature: value})
+    def nearest(self, values, k=5):
+        vector = (np.array([values[name] for name in self.features], dtype=np.float64) - self.mean) / self.scale
+        neighbors, distances = self._knn(vector.astype(np.float32)[None, :], k)
+        return self.rows[neighbors[0]], distances[0]
+
+    def save(self, path):
+        with open(path + ".tmp", "wb") as fh:
+            np.savez(fh, version=SIMILAR_VERSION, features=np.array(self.features), mean=self.mean,
+                     scale=self.scale, rows=self.rows, vectors=self.vectors, neighbors=self.neighbors.astype(np.int32),
+                     distances=self.distances, frame_rows=len(self.position), algorithm=self.algorithm)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != SIMILAR_VERSION:
+                return None
+            return cls(data["features"].tolist(), data["mean"], data["scale"], data["rows"], data["vectors"],
+                       data["neighbors"].astype(np.int64), data["distances"], int(data["frame_rows"]),
+                       str(data["algorithm"]))
+
+
+# 📋 Neighbours of one player as a frame: Player, distance and the compared stats
+def similar_table(df, index, row, k=5, columns=None):
+    rows, distances = index.similar(row, k)
+    table = df.iloc[rows][["Player"] + list(columns or index.features)].reset_index(drop=True)
+    table.insert(1, "distance", np.round(distances.astype(np.float64), 3))
+    return table
+
+
+def index_path(season, version, artifact_key, similar_dir=SIMILAR_DIR):
+    return os.path.join(similar_dir, f"{season}-{version}-{artifact_key}.npz")
+
+
+# 📦 Load-or-build the index for one season / data version / model artifact (full or serving
+# copy). Without a data version (store not built) there is nothing safe to key on, so it is
+# built in memory only.
+def get_similarity_index(df, artifact, season, version, similar_dir=SIMILAR_DIR):
+    mean, scale = scaler_stats(artifact)
+    if version is None:
+        return SimilarityIndex.build(df, artifact["features"], mean=mean, scale=scale)
+
+    path = index_path(season, version, artifact["key"], similar_dir)
+    if path in _indexes:
+        return _indexes[path]
+
+    index = None
+    if os.path.exists(path):
+        with span("similar.load", season=season):
+            index = SimilarityIndex.load(path)
+    if index is None or len(index.position) != len(df) or index.features != list(artifact["features"]):
+        index = SimilarityIndex.build(df, artifact["features"], mean=mean, scale=scale)
+        os.makedirs(similar_dir, exist_ok=True)
+        index.save(path)
+
+    _indexes[path] = index
+    return index
+
+
+def main(argv=None):
+    from dataset_store import DEFAULT_SEASON, data_version, load_frame
+    from model_store import get_serving_artifact
+    from player_index import get_index
+
+    parser = argparse.ArgumentParser(description="Find players with similar stat profiles.")
+    parser.add_argument("command", choices=["build", "show", "all"])
+    parser.add_argument("name", nargs="?", help="Player name for show")
+    parser.add_argument("--season", default=DEFAULT_SEASON)
+    parser.add_argument("--top", type=int, default=5, help="Neighbours per player")
+    parser.add_argument("--output", help="CSV for the all-players table (default: print the first rows)")
+    args = parser.parse_args(argv)
+
+    df = load_frame(args.season)
+    version = data_version()
+    artifact = get_serving_artifact(df, version=version and f"{version}:{args.season}")
+    started = time.perf_counter()
+    index = get_similarity_index(df, artifact, args.season, version)
+    print(f"✅ {len(index)} players indexed ({index.algorithm}, {len(index.features)} features, top {index.k}) "
+          f"in {time.perf_counter() - started:.3f}s → {index_path(args.season, version, artifact['key'])}")
+
+    if args.command == "show":
+        rows = get_index(df, version and f"{version}:{args.season}").lookup(args.name or "")
+        if not len(rows):
+            print(f"🚨 '{args.name}' not found in {args.season}.")
+            return
+        started = time.perf_counter()
+        index.similar(rows[0], args.top)
+        elapsed = time.perf_counter() - started
+        table = similar_table(df, index, rows[0], args.top)
+        print(f"👯 Players most like {df['Player'].iat[rows[0]]} (query {elapsed * 1e3:.3f} ms):")
+        print(table.to_string(index=False) if len(table) else "  (incomplete stat line, not indexed)")
+    elif args.command == "all":
+        rows, neighbors, distances = index.all_similar(args.top)
+        players = df["Player"].to_numpy(dtype=object)
+        table = pd.DataFrame({"Player": players[rows]})
+        for rank in range(neighbors.shape[1]):
+            table[f"similar_{rank + 1}"] = players[neighbors[:, rank]]
+            table[f"distance_{rank + 1}"] = np.round(distances[:, rank].astype(np.float64), 3)
+        if args.output:
+            table.to_csv(args.output, index=False)
+            print(f"💾 {len(table)} rows written to {args.output}")
+        else:
+            print(table.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
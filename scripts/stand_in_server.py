@@ -0,0 +1,167 @@
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scrape_engine import urls
+
+# 🏟 Local stand-in for pegcityball.info so the scraper can be exercised and benchmarked offline.
+# Pages mirror the live layout: a <thead> of <th> labels and one <td> row per player,
+# split into pages of players_per_page rows with a windowed ?page=N pager underneath.
+
+site_headers = [
+    "Player", "GP", "MIN", "GS", "FGM", "FGA", "FG%", "3PM", "3PA", "3P%", "FTM", "FTA", "FT%",
+    "DREB", "OREB", "AST", "STL", "TO", "BLK", "PTS", "RPG", "APG", "SPG", "BPG", "PPG", "EFF"
+]
+standings_headers = ["#", "Team", "GP", "W", "L", "PCT"]
+
+first_names = ["Zak", "Parminder", "Chris", "Will", "Elijah", "Matthew", "Jayden", "Justin", "Marcus", "Andre",
+               "Tyler", "Kofi", "Daniel", "Noah", "Isaiah", "Malik", "Ethan", "Omar", "Liam", "Jamal"]
+last_names = ["Dembele", "Mangat", "Benevides", "Sesay", "Mensah", "Koenig", "Westerlund", "Duff", "Brown",
+              "Okafor", "Nguyen", "Singh", "Campbell", "Reyes", "Thompson", "Asante", "Lee", "Martin", "Diallo"]
+
+
+# 🎲 Deterministic player stat line in the site's column order
+def player_row(rng, index):
+    name = f"{rng.choice(first_names)} {rng.choice(last_names)} {index}"
+    gp = rng.randint(1, 20)
+    fga = rng.randint(5, 25) * gp
+    fgm = int(fga * rng.uniform(0.3, 0.6))
+    tpa = int(fga * rng.uniform(0.1, 0.45))
+    tpm = int(tpa * rng.uniform(0.2, 0.45))
+    fta = rng.randint(0, 8) * gp
+    ftm = int(fta * rng.uniform(0.5, 0.9))
+    dreb, oreb = rng.randint(0, 8) * gp, rng.randint(0, 3) * gp
+    ast, stl, to, blk = rng.randint(0, 7) * gp, rng.randint(0, 3) * gp, rng.randint(0, 4) * gp, rng.randint(0, 2) * gp
+    pts = 2 * (fgm - tpm) + 3 * tpm + ftm
+    eff = pts + dreb + oreb + ast + stl + blk - (fga - fgm) - (fta - ftm) - to
+
+    def pct(made, att):
+        return f"{100 * made / att:.1f}" if att else "0.0"
+
+    return [name, gp, rng.randint(10, 40) * gp, 0, fgm, fga, pct(fgm, fga), tpm, tpa, pct(tpm, tpa), ftm, fta,
+            pct(ftm, fta), dreb, oreb, ast, stl, to, blk, pts, f"{(dreb + oreb) / gp:.1f}", f"{ast / gp:.1f}",
+            f"{stl / gp:.1f}", f"{blk / gp:.1f}", f"{pts / gp:.1f}", f"{eff / gp:.1f}"]
+
+
+def standings_row(rng, index):
+    gp = rng.randint(6, 20)
+    wins = rng.randint(0, gp)
+    return [index, f"Team {index}", gp, wins, gp - wins, f"{wins / gp:.3f}"]
+
+
+# 🔢 Pager like the live site's: first, last and a window around the current page
+def render_pager(page, page_count):
+    if page_count <= 1:
+        return ""
+    shown = sorted({1, page_count, *range(max(1, page - 2), min(page_count, page + 2) + 1)})
+    links = "".join(f'<a class="page-numbers" href="?page={n}">{n}</a>' for n in shown if n != page)
+    if page < page_count:
+        links += f'<a class="next page-numbers" rel="next" href="?page={page + 1}">Next</a>'
+    return f'<nav class="pagination">{links}</nav>'
+
+
+def render_table(headers, rows, pager=""):
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows)
+    return f"<html><body><table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>{pager}</body></html>"
+
+
+# 📚 One generated league per URL path, built once when the server starts.
+# Pages carry an ETag / Last-Modified pair so conditional GETs can be answered with 304.
+class StandInLeague:
+    def __init__(self, players_per_page=500, pages_per_table=1, seed=42, paths=None):
+        self.players_per_page = players_per_page
+        self.tables = {}
+        self.pages = {}
+        for offset, path in enumerate(paths or [urlparse(url).path or "/" for url in urls]):
+            rng = random.Random(seed + offset)
+            if "standings" in path or path == "/":
+                rows = [standings_row(rng, i + 1) for i in range(rng.randint(4, 12))]
+                self.tables[path] = (standings_headers, rows, len(rows))
+            else:
+                rows = [player_row(rng, i) for i in range(players_per_page * pages_per_table)]
+                self.tables[path] = (site_headers, rows, players_per_page)
+            self._render(path)
+
+    def _render(self, path):
+        headers, rows, per_page = self.tables[path]
+        chunks = [rows[i:i + per_page] for i in range(0, len(rows), per_page)]
+        modified = formatdate(time.time(), usegmt=True)
+        self.pages[path] = []
+        for n, chunk in enumerate(chunks, start=1):
+            body = render_table(headers, chunk, render_pager(n, len(chunks))).encode()
+            self.pages[path].append((body, f'"{hashlib.sha1(body).hexdigest()}"', modified))
+
+    # ✏️ Simulate in-season updates: re-roll a few stat lines on one table
+    def touch(self, path, count=5, seed=0):
+        headers, rows, per_page = self.tables[path]
+        rng = random.Random(seed)
+        for index in rng.sample(range(len(rows)), min(count, len(rows))):
+            rows[index] = player_row(rng, index) if headers is site_headers else standings_row(rng, index + 1)
+        self._render(path)
+
+    def lookup(self, path, page=1):
+        pages = self.pages.get(path) or self.pages.get(path.rstrip("/") + "/")
+        if not pages or not 1 <= page <= len(pages):
+            return None
+        return pages[page - 1]
+
+
+def make_handler(league, delay):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)  # Simulated network + server render latency
+            parsed = urlparse(self.path)
+            page = parse_qs(parsed.query).get("page", ["1"])[0]
+            found = league.lookup(parsed.path, int(page)) if page.isdigit() else None
+            if found is None:
+                self.send_error(404)
+                return
+            body, etag, modified = found
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modified)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output readable
+
+    return StandInHandler
+
+
+# 🔌 Start the server on a background thread; port 0 picks a free port
+def start_server(port=0, delay=0.0, league=None):
+    league = league or StandInLeague()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(league, delay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# 🔁 Point the production URL list at the stand-in host, keeping the paths
+def rebase_urls(url_list, base_url):
+    return [base_url + (urlparse(url).path or "/") for url in url_list]
+
+
+if __name__ == "__main__":
+    server, base_url = start_server(port=8765)
+    print(f"🏟 Stand-in Peg City Ball running at {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,377 @@
+import argparse
+import glob
+import json
+import os
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import count_columns, rate_columns
+from data_cleaning import read_cleaned
+from dataset_store import (STORE_DIR, coerce_frame, distinct_seasons, file_fingerprint, load_frame, read_meta,
+                           season_sources, with_metrics)
+from leaderboards import DEFAULT_LEAGUE, overlay
+from profiler import KLLSketch
+from scrape_manifest import DEFAULT_DELTA_DIR
+
+# 🧊 Aggregation cube over season × league × team × stat, built in one grouped pass per source.
+# Facts come from the season stat partitions (one row per player) and from the standings
+# tables (one row per team). The scraper saves standings under the player-stat headers, so
+# they are re-read here by position. The site lists players without a team, so player rows
+# sit under the NO_TEAM member, and team facts (W, L, PF, PA, …) come from the standings.
+# Base cells keep mergeable aggregates: count, sum, sum of squares, min, max, games and a KLL
+# sketch. Every roll-up (any dimension set to ALL) is materialized by merging base cells, so
+# drill-down and roll-up queries are a filter over a small table. A changed source
+# (store partition, standings file or scraper delta) re-aggregates only its own cells and
+# re-merges only the roll-up rows those cells feed.
+
+CUBE_DIR = "data/cube"
+CUBE_FILE = "cube.json"
+CUBE_VERSION = 2
+SKETCH_K = 200  # per cell and stat; exact below ~600 values, merged (approximate) percentiles above
+ALL = "*"
+NO_TEAM = "(no team)"
+
+dimensions = ["season", "league", "team"]
+percentiles = [0.1, 0.25, 0.5, 0.75, 0.9]
+player_stats = [col for col in count_columns if col != "GP"] + rate_columns  # GP is the per-game denominator
+
+# 🏟 Standings tables and the season each one belongs to (2023 summer has no player stats)
+standings_sources = {
+    "2024_spring": "2024_spring_standings_stats.csv",
+    "summer": "standings_2024_summer_league_stats.csv",
+    "2023_summer": "2023_summer_standings_stats.csv",
+    "peg_city_basketball": "peg_city_general_stats.csv",
+}
+# Standings layouts by number of filled cells. RANK_PTS is the score the site sorts the table by,
+# RANK_PTS_AVG its average as shown.
+standings_layouts = {
+    6: ["Rank", "Team", "GP", "W", "L", "PCT"],
+    10: ["Rank", "Team", "GP", "RANK_PTS", "RANK_PTS_AVG", "W", "L", "PF", "PA", "DIFF"],
+}
+team_stats = ["W", "L", "PCT", "RANK_PTS", "RANK_PTS_AVG", "PF", "PA", "DIFF"]
+
+
+# 🏟 One standings table as team rows. The raw scrape is read, because the cleaning
+# pipeline would clip PCT as if it were FG%.
+def read_standings(path):
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+    rows = []
+    for values in raw.itertuples(index=False):
+        cells = [value.strip() for value in values if value.strip()]
+        layout = standings_layouts.get(len(cells))
+        if layout:
+            rows.append(dict(zip(layout, cells)))
+    teams = pd.DataFrame(rows, columns=sorted({name for layout in standings_layouts.values() for name in layout}))
+    numeric = [name for name in teams.columns if name != "Team"]
+    teams[numeric] = teams[numeric].apply(pd.to_numeric, errors="coerce")
+    return teams
+
+
+# 📋 Fact rows of one source: dimensions + games + stats
+def player_facts(df, season, league=DEFAULT_LEAGUE):
+    stats = [col for col in player_stats if col in df.columns]
+    facts = df[["GP"] + stats].rename(columns={"GP": "games"}).astype(np.float64)
+    facts.insert(0, "team", NO_TEAM)
+    facts.insert(0, "league", df["league"].astype(str).to_numpy() if "league" in df.columns else league)
+    facts.insert(0, "season", season)
+    return facts
+
+
+def team_facts(teams, season, league=DEFAULT_LEAGUE):
+    facts = teams.reindex(columns=["GP"] + team_stats).rename(columns={"GP": "games"}).astype(np.float64)
+    facts.insert(0, "team", teams["Team"].astype(str).to_numpy())
+    facts.insert(0, "league", league)
+    facts.insert(0, "season", season)
+    return facts
+
+
+# 🧮 Base cells of a fact table in one grouped pass: {(season, league, team, stat): aggregates}
+def aggregate(facts):
+    stats = [col for col in facts.columns if col not in dimensions + ["games"]]
+    values = facts[stats]
+    present = values.notna()
+    games = present.mul(facts["games"].fillna(0), axis=0)
+    grouped = pd.concat({"count": present, "sum": values, "sumsq": values ** 2, "min": values, "max": values,
+                         "games": games}, axis=1).groupby([facts[dim] for dim in dimensions], sort=False)
+    totals = grouped.agg({column: (column[0] if column[0] in ("min", "max") else "sum")
+                          for column in grouped.obj.columns})
+
+    cells = {}
+    for key, positions in grouped.indices.items():
+        row = totals.loc[key]
+        for stat in stats:
+            count = int(row[("count", stat)])
+            if not count:
+                continue
+            sketch = KLLSketch(SKETCH_K)
+            sketch.update(values[stat].to_numpy()[positions])
+            cells[(*key, stat)] = {"count": count, "sum": float(row[("sum", stat)]),
+                                   "sumsq": float(row[("sumsq", stat)]), "min": float(row[("min", stat)]),
+                                   "max": float(row[("max", stat)]), "games": float(row[("games", stat)]),
+                                   "sketch": sketch}
+    return cells
+
+
+# ➕ Merge base cells into one aggregate row
+def merge_cells(cells):
+    merged = {"count": 0, "sum": 0.0, "sumsq": 0.0, "min": np.inf, "max": -np.inf, "games": 0.0}
+    sketch = KLLSketch(SKETCH_K)
+    for cell in cells:
+        for name in ("count", "sum", "sumsq", "games"):
+            merged[name] += cell[name]
+        merged["min"] = min(merged["min"], cell["min"])
+        merged["max"] = max(merged["max"], cell["max"])
+        sketch.merge(cell["sketch"])
+    count = merged["count"]
+    mean = merged["sum"] / count
+    row = {"count": count, "sum": merged["sum"], "mean": mean,
+           "std": float(np.sqrt(max(merged["sumsq"] / count - mean ** 2, 0.0))),
+           "min": merged["min"], "max": merged["max"],
+           "per_game": merged["sum"] / merged["games"] if merged["games"] else np.nan}
+    row.update({f"p{int(q * 100)}": float(value) for q, value in zip(percentiles, sketch.quantile(percentiles))})
+    return row
+
+
+# 🔢 The 2³ roll-up keys a base cell feeds, e.g. (s, l, t) → (s, l, t), (s, l, *), (s, *, t), …, (*, *, *)
+def rollup_keys(key):
+    *coordinates, stat = key
+    return [(*(value if keep else ALL for value, keep in zip(coordinates, mask)), stat)
+            for mask in product((True, False), repeat=len(dimensions))]
+
+
+class StatCube:
+    def __init__(self):
+        self.sources = {}  # source id → {"fingerprint": …, "cells": [base keys]}
+        self.cells = {}    # base key → aggregates (with sketch)
+        self.rows = {}     # materialized key (ALL for rolled-up dimensions) → derived row
+        self.deltas = []
+        self._table = None
+
+    # 🔄 Replace one source's base cells and re-merge only the roll-up rows they touch
+    def set_source(self, source, facts, fingerprint=None):
+        old = self.sources.get(source, {}).get("cells", [])
+        for key in old:
+            self.cells.pop(key, None)
+        cells = aggregate(facts) if len(facts) else {}
+        # Cells are keyed by coordinates; a source owns the ones it produced
+        self.cells.update(cells)
+        self.sources[source] = {"fingerprint": fingerprint, "cells": list(cells)}
+        self.refresh(set(old) | set(cells))
+
+    def refresh(self, base_keys):
+        targets = {target for key in base_keys for target in rollup_keys(key)}
+        members = {target: [] for target in targets}
+        for key, cell in self.cells.items():
+            for target in rollup_keys(key):
+                if target in members:
+                    members[target].append(cell)
+        for target, cells in members.items():
+            if cells:
+                self.rows[target] = merge_cells(cells)
+            else:
+                self.rows.pop(target, None)
+        self._table = None
+
+    # 📋 All materialized rows as a frame (dimensions + stat + aggregates)
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = pd.DataFrame([{**dict(zip(dimensions + ["stat"], key)), **row}
+                                        for key, row in self.rows.items()])
+        return self._table
+
+    # 🔎 Drill-down / roll-up: one row per value of the `by` dimensions; filtered dimensions are
+    # fixed, every other dimension is rolled up. Answered from materialized rows only.
+    def query(self, stats=None, by=(), **filters):
+        table = self.table
+        if table.empty:
+            return table
+        mask = np.ones(len(table), dtype=bool)
+        for dim in dimensions:
+            if dim in filters:
+                mask &= (table[dim] == filters[dim]).to_numpy()
+            elif dim in by:
+                mask &= (table[dim] != ALL).to_numpy()
+            else:
+                mask &= (table[dim] == ALL).to_numpy()
+        if stats:
+            mask &= table["stat"].isin([stats] if isinstance(stats, str) else stats).to_numpy()
+        return table[mask].sort_values(list(by) + ["stat"]).reset_index(drop=True)
+
+    # 🏟 Team standings of a season: one row per team, one column per team stat
+    def team_table(self, season, league=DEFAULT_LEAGUE):
+        rows = self.query(team_stats, by=["team"], season=season, league=league)
+        rows = rows[rows["team"] != NO_TEAM]
+        if rows.empty:
+            return rows
+        teams = rows.pivot(index="team", columns="stat", values="sum").reindex(columns=team_stats)
+        per_game = rows[rows["stat"] == "PF"].set_index("team")["per_game"]
+        return teams.assign(PF_PG=per_game).dropna(axis=1, how="all").sort_values("W", ascending=False)
+
+    def to_dict(self):
+        return {"version": CUBE_VERSION, "deltas": self.deltas,
+                "sources": {source: {"fingerprint": entry["fingerprint"], "cells": [list(key) for key in entry["cells"]]}
+                            for source, entry in self.sources.items()},
+                "cells": [[list(key), {**cell, "sketch": cell["sketch"].to_dict()}] for key, cell in self.cells.items()],
+                "rows": [[list(key), row] for key, row in self.rows.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        cube = cls()
+        cube.deltas = data["deltas"]
+        cube.sources = {source: {"fingerprint": entry["fingerprint"], "cells": [tuple(key) for key in entry["cells"]]}
+                        for source, entry in data["sources"].items()}
+        cube.cells = {tuple(key): {**cell, "sketch": KLLSketch.from_dict(cell["sketch"])} for key, cell in data["cells"]}
+        cube.rows = {tuple(key): row for key, row in data["rows"]}
+        return cube
+
+
+def cube_path(cube_dir=CUBE_DIR):
+    return os.path.join(cube_dir, CUBE_FILE)
+
+
+def load_cube(cube_dir=CUBE_DIR):
+    path = cube_path(cube_dir)
+    if not os.path.exists(path):
+        return StatCube()
+    with open(path) as fh:
+        data = json.load(fh)
+    return StatCube.from_dict(data) if data.get("version") == CUBE_VERSION else StatCube()
+
+
+def save_cube(cube, cube_dir=CUBE_DIR):
+    os.makedirs(cube_dir, exist_ok=True)
+    path = cube_path(cube_dir)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(cube.to_dict(), fh)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# 🏗 Bring the cube up to date at ingest: only sources whose store partition / standings file
+# changed are re-aggregated. Season aliases are left out, so season=* counts each season once.
+def build_cube(force=False, league=DEFAULT_LEAGUE, cube_dir=CUBE_DIR, store_dir=STORE_DIR, data_dir="data"):
+    cube = StatCube() if force else load_cube(cube_dir)
+    partitions = (read_meta(store_dir) or {}).get("partitions", {})
+    updated = []
+    for season in distinct_seasons():
+        fingerprint = (partitions.get(season) or {}).get("fingerprint")
+        source = f"players:{season}"
+        if fingerprint is not None and cube.sources.get(source, {}).get("fingerprint") == fingerprint:
+            continue
+        cube.set_source(source, player_facts(load_frame(season, store_dir=store_dir), season, league), fingerprint)
+        updated.append(source)
+    for season, filename in standings_sources.items():
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            continue
+        fingerprint = file_fingerprint(path)
+        source = f"standings:{season}"
+        if cube.sources.get(source, {}).get("fingerprint") == fingerprint:
+            continue
+        cube.set_source(source, team_facts(read_standings(path), season, league), fingerprint)
+        updated.append(source)
+    if updated:
+        cube.deltas = []
+        save_cube(cube, cube_dir)
+    _cubes.pop(cube_path(cube_dir), None)
+    return cube, updated
+
+
+# 🔄 Apply scraper delta files: a player delta is overlaid on the season's full table and
+# re-aggregated; a standings table is small enough to re-read whole
+def apply_deltas(delta_files, league=DEFAULT_LEAGUE, cube_dir=CUBE_DIR, store_dir=STORE_DIR, data_dir="data"):
+    cube = load_cube(cube_dir)
+    seasons_by_file = {season_sources[season]: season for season in distinct_seasons()}
+    standings_by_file = {filename: season for season, filename in standings_sources.items()}
+    report = []
+    for path in delta_files:
+        filename = os.path.basename(path)
+        if filename in seasons_by_file:
+            season = seasons_by_file[filename]
+            source = os.path.join(data_dir, filename)
+            current = coerce_frame(read_cleaned(source) if os.path.exists(source) else load_frame(season,
+                                                                                                store_dir=store_dir))
+            current, _ = with_metrics(overlay(current, coerce_frame(read_cleaned(path))))
+            cube.set_source(f"players:{season}", player_facts(current, season, league))
+        elif filename in standings_by_file:
+            season = standings_by_file[filename]
+            source = os.path.join(data_dir, filename)
+            cube.set_source(f"standings:{season}",
+                            team_facts(read_standings(source if os.path.exists(source) else path), season, league))
+        else:
+            report.append({"file": path, "source": None})
+            continue
+        cube.deltas.append(filename)
+        report.append({"file": path, "source": season})
+    save_cube(cube, cube_dir)
+    _cubes.pop(cube_path(cube_dir), None)
+    return report
+
+
+# Process-wide cache: cube file path → (mtime, cube)
+_cubes = {}
+
+
+# 📦 The persisted cube (built on first use); reloaded when the file changes
+def get_cube(cube_dir=CUBE_DIR):
+    path = cube_path(cube_dir)
+    if not os.path.exists(path):
+        build_cube(cube_dir=cube_dir)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _cubes.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    cube = load_cube(cube_dir)
+    _cubes[path] = (mtime, cube)
+    return cube
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, update or query the season × league × team × stat cube.")
+    parser.add_argument("command", choices=["build", "update", "query", "teams"])
+    parser.add_argument("deltas", nargs="*", help="Delta CSVs for update (default: data/delta/*.csv)")
+    parser.add_argument("--stat", action="append", help="Stats to show (repeatable, default: all)")
+    parser.add_argument("--by", action="append", choices=dimensions, default=[], help="Drill down by (repeatable)")
+    parser.add_argument("--season", help="Fix the season (otherwise rolled up unless in --by)")
+    parser.add_argument("--league", help="Fix the league")
+    parser.add_argument("--team", help="Fix the team")
+    parser.add_argument("--force", action="store_true", help="Rebuild every source")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "build":
+        cube, updated = build_cube(args.force)
+        for source in updated:
+            print(f"✅ {source}: {len(cube.sources[source]['cells'])} cells")
+        print(f"\n🎯 Cube ready: {len(cube.cells)} base cells, {len(cube.rows)} materialized rows "
+              f"({len(updated)} sources updated) in {time.perf_counter() - started:.2f}s → {cube_path()}")
+    elif args.command == "update":
+        delta_files = args.deltas or sorted(glob.glob(os.path.join(DEFAULT_DELTA_DIR, "*.csv")))
+        if not delta_files:
+            print("⏭ No delta files to apply.")
+            return
+        for entry in apply_deltas(delta_files):
+            print(f"✅ {entry['source']}: {entry['file']}" if entry["source"] else f"⏭ {entry['file']}: unknown table")
+        print(f"\n🎯 Applied {len(delta_files)} delta file(s) in {time.perf_counter() - started:.3f}s")
+    elif args.command == "teams":
+        cube = get_cube()
+        for season in [args.season] if args.season else standings_sources:
+            teams = cube.team_table(season, args.league or DEFAULT_LEAGUE)
+            if len(teams):
+                print(f"\n🏟 {season}\n{teams.to_string()}")
+    else:
+        cube = get_cube()
+        filters = {dim: getattr(args, dim) for dim in dimensions if getattr(args, dim)}
+        started = time.perf_counter()
+        rows = cube.query(args.stat, args.by, **filters)
+        columns = args.by + ["stat", "count", "sum", "mean", "per_game", "p25", "p50", "p75"]
+        print(rows[columns].to_string(index=False) if len(rows) else "🚨 No cells match.")
+        print(f"\n🧊 {len(rows)} rows in {(time.perf_counter() - started) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import standard_headers
+from stand_in_server import first_names, last_names
+
+# 🏭 Deterministic synthetic league generator for benchmarks.
+# Rows follow standard_headers with box-score identities that hold (PTS = 2·2PM + 3·3PM + FTM,
+# makes ≤ attempts, per-game columns = totals / GP), for any number of leagues × seasons ×
+# players. Players keep a latent skill across seasons of their league, and every
+# (league, season) block has its own seed, so output is identical however it is chunked.
+# The FT column carries total minutes, which is what lands there under the legacy header mapping.
+
+GAMES_PER_SEASON = 20
+key_columns = ["league", "season"]
+
+
+# Names are shared by every season of a league, so build them once
+@lru_cache(maxsize=16)
+def player_names(league, players):
+    first = np.array(first_names)[np.arange(players) % len(first_names)]
+    last = np.array(last_names)[(np.arange(players) // len(first_names)) % len(last_names)]
+    return pd.Series([f"{a} {b} {league}-{i}" for i, (a, b) in enumerate(zip(first, last))], dtype=object)
+
+
+# 🎲 Latent per-player skill for a league; stable across that league's seasons
+def player_skills(league, players, seed=0):
+    rng = np.random.default_rng([seed, league])
+    return {
+        "volume": rng.lognormal(0.0, 0.45, players),   # shot attempts per game multiplier
+        "accuracy": rng.beta(9, 11, players),          # 2P make probability, ~0.45
+        "range": rng.beta(2, 5, players),              # share of attempts from three
+        "size": rng.lognormal(0.0, 0.4, players),      # rebounds / blocks multiplier
+        "handle": rng.lognormal(0.0, 0.5, players),    # assists / turnovers multiplier
+    }
+
+
+def generate_season(league, season, players, seed=0):
+    skill = player_skills(league, players, seed)
+    rng = np.random.default_rng([seed, league, season])
+    form = rng.normal(1.0, 0.08, players)  # season-to-season drift
+
+    gp = rng.binomial(GAMES_PER_SEASON, rng.uniform(0.3, 1.0, players)).clip(1)
+    fga = rng.poisson(gp * 9 * skill["volume"] * form)
+    tpa = rng.binomial(fga, skill["range"])
+    tpm = rng.binomial(tpa, (skill["accuracy"] * 0.75).clip(0, 1))
+    two_made = rng.binomial(fga - tpa, skill["accuracy"])
+    fgm = two_made + tpm
+    fta = rng.poisson(gp * 2.5 * skill["volume"])
+    ftm = rng.binomial(fta, rng.beta(14, 5, players))
+    dreb = rng.poisson(gp * 3.5 * skill["size"])
+    oreb = rng.poisson(gp * 1.2 * skill["size"])
+    ast = rng.poisson(gp * 2.0 * skill["handle"])
+    stl = rng.poisson(gp * 0.9 * form.clip(0.1))
+    to = rng.poisson(gp * 1.3 * skill["handle"] ** 0.5)
+    blk = rng.poisson(gp * 0.5 * skill["size"] ** 2)
+    minutes = rng.poisson(gp * 8 * (1 + skill["volume"]))
+    pts = 2 * two_made + 3 * tpm + ftm
+    eff = pts + dreb + oreb + ast + stl + blk - (fga - fgm) - (fta - ftm) - to
+
+    def pct(made, attempts):
+        return np.round(100 * np.divide(made, attempts, out=np.zeros(players), where=attempts > 0), 1)
+
+    def per_game(total):
+        return np.round(total / gp, 1)
+
+    df = pd.DataFrame({
+        "Player": player_names(league, players).to_numpy(), "GP": gp, "FT": minutes, "FGM": fgm, "FGA": fga,
+        "FG%": pct(fgm, fga), "3PM": tpm, "3PA": tpa, "3P%": pct(tpm, tpa), "FTM": ftm, "FTA": fta,
+        "FT%": pct(ftm, fta), "DREB": dreb, "OREB": oreb, "AST": ast, "STL": stl, "TO": to, "BLK": blk,
+        "PTS": pts, "RPG": per_game(dreb + oreb), "APG": per_game(ast), "SPG": per_game(stl),
+        "BPG": per_game(blk), "EFF": per_game(eff), "PPR": per_game(pts + ast - to),
+    }, columns=standard_headers)
+    df[standard_headers[1:]] = df[standard_headers[1:]].astype("float64")
+    df["league"] = f"league_{league}"
+    df["season"] = f"season_{season}"
+    return df
+
+
+# 🔁 One frame per (league, season) block, so callers can stream millions of rows
+def iter_league(leagues=1, seasons=1, players=500, seed=0):
+    for league in range(leagues):
+        for season in range(seasons):
+            yield generate_season(league, season, players, seed)
+
+
+def generate_league(leagues=1, seasons=1, players=500, seed=0):
+    return pd.concat(iter_league(leagues, seasons, players, seed), ignore_index=True)
+
+
+# 📐 Split a target row count into leagues × seasons × players (players per block ≥ 1)
+def shape_for_rows(rows, leagues=None, seasons=None):
+    leagues = leagues or max(1, min(10, rows // 100_000))
+    seasons = seasons or max(1, min(10, rows // (leagues * 10_000)))
+    return leagues, seasons, max(1, rows // (leagues * seasons))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic league as CSV files.")
+    parser.add_argument("--rows", type=int, help="Approximate total rows (sets players per league/season)")
+    parser.add_argument("--leagues", type=int, default=None)
+    parser.add_argument("--seasons", type=int, default=None)
+    parser.add_argument("--players", type=int, default=500, help="Players per league and season")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="data/synthetic")
+    args = parser.parse_args(argv)
+
+    if args.rows:
+        leagues, seasons, players = shape_for_rows(args.rows, args.leagues, args.seasons)
+    else:
+        leagues, seasons, players = args.leagues or 1, args.seasons or 1, args.players
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    total = 0
+    for df in iter_league(leagues, seasons, players, args.seed):
+        path = os.path.join(args.output_dir, f"{df['league'].iat[0]}_{df['season'].iat[0]}_stats.csv")
+        df.drop(columns=key_columns).to_csv(path, index=False)
+        total += len(df)
+        print(f"✅ {path}: {len(df)} rows")
+    print(f"\n🎯 {total:,} rows ({leagues} leagues × {seasons} seasons × {players} players) "
+          f"in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()